@@ -7,34 +7,30 @@ import Container from './Container';
 function App() {
 
   const [routineList, setRoutineList] = useState([]);
-  let requestList = {
-    method: 'POST',
-    headers: {'Content-Type': 'application/json'}
-  }
-
-  const getList = () => {
-    fetch(`${process.env.REACT_APP_BE_ADDRESS}/routine/list`, requestList)
-    .then(response => response.json())
-    .then(response => {
-      console.log(response)
-      if (response.status == 'ok') {
-        setRoutineList(response.list);
-      }
-      else {
-        console.log("Error getting routine list");
-      }
-    }).catch(err=>console.log(err));
-  }
+  const [routineStates, setRoutineStates] = useState({});
 
   useEffect(()=>{
-    getList();
+    // one stream per client: a snapshot of every routine, then the new state of a routine on each change
+    const stream = new EventSource(`${process.env.REACT_APP_BE_ADDRESS}/routine/stream`);
+    stream.addEventListener('snapshot', (event) => {
+      const states = JSON.parse(event.data);
+      setRoutineStates(states);
+      setRoutineList(Object.keys(states));
+    });
+    stream.addEventListener('routine', (event) => {
+      const {name, ...state} = JSON.parse(event.data);
+      setRoutineStates(states => ({...states, [name]: state}));
+      setRoutineList(list => list.includes(name) ? list : [...list, name]);
+    });
+    stream.onerror = (err) => console.log(err); // EventSource reconnects and gets a new snapshot
+    return () => stream.close();
   },[]);
 
 
   return (
     <div className="App">
       <Menu name='Breakfast Menu' description='This is the breakfast menu' status='active' />
-      <Container routines={routineList} />
+      <Container routines={routineList} states={routineStates} />
     </div>
   );
 }
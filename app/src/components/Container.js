@@ -5,7 +5,7 @@ const Container = (props) => {
     return (
         <div className="container">
             {props.routines.map((routine, index) => {
-                    return <Routine name={routine} key={index} description='' />
+                    return <Routine name={routine} key={index} description='' state={props.states[routine]} />
                 }
             )}
         </div>
@@ -7,6 +7,10 @@ function StatusContainer(props) {
         <div className="status-container">
             <TasksContainer tasks={props.tasks} status={props.status} />
             <div className='routine-status'>{props.status}</div>
+            {props.stats && <div className='routine-stats'>
+                {Object.entries(props.stats.totals).map(([status, total]) => `${status} ${total}`).join(' · ')}
+                {props.stats.average_duration !== null && ` · avg ${props.stats.average_duration.toFixed(1)}s`}
+            </div>}
         </div>
     );
 }
@@ -1,9 +1,256 @@
-from .rabbitMQ import receive_message
-from typing import Any, Dict, Optional
+import asyncio
+import logging
+import os
+import pika
+import time
+from collections import OrderedDict
+from collections.abc import Callable
+from pika.adapters.asyncio_connection import AsyncioConnection
+from pika.channel import Channel
+from typing import Any, Dict, List, Optional, Tuple
+from . import wire
+from .rabbitMQ import get_parameters
+
+logger = logging.getLogger(__name__)
+
+COMMANDS_QUEUE = "commands"
+COMMANDS_PREFETCH = int(os.environ.get("COMMANDS_PREFETCH", 100)) # unacked commands delivered at once
+COMMANDS_RECONNECT_DELAY = float(os.environ.get("COMMANDS_RECONNECT_DELAY", 1))
+COMMANDS_MAX_RECONNECT_DELAY = float(os.environ.get("COMMANDS_MAX_RECONNECT_DELAY", 30))
+COMMANDS_IDEMPOTENCY_KEYS = int(os.environ.get("COMMANDS_IDEMPOTENCY_KEYS", 1024)) # results remembered for duplicate commands
+KNOWN_COMMANDS = ("start", "execute", "cancel")
+
+
+def collapse_commands(commands: List[str]) -> str:
+    """
+    The single command with the final effect intended by a sequence of commands to one routine:
+    a trailing cancel wins, otherwise an execute after the last cancel wins over start
+    (execute runs the routine now and keeps it scheduled), otherwise start.
+    """
+    if commands[-1] == "cancel":
+        return "cancel"
+    after_cancel = commands[len(commands) - commands[::-1].index("cancel"):] if "cancel" in commands else commands
+    if "execute" in after_cancel:
+        return "execute"
+    return after_cancel[-1]
+
 
 class CommandService:
-    def __init__(self):
-        pass
+    """
+    Consumes the commands queue on the scheduler event loop (pika AsyncioConnection).
+
+    Deliveries are pushed into an asyncio queue as they arrive. `get_commands` waits for the first
+    command and drains everything already delivered, each command with its ack callback:
+    the caller acks once the command is applied, passing the result. A command sent with `reply_to`
+    and `correlation_id` properties gets that result back as its reply.
+    Unacked commands of a lost channel are redelivered by the broker after the reconnect,
+    which is retried with exponential backoff.
+
+    A burst costs one transition per routine: the drained commands of each routine are collapsed into
+    the one with the same final effect (see `collapse_commands`), every message of the group gets its result.
+    An unknown command is left out of the groups and handled on its own.
+    A command whose `idempotency_key` was already applied (a retry, a redelivery) is not applied again,
+    it gets the result remembered for that key (bounded LRU of `idempotency_keys` keys).
+    """
+    def __init__(
+            self,
+            queue_name: str = COMMANDS_QUEUE,
+            parameters: Optional[pika.ConnectionParameters] = None,
+            prefetch: int = COMMANDS_PREFETCH,
+            reconnect_delay: float = COMMANDS_RECONNECT_DELAY,
+            max_reconnect_delay: float = COMMANDS_MAX_RECONNECT_DELAY,
+            idempotency_keys: int = COMMANDS_IDEMPOTENCY_KEYS
+        ):
+        self.queue_name = queue_name
+        self.parameters = parameters
+        self.prefetch = prefetch
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connection: Optional[AsyncioConnection] = None
+        self.channel: Optional[Channel] = None
+        self.commands: Optional[asyncio.Queue] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+        self._closing = False
+        self._failures = 0
+        self.idempotency_keys = idempotency_keys
+        self.results: OrderedDict[str, Optional[Dict[str, Any]]] = OrderedDict() # key -> result, None until applied
+
+        # Metrics
+        self.received = 0
+        self.applied = 0
+        self.duplicates = 0
+
+    async def start(self) -> None:
+        self._loop = asyncio.get_running_loop()
+        self.commands = asyncio.Queue()
+        self._closing = False
+        self._connect()
+
+    def _connect(self) -> None:
+        if self._closing:
+            return
+        logger.info("CommandService: connecting to RabbitMQ")
+        self.connection = AsyncioConnection(
+            parameters=self.parameters or get_parameters(),
+            on_open_callback=self._on_connection_open,
+            on_open_error_callback=self._on_connection_open_error,
+            on_close_callback=self._on_connection_closed,
+            custom_ioloop=self._loop
+        )
+
+    def _reconnect(self) -> None:
+        self.channel = None
+        # commands not handed out yet are redelivered on the next channel, drop them here
+        while self.commands is not None and not self.commands.empty():
+            self.commands.get_nowait()
+        if self._closing:
+            return
+        self._failures += 1
+        delay = min(self.max_reconnect_delay, self.reconnect_delay * 2 ** (self._failures - 1))
+        logger.warning(f"CommandService: reconnecting in {delay:.1f}s")
+        self._loop.call_later(delay, self._connect)
+
+    def _on_connection_open(self, connection: AsyncioConnection) -> None:
+        connection.channel(on_open_callback=self._on_channel_open)
+
+    def _on_connection_open_error(self, _connection: AsyncioConnection, error: Exception) -> None:
+        logger.error(f"CommandService: connection failed: {error}")
+        self._reconnect()
+
+    def _on_connection_closed(self, _connection: AsyncioConnection, reason: Exception) -> None:
+        if not self._closing:
+            logger.warning(f"CommandService: connection closed: {reason}")
+        self._reconnect()
+
+    def _on_channel_open(self, channel: Channel) -> None:
+        self.channel = channel
+        channel.add_on_close_callback(self._on_channel_closed)
+        channel.basic_qos(
+            prefetch_count=self.prefetch,
+            callback=lambda _frame: channel.queue_declare(queue=self.queue_name, callback=self._on_queue_declared)
+        )
+
+    def _on_channel_closed(self, channel: Channel, reason: Exception) -> None:
+        logger.warning(f"CommandService: channel closed: {reason}")
+        if self.connection is not None and self.connection.is_open and not self._closing:
+            self.connection.close()
+
+    def _on_queue_declared(self, _frame) -> None:
+        self.channel.basic_consume(queue=self.queue_name, on_message_callback=self._on_message)
+        self._failures = 0
+        logger.info(f"CommandService: consuming {self.queue_name}")
+
+    def _on_message(self, channel: Channel, method, properties: pika.BasicProperties, body: bytes) -> None:
+        try:
+            command = wire.decode(body, properties.content_type)
+        except ValueError as e:
+            logger.error(f"CommandService: dropping malformed command {body}: {e}")
+            channel.basic_nack(delivery_tag=method.delivery_tag, requeue=False)
+            return
+        self.commands.put_nowait((command, self._gen_ack(channel, method.delivery_tag, command, properties)))
+
+    def _gen_ack(
+            self,
+            channel: Channel,
+            delivery_tag: int,
+            command: Optional[Dict[str, Any]] = None,
+            properties: Optional[pika.BasicProperties] = None
+        ) -> Callable[..., None]:
+        def ack_message(result: Optional[Dict[str, Any]] = None) -> None:
+            # delivery tags belong to their channel, a command of a lost channel is redelivered instead
+            if channel is not self.channel or not channel.is_open:
+                return
+            if result is not None and properties is not None and properties.reply_to:
+                self._reply(channel, properties, command, result)
+            channel.basic_ack(delivery_tag=delivery_tag)
+        return ack_message
+
+    def _reply(self, channel: Channel, properties: pika.BasicProperties, command: Dict[str, Any], result: Dict[str, Any]) -> None:
+        reply = {
+            "correlation_id": properties.correlation_id,
+            "result": result,
+            "sent_at": command.get("sent_at", None), # the sender clock, echoed back for its latency
+            "applied_at": time.time(),
+        }
+        # answered in the format of the command: a sender that only speaks JSON gets JSON back
+        reply_format = "msgpack" if properties.content_type == wire.CONTENT_TYPE_MSGPACK else "json"
+        body, content_type = wire.encode(reply, reply_format)
+        channel.basic_publish(
+            exchange="",
+            routing_key=properties.reply_to,
+            properties=pika.BasicProperties(correlation_id=properties.correlation_id, content_type=content_type),
+            body=body
+        )
+
+    async def get_commands(self) -> List[Tuple[Dict[str, Any], Callable[..., None]]]:
+        """
+        Wait for the next command, then return it with every other command already delivered,
+        deduplicated and collapsed to one command per routine.
+        """
+        deliveries = [await self.commands.get()]
+        while not self.commands.empty():
+            deliveries.append(self.commands.get_nowait())
+        commands = self.coalesce(deliveries)
+        while not commands:
+            # only duplicates, already answered
+            commands = self.coalesce([await self.commands.get()])
+        return commands
+
+    def coalesce(self, deliveries: List[Tuple[Dict[str, Any], Callable[..., None]]]) -> List[Tuple[Dict[str, Any], Callable[..., None]]]:
+        groups: Dict[Any, List[Tuple[Dict[str, Any], Callable[..., None]]]] = {}
+        unknown: List[Tuple[Dict[str, Any], Callable[..., None]]] = []
+        for command, ack_message in deliveries:
+            self.received += 1
+            key = command.get("idempotency_key", None)
+            if key is not None:
+                if self.results.get(key, None) is not None:
+                    self.duplicates += 1
+                    logger.info(f"CommandService: duplicate command {command}, replying with its result")
+                    self.results.move_to_end(key)
+                    ack_message(dict(self.results[key], duplicate=True))
+                    continue
+                self._remember(key, None)
+            if command.get("command", None) not in KNOWN_COMMANDS:
+                # not collapsed: it gets its own error result, and the valid commands of its routine still apply
+                unknown.append((command, ack_message))
+                continue
+            groups.setdefault(command.get("routine", None), []).append((command, ack_message))
+
+        commands = []
+        for group in list(groups.values()) + [[delivery] for delivery in unknown]:
+            command = dict(group[-1][0], command=collapse_commands([command.get("command", None) for command, _ack in group]))
+            if len(group) > 1:
+                command["coalesced"] = len(group)
+                logger.info(f"CommandService: {len(group)} commands to {command.get('routine', None)} collapsed to {command['command']}")
+            commands.append((command, self._gen_group_ack(group)))
+        self.applied += len(commands)
+        return commands
+
+    def _remember(self, key: str, result: Optional[Dict[str, Any]]) -> None:
+        self.results[key] = result
+        self.results.move_to_end(key)
+        while len(self.results) > self.idempotency_keys:
+            self.results.popitem(last=False)
+
+    def _gen_group_ack(self, group: List[Tuple[Dict[str, Any], Callable[..., None]]]) -> Callable[..., None]:
+        def ack_messages(result: Optional[Dict[str, Any]] = None) -> None:
+            for command, ack_message in group:
+                key = command.get("idempotency_key", None)
+                if key is not None and result is not None:
+                    # remembered before the ack: a redelivery after a lost ack is not applied again
+                    self._remember(key, result)
+                ack_message(result)
+        return ack_messages
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "applied": self.applied,
+            "duplicates": self.duplicates,
+            "idempotency_keys": len(self.results),
+        }
 
-    def get_commands(self) -> Optional[Dict[str, Any]]:
-        return receive_message("commands")
\ No newline at end of file
+    async def close(self) -> None:
+        self._closing = True
+        if self.connection is not None and not self.connection.is_closed and not self.connection.is_closing:
+            self.connection.close()
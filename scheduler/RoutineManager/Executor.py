@@ -1,4 +1,8 @@
 from abc import ABC
+from collections.abc import Callable
+from typing import Optional
+from .ProcessPool import get_process_pool
+from .WorkerPool import get_worker_pool
 
 class Executor(ABC):
     def __init__(self):
@@ -17,4 +21,20 @@ class Executor(ABC):
         return True
     
     async def async_function(self):
-        return self.function()
\ No newline at end of file
+        # Sync functions run in the shared worker pool, never on the event loop thread
+        if getattr(self, "executor", "thread") == "process":
+            return await get_process_pool().run(self.descriptor)
+        return await get_worker_pool().run(self.concurrency_key, self.function)
+
+    def set_concurrency_key(self, concurrency_key: str) -> None:
+        """Worker pool key the per-routine concurrency limit applies to."""
+        self.concurrency_key = concurrency_key
+
+    def set_done_callback(self, callback: Optional[Callable[[], None]]) -> None:
+        """Register a callback invoked on the event loop once the running job completes."""
+        self.done_callback = callback
+
+    def _on_job_done(self, _job) -> None:
+        callback = getattr(self, "done_callback", None)
+        if callback is not None:
+            callback()
\ No newline at end of file
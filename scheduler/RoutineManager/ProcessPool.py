@@ -0,0 +1,167 @@
+import asyncio
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import functools
+import importlib
+import logging
+import multiprocessing
+import os
+import pickle
+import threading
+from collections.abc import Callable
+from typing import Any, Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+PROCESS_POOL_SIZE = int(os.environ.get("PROCESS_POOL_SIZE", os.cpu_count() or 1))
+# fork keeps the workers warm: the routines modules are already imported in the parent
+PROCESS_POOL_START_METHOD = os.environ.get("PROCESS_POOL_START_METHOD", "fork")
+
+_worker_initializers: List[Callable[[], None]] = []
+
+
+def register_worker_initializer(initializer: Callable[[], None]) -> None:
+    """
+    Register a module-level function called once in every new worker process,
+    e.g. to drop DB connections inherited from the parent and re-establish them in the worker.
+    """
+    if initializer not in _worker_initializers:
+        _worker_initializers.append(initializer)
+
+
+def _init_worker(initializers: Tuple[Callable[[], None], ...]) -> None:
+    for initializer in initializers:
+        initializer()
+
+
+class TaskDescriptor:
+    """
+    Picklable reference to a work function: module, qualified name and arguments.
+    The function is resolved by import in the worker process, so it must be defined at module level
+    (no lambda or closure). A functools.partial is unwrapped into the function and its arguments.
+    """
+    def __init__(self, function: Callable[..., Any], args: Tuple[Any, ...] = (), kwargs: Optional[Dict[str, Any]] = None) -> None:
+        kwargs = dict(kwargs or {})
+        if isinstance(function, functools.partial):
+            args = function.args + tuple(args)
+            kwargs = {**function.keywords, **kwargs}
+            function = function.func
+        self.module = function.__module__
+        self.qualname = function.__qualname__
+        if "<lambda>" in self.qualname or "<locals>" in self.qualname:
+            raise ValueError(f"Function {self.module}.{self.qualname} is not importable, the process executor requires a module-level function")
+        self.args = tuple(args)
+        self.kwargs = kwargs
+        try:
+            pickle.dumps((self.args, self.kwargs))
+        except Exception as e:
+            raise ValueError(f"Arguments of {self.module}.{self.qualname} are not picklable: {e}")
+
+    def resolve(self) -> Callable[..., Any]:
+        function = importlib.import_module(self.module)
+        for name in self.qualname.split("."):
+            function = getattr(function, name)
+        return function
+
+    def __call__(self) -> Any:
+        return self.resolve()(*self.args, **self.kwargs)
+
+    def __repr__(self) -> str:
+        return f"<TaskDescriptor | {self.module}.{self.qualname}>"
+
+
+def _run_descriptor(descriptor: TaskDescriptor) -> Any:
+    return descriptor()
+
+
+def _noop() -> int:
+    return os.getpid()
+
+
+class ProcessPool:
+    """
+    Warm pool of worker processes for CPU bound tasks (Task executor="process").
+    The executor is created lazily, after the routines are imported, and re-created if a worker dies.
+    """
+    def __init__(self, max_workers: int = PROCESS_POOL_SIZE, start_method: str = PROCESS_POOL_START_METHOD) -> None:
+        self.max_workers = max_workers
+        self.start_method = start_method
+        self.executor: Optional[ProcessPoolExecutor] = None
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.submitted = 0
+        self.completed = 0
+        self.failed = 0
+        self.restarts = 0
+
+    def get_executor(self) -> ProcessPoolExecutor:
+        with self._lock:
+            if self.executor is None:
+                if self.start_method in multiprocessing.get_all_start_methods():
+                    context = multiprocessing.get_context(self.start_method)
+                else:
+                    context = multiprocessing.get_context()
+                self.executor = ProcessPoolExecutor(
+                    max_workers=self.max_workers,
+                    mp_context=context,
+                    initializer=_init_worker,
+                    initargs=(tuple(_worker_initializers),)
+                )
+                logger.info(f"ProcessPool: created with {self.max_workers} workers ({context.get_start_method()})")
+            return self.executor
+
+    async def warm_up(self) -> None:
+        """Start every worker process ahead of the first task."""
+        loop = asyncio.get_running_loop()
+        executor = self.get_executor()
+        pids = await asyncio.gather(*[loop.run_in_executor(executor, _noop) for _ in range(self.max_workers)])
+        logger.info(f"ProcessPool: warmed up workers {sorted(set(pids))}")
+
+    async def run(self, descriptor: TaskDescriptor) -> Any:
+        loop = asyncio.get_running_loop()
+        self.submitted += 1
+        try:
+            result = await loop.run_in_executor(self.get_executor(), _run_descriptor, descriptor)
+        except BrokenProcessPool:
+            logger.error(f"ProcessPool: worker died while running {descriptor}, restarting the pool")
+            self.failed += 1
+            self.restart()
+            raise
+        except Exception:
+            self.failed += 1
+            raise
+        self.completed += 1
+        return result
+
+    def restart(self) -> None:
+        with self._lock:
+            executor, self.executor = self.executor, None
+            self.restarts += 1
+        if executor is not None:
+            executor.shutdown(wait=False)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "max_workers": self.max_workers,
+            "submitted": self.submitted,
+            "completed": self.completed,
+            "failed": self.failed,
+            "running": self.submitted - self.completed - self.failed,
+            "restarts": self.restarts,
+        }
+
+    def shutdown(self, wait: bool = False) -> None:
+        with self._lock:
+            executor, self.executor = self.executor, None
+        if executor is not None:
+            executor.shutdown(wait=wait)
+
+
+_process_pool: Optional[ProcessPool] = None
+
+def get_process_pool() -> ProcessPool:
+    global _process_pool
+    if _process_pool is None:
+        _process_pool = ProcessPool()
+    return _process_pool
@@ -0,0 +1,65 @@
+import random
+from typing import Optional
+
+
+class RetryPolicy:
+    """
+    Retry policy of a routine: computes how long to wait before the next retry.
+    The base policy waits a fixed delay. Every policy is capped by `max_delay`.
+    """
+    def __init__(self, delay: float, max_delay: Optional[float] = None) -> None:
+        self.delay = delay
+        self.max_delay = max_delay
+
+    def _cap(self, delay: float) -> float:
+        if self.max_delay is not None:
+            delay = min(delay, self.max_delay)
+        return max(0.0, delay)
+
+    def get_delay(self, attempt: int, previous_delay: Optional[float] = None) -> float:
+        """
+        attempt: number of failed attempts so far (1 for the first retry).
+        previous_delay: delay used before the previous attempt, if any.
+        """
+        return self._cap(self.delay)
+
+    def __repr__(self) -> str:
+        return f"<{self.__class__.__name__} | {self.delay} | {self.max_delay}>"
+
+
+class FixedDelay(RetryPolicy):
+    pass
+
+
+class ExponentialBackoff(RetryPolicy):
+    """
+    delay * factor^(attempt-1), capped.
+    With jitter the actual delay is drawn uniformly from [0, backoff] ("full jitter").
+    """
+    def __init__(
+            self,
+            delay: float,
+            max_delay: Optional[float] = None,
+            factor: float = 2.0,
+            jitter: bool = True
+        ) -> None:
+        super().__init__(delay, max_delay)
+        self.factor = factor
+        self.jitter = jitter
+
+    def get_delay(self, attempt: int, previous_delay: Optional[float] = None) -> float:
+        backoff = self._cap(self.delay * self.factor ** max(0, attempt - 1))
+        if self.jitter:
+            return random.uniform(0, backoff)
+        return backoff
+
+
+class DecorrelatedJitter(RetryPolicy):
+    """
+    Decorrelated jitter: uniform(delay, previous_delay * 3), capped.
+    Spreads retries of routines that failed together (e.g. same feed host down).
+    """
+    def get_delay(self, attempt: int, previous_delay: Optional[float] = None) -> float:
+        if previous_delay is None or previous_delay < self.delay:
+            previous_delay = self.delay
+        return self._cap(random.uniform(self.delay, previous_delay * 3))
@@ -2,16 +2,22 @@ from collections.abc import Callable
 from sqlalchemy.exc import ResourceClosedError
 from typing import Any, Tuple, Optional
 import asyncio
+import inspect
 from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, TimeoutError
 import time
 import logging
+from datetime import datetime
 from db import gen_routine_handlers, reattach_routine
 from .Trigger import Trigger
 from .Status import RoutineStatus, TaskInstanceStatus, TriggerInstanceStatus 
 from .Task import Task
+from .RetryPolicy import RetryPolicy, DecorrelatedJitter
+from .Watchdog import Watchdog
 
 logger = logging.getLogger(__name__)
 
+MAX_RETRY_DELAY = 60*60 # default cap of the retry backoff: 1 hour
+
 
 class Routine:
     """
@@ -28,13 +34,17 @@ class Routine:
     3. wait for task to complete
     4. release task
 
+    Routines are not polled. After every step `next_run_at` holds the epoch at which the
+    routine should be stepped again, or None when it waits for its task or trigger to
+    complete (the completion callback wakes it up through the wake handler).
+
     States:
     - WAITING: Routine is waiting for the condition to be met
     - PENDING: Routine is preparing to run the task
     - RUNNING: Routine is currently executing the task
     - DONE: Routine has completed the task and is resetting
     - ERROR: Routine encountered an error and will retry
-    - RETRY: Routine is retrying the task after an error
+    - RETRY: Routine waits for its retry policy delay, then retries the task
     - FAIL: Routine has failed after exceeding retry limit
     - COMPLETE: Routine has completed its run-once task
     - CANCELED: Routine has been canceled
@@ -50,7 +60,8 @@ class Routine:
             retry_limit: int = 5, # default 5 retries
             timeout_limit: int = 60*60, # default 1 hour
             gen_handler: Any = None,
-            run_once: bool = False
+            run_once: bool = False,
+            retry_policy: Optional[RetryPolicy] = None
         ) -> None:
         self.name = name
         self.description = description
@@ -61,20 +72,74 @@ class Routine:
         self.retry_limit = retry_limit
         self.timeout_limit = timeout_limit
         self.run_once = run_once
+        if retry_policy is None:
+            # jittered, but never sooner than retry_delay
+            retry_policy = DecorrelatedJitter(retry_delay, max_delay=max(retry_delay, MAX_RETRY_DELAY))
+        self.retry_policy = retry_policy
+        self.watchdog = Watchdog()
         self.status = RoutineStatus.WAITING
         self.can_release_task = False
+        self.next_run_at: Optional[float] = time.time()
+        self.wake_handler: Optional[Callable[[str], None]] = None
+        if self.task is not None:
+            self.task.set_done_callback(self.wake)
+            self.task.set_concurrency_key(self.name)
+        if self.trigger is not None:
+            self.trigger.set_done_callback(self.wake)
+            self.trigger.set_concurrency_key(self.name)
 
         # Handlers
         if gen_handler is None:
             gen_handler = gen_routine_handlers
-        self.session, self.gen_routine, self.update_status, self.update_error, self.create_new_task, self.gen_task_handlers = gen_handler(self.name)
+        self.session, self.gen_routine, self.update_status, self.update_error, self.create_new_task, self.gen_task_handlers, self.update_retry = gen_handler(self.name)
         self.current_task_db_instance = None
 
         # State
         self.num_retries = 0
+        self.next_retry_at: Optional[float] = None
+        self.last_retry_delay: Optional[float] = None
 
         # Update DB
-        self.routine = self.gen_routine(description)       
+        self.routine = self.gen_routine(description, retry_delay, retry_limit)
+        self.restore_retry_state()
+
+    def restore_retry_state(self) -> None:
+        """Resume a pending retry persisted before a restart, so the backoff is not reset."""
+        num_retries = getattr(self.routine, "num_retries", None) or 0
+        next_retry_at = getattr(self.routine, "next_retry_at", None)
+        if num_retries <= 0 or next_retry_at is None:
+            return
+        self.num_retries = num_retries
+        self.next_retry_at = next_retry_at.timestamp()
+        self.next_run_at = self.next_retry_at
+        self.status = RoutineStatus.RETRY
+        logger.info(f"Routine {self.name} : Restored retry {self.num_retries} at {next_retry_at}")
+
+    def schedule_retry(self, now: float) -> None:
+        delay = self.retry_policy.get_delay(self.num_retries, self.last_retry_delay)
+        self.last_retry_delay = delay
+        self.next_retry_at = now + delay
+        self.next_run_at = self.next_retry_at
+        logger.info(f"Routine {self.name} : Retry {self.num_retries}/{self.retry_limit} in {delay:.1f}s")
+        self.update_retry(self.num_retries, datetime.fromtimestamp(self.next_retry_at))
+
+    def reset_retry_state(self) -> None:
+        had_retry = self.num_retries > 0 or self.next_retry_at is not None
+        self.num_retries = 0
+        self.next_retry_at = None
+        self.last_retry_delay = None
+        if had_retry:
+            self.update_retry(0, None)
+
+    def set_watchdog(self, watchdog: Watchdog) -> None:
+        self.watchdog = watchdog
+
+    def set_wake_handler(self, wake_handler: Optional[Callable[[str], None]]) -> None:
+        self.wake_handler = wake_handler
+
+    def wake(self) -> None:
+        if self.wake_handler is not None:
+            self.wake_handler(self.name)
 
     def get_task_status(self) -> Optional[str]:
         if self.task is not None:
@@ -88,6 +153,7 @@ class Routine:
     
     async def step(self) -> bool:
         logger.debug(f"Routine {self.name}: step")
+        now = time.time()
 
         # WAITING
         # Next steps: [PENDING]
@@ -95,26 +161,42 @@ class Routine:
             logger.debug(f"Routine {self.name} : Waiting for condition to be met")
             if self.trigger.status == TriggerInstanceStatus.RUNNING:
                 if not self.trigger.is_busy():
+                    self.next_run_at = now + self.interval
                     try:
                         result = await self.trigger.get_result()
                         if result and self.current_task_db_instance is None:
                             self.status = RoutineStatus.PENDING
+                            self.next_run_at = now
                             logger.debug(f"Routine {self.name} : Trigger met")
                         if self.current_task_db_instance is not None and self.can_release_task:
                             self.release_task()
+                            self.next_run_at = now
                             logger.debug(f"Routine {self.name} : Task released")
                     except Exception as e:
                         logger.warning(f"Routine {self.name} : trigger exception {e}")
+                else:
+                    self.next_run_at = None
             else:
                 await self.trigger.run()
+                self.next_run_at = None
+
+        # RETRY (backoff not elapsed yet)
+        # Next steps: [RETRY]
+        elif self.status == RoutineStatus.RETRY and self.next_retry_at is not None and now < self.next_retry_at:
+            logger.debug(f"Routine {self.name} : Waiting for retry")
+            self.next_run_at = self.next_retry_at
 
         # PENDING / RETRY
         # Nex steps: [RUNNING]
         elif self.status == RoutineStatus.PENDING or self.status == RoutineStatus.RETRY:
             logger.info(f"Routine {self.name} : Preparing task")
-            if self.set_new_task():
+            task_db_instance = await self.create_task_instance()
+            if task_db_instance is not None and self.set_new_task(task_db_instance):
                 logger.debug(f"Routine {self.name} : Task set")
                 self.status = RoutineStatus.RUNNING
+                self.next_run_at = now
+            else:
+                self.next_run_at = now + self.interval
         
         # RUNNING
         # Next steps: [DONE, ERROR, COMPLETE]
@@ -122,9 +204,12 @@ class Routine:
             logger.info(f"Routine {self.name} : Running task")
             if self.task.status == TaskInstanceStatus.RUNNING:
                 if not self.task.is_busy():
+                    self.next_run_at = now
+                    self.watchdog.release(self.name)
                     try:
                         result = await self.task.get_result()
                         if result:
+                            self.reset_retry_state()
                             if self.run_once:
                                 self.status = RoutineStatus.COMPLETE
                             else:
@@ -134,15 +219,29 @@ class Routine:
                             self.num_retries += 1
                     except Exception as e:
                         logger.warning(f"Routine {self.name} : task exception {e}")
+                        self.status = RoutineStatus.ERROR
+                        self.num_retries += 1
+                elif self.watchdog.is_expired(self.name, now):
+                    logger.warning(f"Routine {self.name} : task exceeded timeout limit of {self.timeout_limit}s")
+                    await self.task.timeout(self.timeout_limit)
+                    self.watchdog.release(self.name, timed_out=True)
+                    self.status = RoutineStatus.ERROR
+                    self.num_retries += 1
+                    self.next_run_at = now
+                else:
+                    # Woken up by the completion callback, or by the scheduler at the deadline
+                    self.next_run_at = self.watchdog.get_deadline(self.name)
             else:
                 await self.task.run()
+                self.next_run_at = self.watchdog.watch(self.name, self.task.id, self.timeout_limit)
                 
         # DONE
         # Next steps: [WAITING]
         elif self.status == RoutineStatus.DONE:
             logger.info(f"Routine {self.name}: Done")
-            self.num_retries = 0
+            self.reset_retry_state()
             self.status = RoutineStatus.WAITING
+            self.next_run_at = now + self.interval
 
         # ERROR
         # Next steps: [RETRY, FAIL]
@@ -151,32 +250,48 @@ class Routine:
             if self.num_retries >= self.retry_limit:
                 logger.error("Retry limit reached for the routine")
                 self.status = RoutineStatus.FAIL
+                self.next_retry_at = None
+                self.update_retry(self.num_retries, None)
+                self.next_run_at = now
             else:
                 self.status = RoutineStatus.RETRY
+                self.schedule_retry(now)
 
         # FAIL
         # Next steps: [None]
         elif self.status == RoutineStatus.FAIL:
             logger.info(f"Routine {self.name}: Fail")
+            self.next_run_at = None
             return False
         
         # COMPLETE
         # Next steps: [None]
         elif self.status == RoutineStatus.COMPLETE:
             logger.info("Routine {self.name} : Run once routine completed")
+            self.next_run_at = None
             return True
 
         elif self.status == RoutineStatus.CANCELED:
             logger.info(f"Routine {self.name}: Canceled")
+            self.next_run_at = None
             return False
 
     def allow_release_task(self) -> None:
         self.can_release_task = True
     
-    def set_new_task(self) -> bool:
+    async def create_task_instance(self) -> Optional[Any]:
+        """Insert the task row, awaiting the handler when the DB layer is async."""
+        task_db_instance = self.create_new_task()
+        if inspect.isawaitable(task_db_instance):
+            task_db_instance = await task_db_instance
+        return task_db_instance
+
+    def set_new_task(self, task_db_instance: Optional[Any] = None) -> bool:
         #TODO: cleanup
         logger.info(f"Routine {self.name} : Setting new task")
-        self.current_task_db_instance = self.create_new_task()
+        if task_db_instance is None:
+            task_db_instance = self.create_new_task()
+        self.current_task_db_instance = task_db_instance
         if self.current_task_db_instance is None:
             return False
         logger.info(f"Routine {self.name} : Task created: {self.current_task_db_instance}")
@@ -197,17 +312,22 @@ class Routine:
     async def cancel(self) -> None:
         if self.status == RoutineStatus.RUNNING:
             await self.task.cancel()
+            self.watchdog.release(self.name)
         if self.status == RoutineStatus.PENDING:
             await self.trigger.cancel()
         self.allow_release_task()
         self.status = RoutineStatus.CANCELED
+        self.next_run_at = None
         logger.info(f"Routine {self.name} : Canceled")
 
     async def start(self) -> None:
         if self.status == RoutineStatus.CANCELED:
             self.status = RoutineStatus.WAITING
+            self.next_run_at = time.time()
 
     async def execute(self) -> None:
         if self.status != RoutineStatus.RUNNING:
             self.status = RoutineStatus.PENDING
-            self.trigger.cancel()
+            self.next_retry_at = None
+            self.next_run_at = time.time()
+            await self.trigger.cancel()
@@ -1,16 +1,22 @@
 import asyncio
 from collections.abc import Callable
 import logging
+import time
 from typing import Any, Dict, Optional, List
-from db import init_db
+from db import init_db, get_pool_stats, get_journal_stats, close_async_engine
 from .Routine import Routine
 from .Status import RoutineStatus, TaskInstanceStatus
 from .StatusUpdater import StatusUpdater
 from .CommandService import CommandService
+from .Scheduler import Scheduler
+from .Watchdog import Watchdog
+from .ProcessPool import get_process_pool
+from .Stats import get_provided_stats
+from .WorkerPool import get_worker_pool
 
 logger = logging.getLogger(__name__)
 
-TIME_TO_SLEEP = 5 # FIXME: consider to reduce the time
+STATS_INTERVAL = 60 # Interval of the scheduler statistics log
 
 def singleton(cls):
     instances = {}
@@ -31,6 +37,9 @@ class RoutineManager:
     def __init__(self, *args, **kwargs):
         self.routines: List[Routine] = []
         self.routines_map_tasks: List[asyncio.Task[None]] = {}
+        self.routines_by_name: Dict[str, Routine] = {}
+        self.scheduler = Scheduler()
+        self.watchdog = Watchdog()
         self.status_updater = StatusUpdater()
         self.command_service = CommandService()
         init_db()
@@ -43,8 +52,12 @@ class RoutineManager:
             return False
         
         self.routines.append(routine)
+        self.routines_by_name[routine.name] = routine
         logger.info(f"self.routines: {self.routines}")
-        self.status_updater.routine_status_updater(routine.name, RoutineStatus.WAITING)
+        self.status_updater.routine_status_updater(routine.name, routine.status)
+        routine.set_wake_handler(self.scheduler.wake)
+        routine.set_watchdog(self.watchdog)
+        self.scheduler.schedule(routine.name, routine.next_run_at)
         
     def get_routine(self, routine_name: str) -> Optional[Routine]:
         logger.info(f"Routine Manager: get routine {routine_name}")
@@ -55,62 +68,126 @@ class RoutineManager:
         logger.info(f"Routine Manager: Routine '{routine_name}' not found")
         return None
     
+    def update_statuses(self, routine: Routine) -> None:
+        logger.debug(f"Routine Manager {routine.name}: Update statuses")
+        self.status_updater.task_status_updater(routine.name, routine.task.status, routine.task.id)
+        self.status_updater.routine_status_updater(routine.name, routine.status)
+
+    async def step_routine(self, routine_name: str) -> None:
+        """
+        Scheduler handler: step a single routine that is due (its timer expired, or its task / trigger completed).
+        """
+        routine = self.routines_by_name.get(routine_name, None)
+        if routine is None:
+            logger.warning(f"Routine Manager: scheduled routine '{routine_name}' not found")
+            return
+        if routine.task.status in [TaskInstanceStatus.DONE, TaskInstanceStatus.ERROR, TaskInstanceStatus.CANCELLED, TaskInstanceStatus.TIMEOUT, TaskInstanceStatus.UNKNOWN]:
+            routine.allow_release_task()
+        logger.debug(f"Routine status: {routine.name}: step ")
+        try:
+            await routine.step()
+        except Exception as e:
+            logger.error(f"Routine Manager {routine.name}: step failed with error {e}", exc_info=True)
+            routine.next_run_at = time.time() + routine.interval
+        self.update_statuses(routine)
+        # None means the routine waits for a completion callback, a wake-up may already be pending
+        if routine.next_run_at is not None:
+            self.scheduler.schedule(routine.name, routine.next_run_at)
+
     async def main_coroutine(self):
         """
         The main coroutine of the RoutineManager class.
         This coroutine is responsible for updating the status of routines and handling new commands.
-        It runs in an infinite loop, periodically checking the status of routines and processing new commands.
+        Routines are stepped by the scheduler only when they are due, while commands are handled by a separate coroutine.
         """
         logger.info("Routine Manager: Main coroutine")
-        # try:
+        if any(getattr(routine.task, "executor", "thread") == "process" for routine in self.routines):
+            await get_process_pool().warm_up()
+        try:
+            await asyncio.gather(
+                self.scheduler.run(self.step_routine),
+                self.command_coroutine(),
+                self.status_coroutine(),
+                self.stats_coroutine()
+            )
+        finally:
+            self.status_updater.flush()
+            await close_async_engine()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "worker_pool": get_worker_pool().get_stats(),
+            "process_pool": get_process_pool().get_stats(),
+            "db_pool": get_pool_stats(),
+            "status_journal": get_journal_stats(),
+            "status_updates": self.status_updater.get_stats(),
+            "commands": self.command_service.get_stats(),
+            "tasks": self.watchdog.get_stats(),
+            **get_provided_stats(),
+        }
+
+    async def status_coroutine(self):
+        """Publish the status changes of each window as one batched message."""
+        while True:
+            await asyncio.sleep(self.status_updater.window)
+            try:
+                await asyncio.to_thread(self.status_updater.flush)
+            except Exception as e:
+                logger.error(f"Routine Manager: status publish failed with error {e}")
+
+    async def stats_coroutine(self):
         while True:
-            logger.info("Routine Manager: Main coroutine loop")
-
-            for routine in self.routines:
-                logger.debug(f"Routine Manager {routine.name}: Update statuses")
-                self.status_updater.task_status_updater(routine.name, routine.task.status, routine.task.id)
-                self.status_updater.routine_status_updater(routine.name, routine.status)
-                if routine.task.status in [TaskInstanceStatus.DONE, TaskInstanceStatus.ERROR, TaskInstanceStatus.CANCELLED, TaskInstanceStatus.UNKNOWN]:
-                    routine.allow_release_task()
-                logger.debug(f"Routine status: {routine.name}: step ")
-                await routine.step()
-
-            logger.info("Routine Manager: Get commands")
-            raw_command, ack_message = self.command_service.get_commands()
-            logger.info(f"command : {raw_command}")
-            if raw_command is None:
-                logger.info("No new command")
-                await asyncio.sleep(TIME_TO_SLEEP)
-                logger.info("done sleeping")
-                continue
-
-            routine = raw_command.get("routine", None)
-            command = raw_command.get("command", None)
-            if routine not in [routine.name for routine in self.routines]:
-                logger.warning(f"fail to find routine: {routine} in routines: {[routine.name for routine in self.routines]}")
-
-            logger.info(f"Routine Manager: {routine}, {command}")
-            routine = self.get_routine(routine)
-            # Handle unknown routine or command
-            if routine is None:
-                logger.warning(f"Unknown routine or command: {routine}, {command}")
-                ack_message()
-                continue
-
-            # Handle the command
-            if command == "start":
-                logger.info(f"Starting routine: {routine}")
-                await routine.start()
-                                    
-            elif command == "cancel":
-                logger.info(f"Cancelling routine: {routine}")
-                await routine.cancel()
-
-            elif command == "execute":
-                logger.info(f"Executing routine: {routine}")
-                await routine.execute()
-                
-            else:
-                logger.warning(f"Unknown command: {command}")
-
-            ack_message()
\ No newline at end of file
+            await asyncio.sleep(STATS_INTERVAL)
+            for name, stats in self.get_stats().items():
+                logger.info(f"Routine Manager: {name} stats {stats}")
+
+    async def command_coroutine(self):
+        await self.command_service.start()
+        try:
+            while True:
+                commands = await self.command_service.get_commands()
+                logger.info(f"Routine Manager: {len(commands)} new commands")
+                for raw_command, ack_message in commands:
+                    logger.info(f"command : {raw_command}")
+                    try:
+                        result = await self.handle_command(raw_command)
+                    except Exception as e:
+                        logger.error(f"Routine Manager: command {raw_command} failed: {e}")
+                        result = {"status": "error", "error": str(e)}
+                    ack_message(result)
+        finally:
+            await self.command_service.close()
+
+    async def handle_command(self, raw_command: Dict[str, Any]) -> Dict[str, Any]:
+        """Apply a command, returns its result (sent back to the sender when it waits for a reply)."""
+        routine = raw_command.get("routine", None)
+        command = raw_command.get("command", None)
+        if routine not in self.routines_by_name:
+            logger.warning(f"fail to find routine: {routine} in routines: {[routine.name for routine in self.routines]}")
+
+        logger.info(f"Routine Manager: {routine}, {command}")
+        routine = self.get_routine(routine)
+        # Handle unknown routine or command
+        if routine is None:
+            logger.warning(f"Unknown routine or command: {routine}, {command}")
+            return {"status": "error", "error": "Unknown routine"}
+
+        # Handle the command
+        if command == "start":
+            logger.info(f"Starting routine: {routine}")
+            await routine.start()
+                                
+        elif command == "cancel":
+            logger.info(f"Cancelling routine: {routine}")
+            await routine.cancel()
+
+        elif command == "execute":
+            logger.info(f"Executing routine: {routine}")
+            await routine.execute()
+            
+        else:
+            logger.warning(f"Unknown command: {command}")
+            return {"status": "error", "error": "Unknown command"}
+
+        self.scheduler.wake(routine.name)
+        return {"status": "ok", "routine": routine.name, "routine_status": routine.status}
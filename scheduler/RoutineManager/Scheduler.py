@@ -0,0 +1,105 @@
+import asyncio
+import heapq
+import itertools
+import logging
+import time
+from collections.abc import Awaitable, Callable
+from typing import Dict, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+
+class Scheduler:
+    """
+    Event driven scheduler backed by a min-heap of next-due times.
+
+    Every key (routine name) has at most one live entry in the heap. Re-scheduling
+    a key bumps its generation and the older heap entry is skipped when popped
+    (lazy deletion), so `schedule` and `wake` are O(log n).
+    The run loop sleeps until the earliest due time, or until `wake` is called.
+    """
+    def __init__(self) -> None:
+        self._heap: List[Tuple[float, int, int, str]] = []
+        self._generations: Dict[str, int] = {}
+        self._counter = itertools.count()
+        self._wakeup: Optional[asyncio.Event] = None
+        self._loop: Optional[asyncio.AbstractEventLoop] = None
+
+    def schedule(self, key: str, due: Optional[float]) -> None:
+        """
+        Schedule `key` to run at `due` (epoch seconds).
+        `due=None` removes any pending entry, the key will run only after `wake`.
+        """
+        generation = self._generations.get(key, 0) + 1
+        self._generations[key] = generation
+        if due is None:
+            logger.debug(f"Scheduler: {key} waits for an event")
+            return
+        heapq.heappush(self._heap, (due, next(self._counter), generation, key))
+        logger.debug(f"Scheduler: {key} scheduled in {due - time.time():.3f}s")
+        self._notify()
+
+    def wake(self, key: str) -> None:
+        """Run `key` as soon as possible. Safe to call from other threads."""
+        if self._loop is not None and self._is_other_thread():
+            self._loop.call_soon_threadsafe(self.schedule, key, time.time())
+            return
+        self.schedule(key, time.time())
+
+    def cancel(self, key: str) -> None:
+        self.schedule(key, None)
+
+    def next_due(self) -> Optional[float]:
+        self._drop_stale()
+        if not self._heap:
+            return None
+        return self._heap[0][0]
+
+    def pop_due(self, now: Optional[float] = None) -> List[str]:
+        """Pop every key that is due at `now`, in due order."""
+        if now is None:
+            now = time.time()
+        due_keys = []
+        while self._heap and self._heap[0][0] <= now:
+            _due, _seq, generation, key = heapq.heappop(self._heap)
+            if self._generations.get(key) != generation:
+                continue
+            # Consumed: a new entry is required to run the key again
+            self._generations[key] = generation + 1
+            due_keys.append(key)
+        return due_keys
+
+    async def run(self, handler: Callable[[str], Awaitable[None]]) -> None:
+        self._loop = asyncio.get_running_loop()
+        self._wakeup = asyncio.Event()
+        logger.info("Scheduler: started")
+        while True:
+            for key in self.pop_due():
+                try:
+                    await handler(key)
+                except Exception as e:
+                    logger.error(f"Scheduler: handler failed for {key} with error {e}", exc_info=True)
+
+            next_due = self.next_due()
+            timeout = None if next_due is None else max(0.0, next_due - time.time())
+            self._wakeup.clear()
+            if timeout == 0.0:
+                continue
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), timeout=timeout)
+            except asyncio.TimeoutError:
+                pass
+
+    def _drop_stale(self) -> None:
+        while self._heap and self._generations.get(self._heap[0][3]) != self._heap[0][2]:
+            heapq.heappop(self._heap)
+
+    def _notify(self) -> None:
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    def _is_other_thread(self) -> bool:
+        try:
+            return asyncio.get_running_loop() is not self._loop
+        except RuntimeError:
+            return True
@@ -0,0 +1,25 @@
+import logging
+from collections.abc import Callable
+from typing import Any, Dict
+
+logger = logging.getLogger(__name__)
+
+_stats_providers: Dict[str, Callable[[], Dict[str, Any]]] = {}
+
+
+def register_stats_provider(name: str, provider: Callable[[], Dict[str, Any]]) -> None:
+    """
+    Register a function whose stats are logged under `name` with the scheduler statistics,
+    e.g. for a resource shared by the routines (HTTP client, caches).
+    """
+    _stats_providers[name] = provider
+
+
+def get_provided_stats() -> Dict[str, Dict[str, Any]]:
+    stats = {}
+    for name, provider in _stats_providers.items():
+        try:
+            stats[name] = provider()
+        except Exception as e:
+            logger.error(f"Stats: {name} stats failed with error {e}")
+    return stats
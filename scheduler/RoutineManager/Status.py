@@ -17,6 +17,7 @@ class TaskInstanceStatus:
     DONE = "done"
     ERROR = "error"
     CANCELLED = "cancelled"
+    TIMEOUT = "timeout" # Task exceeded the routine timeout_limit and was abandoned
     UNKNOWN = "unknown"
 
 class TriggerInstanceStatus:
@@ -1,15 +1,49 @@
 import logging
+import os
+import threading
 import time
-from .rabbitMQ import send_message
+from .rabbitMQ import broadcast_message, get_publisher
 from .Status import TaskInstanceStatus
-from typing import Optional
+from typing import Any, Dict, Optional, Tuple
 
 logger = logging.getLogger(__name__)
 
+STATUS_EXCHANGE = os.environ.get("STATUS_EXCHANGE", "status_updates") # fanout, every server replica binds its own queue
+STATUS_BATCH_WINDOW_MS = int(os.environ.get("STATUS_BATCH_WINDOW_MS", 250)) # status changes are published once per window
+STATUS_SYNC_INTERVAL = float(os.environ.get("STATUS_SYNC_INTERVAL", 60)) # seconds between full state batches
+
 class StatusUpdater:
-    def __init__(self):
+    """
+    Collects routine and task status changes and publishes them as one `status_batch` message per window.
+    Changes are coalesced per routine / task: only the latest status of each one within a window is sent.
+
+    Batches go to a fanout exchange, so each server replica sees every change. Every `sync_interval`
+    the batch also carries the latest status of every routine and of its last task: a replica that
+    started after a change still converges (the server drops updates it already has by their epoch).
+    """
+    def __init__(self, window_ms: int = STATUS_BATCH_WINDOW_MS, sync_interval: float = STATUS_SYNC_INTERVAL):
+        self.window = window_ms / 1000
+        self.sync_interval = sync_interval
         self.routines_current_status = {}
         self.tasks_current_status = {}
+        self.pending: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        # latest update of each routine and of the last task of each routine, for the full state batches
+        self.latest: Dict[Tuple[str, Any], Dict[str, Any]] = {}
+        self.last_sync_at = time.monotonic()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.changes = 0
+        self.batches = 0
+        self.updates_sent = 0
+
+    def _record(self, key: Tuple[str, Any], update: Dict[str, Any]) -> None:
+        with self._lock:
+            # pop first so the batch keeps the order of the latest changes
+            self.pending.pop(key, None)
+            self.pending[key] = update
+            self.latest[(f"{key[0]}_of", update["routine"])] = update
+            self.changes += 1
 
     def task_status_updater(
         self,
@@ -22,9 +56,8 @@ class StatusUpdater:
         if task_id is None:
             return True
         if self.tasks_current_status.get(task_id, None) != status:
-            logger.debug(f"task_status_updater - {routine_name} task_id {task_id} updating status to {status}")
-            send_message(
-                "status_updates",
+            self._record(
+                ("task", task_id),
                 {
                     "type": "task_status",
                     "routine": routine_name,
@@ -34,7 +67,7 @@ class StatusUpdater:
                 }
             )
             self.tasks_current_status[task_id] = status
-            logger.info(f"task_status_updater - {routine_name} task_id {task_id} updated status to {status}")
+            logger.info(f"task_status_updater - {routine_name} task_id {task_id} status changed to {status}")
         return True
     
     def routine_status_updater(
@@ -43,9 +76,8 @@ class StatusUpdater:
         status: str
     ) -> bool:
         if self.routines_current_status.get(routine_name, None) != status:
-            logger.debug(f"routine_status_updater - {routine_name} updating routine status to {status}")
-            send_message(
-                "status_updates",
+            self._record(
+                ("routine", routine_name),
                 {
                     "type": "routine_status",
                     "routine": routine_name,
@@ -54,6 +86,33 @@ class StatusUpdater:
                 }
             )
             self.routines_current_status[routine_name] = status
-            logger.info(f"routine_status_updater - {routine_name} updated routine status to {status}")
+            logger.info(f"routine_status_updater - {routine_name} routine status changed to {status}")
         return True
-    
\ No newline at end of file
+
+    def flush(self) -> int:
+        """Publish the pending changes as a single message, returns the number of updates sent."""
+        sync = time.monotonic() - self.last_sync_at >= self.sync_interval
+        with self._lock:
+            batch, self.pending = self.pending, {}
+            updates = list(batch.values())
+            if sync:
+                included = {id(update) for update in updates}
+                updates += [update for update in self.latest.values() if id(update) not in included]
+        if sync:
+            self.last_sync_at = time.monotonic()
+        if not updates:
+            get_publisher().flush() # services the idle connection (heartbeats)
+            return 0
+        broadcast_message(STATUS_EXCHANGE, {"type": "status_batch", "updates": updates})
+        self.batches += 1
+        self.updates_sent += len(updates)
+        logger.debug(f"StatusUpdater: published {len(updates)} status updates")
+        return len(updates)
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "changes": self.changes,
+            "batches": self.batches,
+            "updates_sent": self.updates_sent,
+            "updates_per_batch": self.updates_sent / self.batches if self.batches else 0.0,
+        }
@@ -1,26 +1,33 @@
 from collections.abc import Awaitable, Callable
 from typing import Optional
 from .Executor import Executor
+from .ProcessPool import TaskDescriptor
 from .Status import TaskInstanceStatus
 import asyncio
 import logging
 
 logger = logging.getLogger(__name__)
 
+EXECUTORS = ("thread", "process")
+
 class Task(Executor):
     def __init__(
             self,
             name: str,
             function: Optional[Callable[[], bool]] = None,         
             async_function: Optional[Callable[[], Awaitable[bool]]] = None, 
+            executor: str = "thread", # "thread" (shared worker pool) or "process" (process pool, for CPU bound functions)
         ) -> None:
         self.name = name
         self.is_async_function = async_function is not None
         self.function = async_function if self.is_async_function else function
+        self.set_executor(executor)
         self.status = TaskInstanceStatus.PENDING
         self.is_set = False
         self.id = None
         self.job = None
+        self.done_callback = None
+        self.concurrency_key = name
         self.task_db_instance = None
         self.update_task_status = None
         self.update_task_error = None
@@ -48,6 +55,14 @@ class Task(Executor):
             self.update_task_error(error)
             logger.error(f"Task {self.id} : Task error updated")
 
+    def _set_timeout(self, timeout_limit: float):
+        logger.error(f"Task {self.id} : Task timed out after {timeout_limit}s")
+        self.status = TaskInstanceStatus.TIMEOUT
+        if self.is_set:
+            self.update_task_error(f"task {self.name}:{self.id} timed out after {timeout_limit}s")
+            self.update_task_status(TaskInstanceStatus.TIMEOUT)
+            logger.error(f"Task {self.id} : Task timeout updated")
+
     def is_busy(self) -> bool:
         if self.job is not None:
             return not self.job.done()
@@ -64,6 +79,17 @@ class Task(Executor):
         self.job = None
         return True
 
+    async def timeout(self, timeout_limit: float) -> bool:
+        """
+        Abandon a job that exceeded its time limit. The asyncio job is cancelled without waiting for it:
+        a blocking function already running in a worker thread cannot be interrupted and is left to finish.
+        """
+        if self.is_busy():
+            self.job.cancel()
+        self._set_timeout(timeout_limit)
+        self.job = None
+        return True
+
     async def get_result(self) -> bool:
         try:
             result = await self.job
@@ -94,12 +120,28 @@ class Task(Executor):
             self.job = asyncio.create_task(self.function())
         else:
             self.job = asyncio.create_task(self.async_function())
+        self.job.add_done_callback(self._on_job_done)
         logger.debug(f"Task {self.id} : Task executing")
         return True       
         
+    def set_executor(self, executor: str) -> None:
+        """
+        Select where the sync function runs. The process executor validates up front that
+        the function and its arguments can be pickled, rather than failing in the pool.
+        """
+        if executor not in EXECUTORS:
+            raise ValueError(f"Task {self.name} : unknown executor {executor}, expected one of {EXECUTORS}")
+        if executor == "process" and self.is_async_function:
+            raise ValueError(f"Task {self.name} : async functions run on the event loop, the process executor requires a sync function")
+        self.executor = executor
+        self.descriptor = None
+        if executor == "process" and self.function is not None:
+            self.descriptor = TaskDescriptor(self.function)
+
     def set(self, task_db_instance, gen_handlers, fuctnion: Optional[Callable[[], bool]]=None):
         if fuctnion is not None:
             self.function = fuctnion
+            self.set_executor(self.executor)
         if self.function is None:
             raise ValueError("Task function is not set")
         
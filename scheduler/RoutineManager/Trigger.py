@@ -19,6 +19,8 @@ class Trigger(Executor):
         self.function = async_function if self.is_async_function else function
         self.status = TriggerInstanceStatus.PENDING
         self.job = None
+        self.done_callback = None
+        self.concurrency_key = name
 
     def is_busy(self) -> bool:
         if self.job is not None:
@@ -27,8 +29,11 @@ class Trigger(Executor):
     
     async def cancel(self) -> bool:
         if self.is_busy():
-            self.job.cancel()
-            await self.job
+            try:
+                self.job.cancel()
+                await self.job  # This will raise CancelledError if the trigger was canceled
+            except asyncio.CancelledError:
+                logger.debug(f"Trigger {self.name} was successfully canceled.")
         self.status = TriggerInstanceStatus.CANCELLED
         self.job = None
         return True
@@ -56,6 +61,7 @@ class Trigger(Executor):
             self.job = asyncio.create_task(self.function())
         else:
             self.job = asyncio.create_task(self.async_function())
+        self.job.add_done_callback(self._on_job_done)
         self.status = TriggerInstanceStatus.RUNNING
         logger.debug(f"Trigger {self.name} : Trigger executing asynchoronously")
         return True
@@ -0,0 +1,101 @@
+import logging
+import time
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional
+
+logger = logging.getLogger(__name__)
+
+
+class TaskWatch:
+    def __init__(self, routine_name: str, task_id: Optional[int], timeout_limit: float, started_at: float) -> None:
+        self.routine_name = routine_name
+        self.task_id = task_id
+        self.timeout_limit = timeout_limit
+        self.started_at = started_at
+
+    @property
+    def deadline(self) -> float:
+        return self.started_at + self.timeout_limit
+
+    def to_dict(self, now: float) -> Dict[str, Any]:
+        duration = now - self.started_at
+        return {
+            "routine": self.routine_name,
+            "task_id": self.task_id,
+            "duration": duration,
+            "timeout_limit": self.timeout_limit,
+            "limit_usage": duration / self.timeout_limit if self.timeout_limit else None,
+        }
+
+    def __repr__(self) -> str:
+        return f"<TaskWatch | {self.routine_name} | {self.task_id} | {self.timeout_limit}>"
+
+
+class Watchdog:
+    """
+    Tracks the start time of every running Task.job against its routine's timeout_limit.
+    The routine asks the watchdog whether its task expired when the scheduler wakes it at the deadline,
+    and reports the task run time against the limit when the task is released.
+
+    A timed-out task is abandoned, not stopped: a sync function already running in a worker thread
+    cannot be interrupted and keeps its thread until it returns, while the routine's WorkerPool slot
+    is released. A routine whose tasks keep timing out can so run more than its concurrency limit.
+    """
+    def __init__(self, history_size: int = 100) -> None:
+        self.watched: Dict[str, TaskWatch] = {}
+        self.history: Deque[Dict[str, Any]] = deque(maxlen=history_size)
+
+        # Metrics
+        self.finished = 0
+        self.timed_out = 0
+
+    def watch(self, routine_name: str, task_id: Optional[int], timeout_limit: float) -> float:
+        """Start watching the task of a routine, returns the deadline (epoch)."""
+        task_watch = TaskWatch(routine_name, task_id, timeout_limit, time.time())
+        self.watched[routine_name] = task_watch
+        logger.debug(f"Watchdog: watching {task_watch}")
+        return task_watch.deadline
+
+    def get_deadline(self, routine_name: str) -> Optional[float]:
+        task_watch = self.watched.get(routine_name, None)
+        if task_watch is None:
+            return None
+        return task_watch.deadline
+
+    def is_expired(self, routine_name: str, now: Optional[float] = None) -> bool:
+        deadline = self.get_deadline(routine_name)
+        if deadline is None:
+            return False
+        if now is None:
+            now = time.time()
+        return now >= deadline
+
+    def release(self, routine_name: str, timed_out: bool = False) -> Optional[Dict[str, Any]]:
+        """Stop watching the task of a routine and report its run time against the limit."""
+        task_watch = self.watched.pop(routine_name, None)
+        if task_watch is None:
+            return None
+        report = task_watch.to_dict(time.time())
+        report["timed_out"] = timed_out
+        self.history.append(report)
+        self.finished += 1
+        self.timed_out += int(timed_out)
+        log = logger.warning if timed_out else logger.info
+        log(f"Watchdog: routine {routine_name} task {task_watch.task_id} ran {report['duration']:.1f}s "
+            f"of {task_watch.timeout_limit}s limit{' - timed out' if timed_out else ''}")
+        return report
+
+    def get_report(self) -> List[Dict[str, Any]]:
+        """Running tasks (with their elapsed time) followed by the latest finished ones."""
+        now = time.time()
+        running = [dict(task_watch.to_dict(now), running=True) for task_watch in self.watched.values()]
+        return running + list(self.history)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Counts of the finished and timed-out tasks, with the tasks still running."""
+        now = time.time()
+        return {
+            "finished": self.finished,
+            "timed_out": self.timed_out,
+            "running": [task_watch.to_dict(now) for task_watch in self.watched.values()],
+        }
@@ -0,0 +1,116 @@
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+import functools
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+WORKER_POOL_SIZE = int(os.environ.get("WORKER_POOL_SIZE", 8)) # global limit of concurrently running sync functions
+WORKER_POOL_ROUTINE_CONCURRENCY = int(os.environ.get("WORKER_POOL_ROUTINE_CONCURRENCY", 2)) # per-routine limit
+
+
+class WorkerPool:
+    """
+    Shared, bounded thread pool running the synchronous Task and Trigger functions off the event loop.
+
+    The pool size is the global concurrency limit, and an asyncio semaphore per key (routine)
+    bounds how many of the pool threads a single routine can queue for.
+    Queue wait is measured from the call to `run` until a thread picks the function up.
+    Note: cancelling `run` abandons the call, a function already running in a thread runs to completion.
+    """
+    def __init__(self, max_workers: int = WORKER_POOL_SIZE, max_per_key: int = WORKER_POOL_ROUTINE_CONCURRENCY) -> None:
+        self.max_workers = max_workers
+        self.max_per_key = max_per_key
+        self.executor = ThreadPoolExecutor(max_workers=max_workers, thread_name_prefix="routine-worker")
+        self._semaphores: Dict[str, asyncio.Semaphore] = {}
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.submitted = 0
+        self.started = 0
+        self.abandoned = 0
+        self.completed = 0
+        self.failed = 0
+        self.active = 0
+        self.queue_wait_total = 0.0
+        self.queue_wait_max = 0.0
+        self.run_time_total = 0.0
+
+    def _get_semaphore(self, key: str) -> asyncio.Semaphore:
+        semaphore = self._semaphores.get(key, None)
+        if semaphore is None:
+            semaphore = asyncio.Semaphore(self.max_per_key)
+            self._semaphores[key] = semaphore
+        return semaphore
+
+    async def run(self, key: str, function: Callable[..., Any], *args, **kwargs) -> Any:
+        submitted_at = time.monotonic()
+        state = {"started": False}
+        with self._lock:
+            self.submitted += 1
+        try:
+            async with self._get_semaphore(key):
+                loop = asyncio.get_running_loop()
+                call = functools.partial(self._call, state, submitted_at, function, *args, **kwargs)
+                return await loop.run_in_executor(self.executor, call)
+        except asyncio.CancelledError:
+            with self._lock:
+                if not state["started"]:
+                    self.abandoned += 1
+            raise
+
+    def _call(self, state: Dict[str, bool], submitted_at: float, function: Callable[..., Any], *args, **kwargs) -> Any:
+        started_at = time.monotonic()
+        queue_wait = started_at - submitted_at
+        with self._lock:
+            state["started"] = True
+            self.started += 1
+            self.active += 1
+            self.queue_wait_total += queue_wait
+            self.queue_wait_max = max(self.queue_wait_max, queue_wait)
+        try:
+            return function(*args, **kwargs)
+        except Exception:
+            with self._lock:
+                self.failed += 1
+            raise
+        finally:
+            with self._lock:
+                self.active -= 1
+                self.completed += 1
+                self.run_time_total += time.monotonic() - started_at
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "max_workers": self.max_workers,
+                "max_per_routine": self.max_per_key,
+                "active": self.active,
+                "queued": self.submitted - self.started - self.abandoned,
+                "saturation": self.active / self.max_workers,
+                "submitted": self.submitted,
+                "completed": self.completed,
+                "failed": self.failed,
+                "abandoned": self.abandoned,
+                "queue_wait_avg": self.queue_wait_total / self.started if self.started else 0.0,
+                "queue_wait_max": self.queue_wait_max,
+                "run_time_avg": self.run_time_total / self.completed if self.completed else 0.0,
+            }
+
+    def shutdown(self, wait: bool = False) -> None:
+        self.executor.shutdown(wait=wait)
+
+
+_worker_pool: Optional[WorkerPool] = None
+
+def get_worker_pool() -> WorkerPool:
+    global _worker_pool
+    if _worker_pool is None:
+        _worker_pool = WorkerPool()
+        logger.info(f"WorkerPool: created with {_worker_pool.max_workers} threads, {_worker_pool.max_per_key} per routine")
+    return _worker_pool
@@ -1,51 +1,231 @@
-import json
+import atexit
 import logging
 import os
 import pika
+import threading
 import time
-from typing import Any, Dict, Optional
-from pika.adapters.blocking_connection import BlockingConnection
+from collections import deque
+from typing import Any, Deque, Dict, List, Optional, Set, Tuple
+from pika.adapters.blocking_connection import BlockingChannel, BlockingConnection
+from . import wire
 
 logger = logging.getLogger(__name__)
 
-def get_connection() -> BlockingConnection:
+PUBLISHER_BUFFER_SIZE = int(os.environ.get("PUBLISHER_BUFFER_SIZE", 10000)) # messages kept while disconnected
+PUBLISHER_CONFIRMS = os.environ.get("PUBLISHER_CONFIRMS", "false").lower() == "true" # wait for the broker ack of each message
+PUBLISHER_RECONNECT_DELAY = float(os.environ.get("PUBLISHER_RECONNECT_DELAY", 1))
+PUBLISHER_MAX_RECONNECT_DELAY = float(os.environ.get("PUBLISHER_MAX_RECONNECT_DELAY", 30))
+PUBLISHER_TIMEOUT = float(os.environ.get("PUBLISHER_TIMEOUT", 5)) # socket / blocked connection timeout
+
+def get_parameters(**kwargs) -> pika.ConnectionParameters:
     user = os.environ.get("RABBITMQ_USER")
     password = os.environ.get("RABBITMQ_PASS")
     credentials = pika.PlainCredentials(user, password)
-    parameters = pika.ConnectionParameters("rabbitmq", 5672, '/', credentials)
-    for attempt in range(5):  # Retry up to 5 times
+    return pika.ConnectionParameters("rabbitmq", 5672, '/', credentials, **kwargs)
+
+
+class Publisher:
+    """
+    Long-lived publisher: one connection and one channel reused for every message,
+    with the declared queues and exchanges cached.
+
+    Messages are buffered (bounded, oldest dropped first) and published in order. When the broker
+    is unreachable, `publish` returns immediately with the message kept in the buffer, and reconnection
+    is attempted with exponential backoff on the next publish/flush.
+    With confirms, the channel is in confirm mode: a message is only dropped from the buffer once the broker
+    acked it (at-least-once), a nacked one is published again on the next flush and an unroutable one is dropped.
+    BlockingConnection is not thread-safe, a lock serializes the callers.
+    server/rabbitMQ.py has a copy of this class (the services are built from separate directories), keep them in sync.
+    """
+    def __init__(
+            self,
+            parameters: Optional[pika.ConnectionParameters] = None,
+            confirms: bool = PUBLISHER_CONFIRMS,
+            buffer_size: int = PUBLISHER_BUFFER_SIZE,
+            reconnect_delay: float = PUBLISHER_RECONNECT_DELAY,
+            max_reconnect_delay: float = PUBLISHER_MAX_RECONNECT_DELAY,
+            wire_format: Optional[str] = None
+        ) -> None:
+        self.parameters = parameters
+        self.confirms = confirms
+        # ((exchange, routing key), body, content type), the default exchange routes to the queue named by the key
+        self.buffer: Deque[Tuple[Tuple[str, str], bytes, str]] = deque(maxlen=buffer_size)
+        self.wire_format = wire_format
+        self.reconnect_delay = reconnect_delay
+        self.max_reconnect_delay = max_reconnect_delay
+        self.connection: Optional[BlockingConnection] = None
+        self.channel: Optional[BlockingChannel] = None
+        self.declared: Set[Tuple[str, str]] = set()
+        self._lock = threading.RLock()
+        self._failures = 0
+        self._next_connect_at = 0.0
+
+        # Metrics
+        self.published = 0
+        self.dropped = 0
+        self.connects = 0
+        self.publish_errors = 0
+
+    def is_connected(self) -> bool:
+        return self.connection is not None and self.connection.is_open and self.channel is not None and self.channel.is_open
+
+    def _connect(self) -> bool:
+        if self.is_connected():
+            return True
+        if time.monotonic() < self._next_connect_at:
+            return False
+        self._close()
+        try:
+            logger.debug("Publisher: connecting to RabbitMQ")
+            # fail fast: a slow or blocked broker must not stall the caller, messages stay buffered
+            self.connection = pika.BlockingConnection(self.parameters or get_parameters(
+                socket_timeout=PUBLISHER_TIMEOUT,
+                blocked_connection_timeout=PUBLISHER_TIMEOUT
+            ))
+            self.channel = self.connection.channel()
+            if self.confirms:
+                self.channel.confirm_delivery()
+        except pika.exceptions.AMQPError as e:
+            self._close()
+            delay = self._backoff()
+            logger.warning(f"Publisher: connection failed ({e}), {len(self.buffer)} messages buffered, retrying in {delay:.1f}s")
+            return False
+        self._failures = 0
+        self.connects += 1
+        logger.info(f"Publisher: connected to RabbitMQ (connection {self.connects})")
+        return True
+
+    def _backoff(self) -> float:
+        self._failures += 1
+        delay = min(self.max_reconnect_delay, self.reconnect_delay * 2 ** (self._failures - 1))
+        self._next_connect_at = time.monotonic() + delay
+        return delay
+
+    def _close(self) -> None:
+        connection, self.connection, self.channel = self.connection, None, None
+        self.declared.clear()
+        if connection is not None and connection.is_open:
+            try:
+                connection.close()
+            except pika.exceptions.AMQPError:
+                pass
+
+    def _declare(self, exchange: str, routing_key: str) -> None:
+        if (exchange, routing_key) in self.declared:
+            return
+        if exchange:
+            self.channel.exchange_declare(exchange=exchange, exchange_type="fanout")
+        else:
+            self.channel.queue_declare(queue=routing_key)
+        self.declared.add((exchange, routing_key))
+
+    def _publish_next(self) -> None:
+        (exchange, routing_key), body, content_type = self.buffer[0]
+        self._declare(exchange, routing_key)
         try:
-            logger.debug(f"Attempting to connect to RabbitMQ, attempt {attempt + 1}")
-            connection = pika.BlockingConnection(parameters)
-            logger.debug("Connection to RabbitMQ established")
-            return connection
-        except pika.exceptions.AMQPConnectionError as e:
-            logger.debug(f"Connection failed: {e}. Retrying in 5 seconds...")
-            time.sleep(5)
+            # with confirms, returns once the broker acked the message
+            self.channel.basic_publish(
+                exchange=exchange,
+                routing_key=routing_key,
+                body=body,
+                properties=pika.BasicProperties(content_type=content_type),
+                mandatory=self.confirms and not exchange # a fanout exchange with no replica bound is expected
+            )
+        except pika.exceptions.UnroutableError:
+            # returned by the broker, publishing it again would not route it either
+            self.buffer.popleft()
+            self.dropped += 1
+            logger.error(f"Publisher: message to {routing_key} is unroutable, dropping it")
+            return
+        self.buffer.popleft()
+        self.published += 1
+
+    def flush(self) -> int:
+        """Publish the buffered messages, returns how many were published."""
+        with self._lock:
+            published = 0
+            for _attempt in range(2): # a connection dropped while idle is re-opened once right away
+                if not self.buffer and not self.is_connected():
+                    return published
+                if not self._connect():
+                    return published
+                try:
+                    self.connection.process_data_events(time_limit=0) # heartbeats, on every flush even when idle
+                    while self.buffer:
+                        self._publish_next()
+                        published += 1
+                    return published
+                except pika.exceptions.NackError as e:
+                    # the broker refused the message, it stays first in the buffer for the next flush
+                    self.publish_errors += 1
+                    logger.warning(f"Publisher: message nacked by the broker ({e}), {len(self.buffer)} messages buffered")
+                    return published
+                except pika.exceptions.AMQPError as e:
+                    self.publish_errors += 1
+                    logger.warning(f"Publisher: publish failed ({e}), reconnecting")
+                    self._close()
+            self._backoff()
+            return published
+
+    def publish(self, queue_name: str, message: Any) -> bool:
+        """Queue a message and try to publish it, returns False if it stays buffered."""
+        return self.publish_many(queue_name, [message])
+
+    def publish_many(self, queue_name: str, messages: List[Any], exchange: str = '') -> bool:
+        """
+        Queue messages and publish them together.
+        With an `exchange`, the messages go to that fanout exchange instead of the queue.
+        """
+        destination = (exchange, '' if exchange else queue_name)
+        with self._lock:
+            for message in messages:
+                if len(self.buffer) == self.buffer.maxlen:
+                    self.dropped += 1
+                    logger.error(f"Publisher: buffer full, dropping oldest message to {self.buffer[0][0]}")
+                self.buffer.append((destination, *wire.encode(message, self.wire_format)))
+            self.flush()
+            return not self.buffer
 
-    logger.error("Failed to connect to RabbitMQ after 5 attempts")
-    raise Exception("Failed to connect to RabbitMQ after 5 attempts")
+    def close(self) -> None:
+        with self._lock:
+            self.flush()
+            if self.buffer:
+                logger.error(f"Publisher: closing with {len(self.buffer)} unpublished messages")
+            self._close()
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "connected": self.is_connected(),
+            "buffered": len(self.buffer),
+            "published": self.published,
+            "dropped": self.dropped,
+            "connects": self.connects,
+            "publish_errors": self.publish_errors,
+        }
+
+
+_publisher: Optional[Publisher] = None
+_publisher_lock = threading.Lock()
+
+def get_publisher() -> Publisher:
+    global _publisher
+    if _publisher is None:
+        with _publisher_lock:
+            if _publisher is None:
+                _publisher = Publisher()
+                atexit.register(_publisher.close)
+    return _publisher
 
 def send_message(queue_name: str, message: str) -> None:
     logger.debug(f"Sending message to queue {queue_name}: {message}")
-    connection = get_connection()
-    channel = connection.channel()
-    channel.queue_declare(queue=queue_name)
-    channel.basic_publish(
-        exchange='', 
-        routing_key=queue_name, 
-        body=json.dumps(message)
-    )
-    connection.close()
-    logger.debug(f"Message sent to queue {queue_name}")
-
-def receive_message(queue_name: str) -> Optional[Dict[str,Any]]:
-    logger.debug(f"Receiving message from queue {queue_name}")
-    connection = get_connection()
-    channel = connection.channel()
-    channel.queue_declare(queue=queue_name)
-    method_frame, _header_frame, body = channel.basic_get(queue=queue_name, auto_ack=False)
-    def ack_message():
-        channel.basic_ack(delivery_tag=method_frame.delivery_tag)
-        connection.close()
-    return json.loads(body) if body else None, ack_message
+    if get_publisher().publish(queue_name, message):
+        logger.debug(f"Message sent to queue {queue_name}")
+    else:
+        logger.debug(f"Message buffered for queue {queue_name}")
+
+def broadcast_message(exchange_name: str, message: Any) -> None:
+    """Publish to a fanout exchange: every queue bound to it gets a copy."""
+    if get_publisher().publish_many('', [message], exchange=exchange_name):
+        logger.debug(f"Message sent to exchange {exchange_name}")
+    else:
+        logger.debug(f"Message buffered for exchange {exchange_name}")
@@ -1,8 +1,9 @@
 from RoutineManager import Routine, Task, Trigger
+from RoutineManager.WorkerPool import get_worker_pool
 from Routines.resources.Stocks import Stock
 from .resources.Stocks.yfinance_functions import is_traded_today, get_recommendations, get_stock_daily, get_stock_data
-from .resources.Stocks import add_stock_summary, is_stock_updated_today, get_stocks_list
-import asyncio
+from .resources.Stocks import add_stock_summary, is_stock_updated_today
+from .resources.Stocks import aio as stocks_aio
 import logging
 from datetime import datetime, timedelta, timezone
 
@@ -73,10 +74,10 @@ def stock_task(stock: Stock) -> bool:
         logger.info(f"Stock summary already added for {stock.symbol}: {datetime.now()}")
     
 async def task() -> bool:
-    all_stocks = get_stocks_list()
+    all_stocks = await stocks_aio.get_stocks_list()
     for stock in all_stocks:
         try:
-            await asyncio.to_thread(stock_task(stock))
+            await get_worker_pool().run(stocks_daily_routine.name, stock_task, stock)
         except Exception as e:
             logger.error(f"Error adding stock summary for {stock.symbol} with error: {e}")
 
@@ -1,7 +1,8 @@
 from RoutineManager import Routine, Task, Trigger
+from RoutineManager.WorkerPool import get_worker_pool
 from .resources.Stocks.yfinance_functions import get_last_earnings
-from .resources.Stocks import add_stock_earnings, get_stock_last_earning_date, get_stocks_list, Stock
-import asyncio
+from .resources.Stocks import add_stock_earnings, get_stock_last_earning_date, Stock
+from .resources.Stocks import aio as stocks_aio
 import logging
 from datetime import datetime, timedelta, timezone
 
@@ -31,9 +32,9 @@ def stock_trigger(stock: Stock, now: datetime) -> bool:
         
 async def trigger_earnings() -> bool:
     now = datetime.now(timezone.utc)
-    stocks_list = get_stocks_list()
+    stocks_list = await stocks_aio.get_stocks_list()
     for stock in stocks_list:
-        if await asyncio.to_thread(stock_trigger(stock, now)):
+        if await get_worker_pool().run(stocks_earnings_routine.name, stock_trigger, stock, now):
             return True
     logger.info("StocksEarnings | not triggered")
     return False
@@ -61,9 +62,9 @@ def stock_earnings(stock: Stock) -> None:
         logger.error(f"Error adding stock earnings with symbol {stock.symbol} with error: {e}")
 
 async def task_earnings() -> bool:
-    stocks_list = get_stocks_list()
+    stocks_list = await stocks_aio.get_stocks_list()
     for stock in stocks_list:
-        await asyncio.to_thread(stock_earnings(stock))
+        await get_worker_pool().run(stocks_earnings_routine.name, stock_earnings, stock)
     return True
 
 stocks_earnings_routine = Routine(
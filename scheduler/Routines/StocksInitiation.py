@@ -1,9 +1,9 @@
-import asyncio
 from RoutineManager import Routine, Task, Trigger
+from RoutineManager.WorkerPool import get_worker_pool
 from Routines.resources.Stocks import init_db
 
 async def async_task() -> bool:
-    return await asyncio.to_thread(init_db())
+    return await get_worker_pool().run(stocks_db_init_routine.name, init_db)
 
 stocks_db_init_routine = Routine(
     name="initiate_stocks_db",
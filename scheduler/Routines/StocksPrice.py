@@ -1,8 +1,9 @@
 from typing import Any, Iterable, Optional
 from RoutineManager import Routine, Task, Trigger
-from Routines.resources.Stocks import add_stock_price, get_stocks_list, Stock
+from RoutineManager.WorkerPool import get_worker_pool
+from Routines.resources.Stocks import add_stock_price, Stock
+from Routines.resources.Stocks import aio as stocks_aio
 from Routines.resources.Stocks.yfinance_functions import is_market_open, get_price
-import asyncio
 import logging
 
 
@@ -20,10 +21,10 @@ def add_stock_function(stock: Stock) -> None:
 
 async def get_stocks_price_task(stocks : Optional[Iterable[Any]] = None) -> bool:
     if stocks is None:
-        stocks = get_stocks_list()
+        stocks = await stocks_aio.get_stocks_list()
     try:
         for stock in stocks:
-            await asyncio.to_thread(add_stock_function(stock))
+            await get_worker_pool().run(stocks_price_routine.name, add_stock_function, stock)
     except Exception as e:
         logger.error(f"Error getting stock price with error: {e}")
         return False
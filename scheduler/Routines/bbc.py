@@ -1,4 +1,5 @@
 from .resources.Articles.routine_factory import gen_routine
+from bs4 import SoupStrainer
 
 def parsing_function(soup):
     article_content = ""
@@ -9,6 +10,9 @@ def parsing_function(soup):
     authors = None #soup.find('div', {"data-testid": "byline-new-contributors"}).text
     return article_title, article_content, authors
 
+# the containers parsing_function reads, the rest of the page is not parsed
+parse_only = SoupStrainer(attrs={"data-component": ["headline-block", "text-block"]})
+
 website_feeds = [
     ("news", "https://feeds.bbci.co.uk/news/rss.xml"),
     ("world", "https://feeds.bbci.co.uk/news/world/rss.xml"),
@@ -38,7 +42,8 @@ for identifier, rss_url in website_feeds:
         source='bbc', 
         identifier='{identifier}', 
         time_parse_string='%a, %d %b %Y %H:%M:%S GMT',
-        parsing_function=parsing_function
+        parsing_function=parsing_function,
+        parse_only=parse_only
     )""")
 
 
@@ -1,4 +1,5 @@
 from .resources.Articles.routine_factory import gen_routine
+from bs4 import SoupStrainer
 
 def parsing_function(soup):
     article_title = soup.find('div', class_='headline__wrapper').text
@@ -6,9 +7,13 @@ def parsing_function(soup):
     authors = soup.find('div', class_='headline__sub-container').text
     return article_title, article_content, authors
 
+# the containers parsing_function reads, the rest of the page is not parsed
+parse_only = SoupStrainer(class_=["headline__wrapper", "article__content-container", "headline__sub-container"])
+
 cnn_routine = gen_routine(
     rss_url='http://rss.cnn.com/rss/cnn_topstories.rss',
     source='cnn',
     time_parse_string='%a, %d %b %Y %H:%M:%S GMT',
     parsing_function=parsing_function,
+    parse_only=parse_only,
 )
\ No newline at end of file
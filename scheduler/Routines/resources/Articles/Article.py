@@ -1,7 +1,7 @@
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, ForeignKey, Float
+from sqlalchemy import create_engine, Column, Integer, String, DateTime, Text, ForeignKey, Float, Index
 from sqlalchemy.ext.declarative import declarative_base
 from sqlalchemy.orm import sessionmaker, relationship
 
@@ -9,6 +9,8 @@ Base = declarative_base()
 
 class Article(Base):
     __tablename__ = 'articles'
+    # one row per article of a source, concurrent routines inserting the same link keep one of them
+    __table_args__ = (Index("uq_articles_source_link", "source", "link", unique=True),)
     id = Column("id", Integer, primary_key=True)
     title = Column("title", Text)
     author = Column("author", String(300))
@@ -1,40 +1,125 @@
 from datetime import datetime
 import logging
-from sqlalchemy.exc import SQLAlchemyError
+import os
+import threading
+from typing import Any, Dict, Iterable, List, Optional, Set
+from sqlalchemy import inspect
+from sqlalchemy.dialects import mysql, postgresql, sqlite
+from sqlalchemy.exc import IntegrityError, SQLAlchemyError
+from sqlalchemy.orm import Session
+from RoutineManager.ProcessPool import register_worker_initializer
+from RoutineManager.Stats import register_stats_provider
 from .Article import Article
-from ..DBConnection import generate_engine, generate_session
+from .seen_links import SeenLinks
+from ..DBConnection import get_engine, get_session
 
 logger = logging.getLogger(__name__)
 
+ARTICLES_SEEN_WARM = int(os.environ.get("ARTICLES_SEEN_WARM", 200)) # latest links of a source loaded on its first check
+
+_seen_links: Optional[SeenLinks] = None
+_seen_links_lock = threading.Lock()
+
+def get_seen_links() -> SeenLinks:
+    global _seen_links
+    if _seen_links is None:
+        with _seen_links_lock:
+            if _seen_links is None:
+                _seen_links = SeenLinks()
+    return _seen_links
+
+def _reset_seen_links_in_worker() -> None:
+    global _seen_links
+    _seen_links = None
+
+register_worker_initializer(_reset_seen_links_in_worker)
+
+def get_seen_links_stats() -> Dict[str, Any]:
+    return _seen_links.get_stats() if _seen_links is not None else {}
+
+register_stats_provider("seen_links", get_seen_links_stats)
 
 
 def init_db() -> bool:
-    engine = generate_engine()
+    engine = get_engine()
     Article.metadata.create_all(engine)
-    engine.dispose()
+    # create_all only builds the indexes of new tables: add the unique index to an existing one
+    indexes = {index["name"] for index in inspect(engine).get_indexes(Article.__tablename__)}
+    for index in Article.__table__.indexes:
+        if index.name not in indexes:
+            try:
+                index.create(engine)
+                logger.info(f"init_db | created index {index.name}")
+            except IntegrityError as e:
+                logger.error(f"init_db | could not create index {index.name}, remove the duplicate articles first: {e}")
     return True
 
-def add_article(
-        link: str,
-        title: str, 
-        content: str, 
-        author: str,
-        publication_date: datetime,
-        source: str
-    ) -> None:
-    engine = generate_engine()
-    session = generate_session(engine)
+def _insert_ignoring_duplicates(session: Session, rows: List[Dict[str, Any]]) -> int:
+    """One multi-row INSERT skipping the rows of an existing (source, link), returns the rows inserted."""
+    dialect = session.get_bind().dialect.name
+    table = Article.__table__
+    if dialect == "mysql":
+        statement = mysql.insert(table).values(rows).prefix_with("IGNORE")
+    elif dialect == "sqlite":
+        statement = sqlite.insert(table).values(rows).on_conflict_do_nothing(index_elements=["source", "link"])
+    elif dialect == "postgresql":
+        statement = postgresql.insert(table).values(rows).on_conflict_do_nothing(index_elements=["source", "link"])
+    else:
+        inserted = 0
+        for row in rows:
+            try:
+                with session.begin_nested():
+                    session.execute(table.insert().values(row))
+                inserted += 1
+            except IntegrityError:
+                pass
+        return inserted
+    return session.execute(statement).rowcount
+
+def _column_length(name: str) -> int:
+    return Article.__table__.c[name].type.length
+
+def _check_lengths(row: Dict[str, Any]) -> bool:
+    """
+    Fit the row in its columns, INSERT IGNORE would silently truncate it instead. The author is cut;
+    a link or source too long is rejected, cut it could collide with another article of the source.
+    """
+    for name in ("link", "source"):
+        if len(row[name]) > _column_length(name):
+            logger.error(f"add_articles | rejected {row['link']}: {name} longer than {_column_length(name)} characters")
+            return False
+    if row["author"] and len(row["author"]) > _column_length("author"):
+        logger.warning(f"add_articles | author of {row['link']} truncated to {_column_length('author')} characters")
+        row["author"] = row["author"][:_column_length("author")]
+    return True
+
+def add_articles(articles: List[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    Store a batch of articles (dicts of the add_article arguments) in one transaction.
+    Articles already stored for their source are skipped, the ones whose link or source do not fit
+    their column are rejected; returns the inserted, skipped and rejected counts.
+    """
+    created_at = datetime.now()
+    rows = [
+        {
+            "link": article["link"],
+            "title": article["title"],
+            "content": article["content"],
+            "author": article["author"],
+            "publication_date": article["publication_date"],
+            "source": article["source"],
+            "tags": None,
+            "created_at": created_at,
+        }
+        for article in articles
+    ]
+    rows = [row for row in rows if _check_lengths(row)]
+    rejected = len(articles) - len(rows)
+    if not rows:
+        return {"inserted": 0, "skipped": 0, "rejected": rejected}
+    session = get_session()
     try:
-        article = Article(
-            link=link,
-            title=title, 
-            content=content,
-            author=author,
-            publication_date=publication_date,
-            source=source,
-            tags = None
-        )
-        session.add(article)
+        inserted = _insert_ignoring_duplicates(session, rows)
         session.commit()
     except SQLAlchemyError as e:
         logger.error(e)
@@ -42,13 +127,31 @@ def add_article(
         raise e
     finally:
         session.close()
-        engine.dispose()
+    seen_links = get_seen_links()
+    for row in rows:
+        seen_links.add(row["source"], [row["link"]])
+    return {"inserted": inserted, "skipped": len(rows) - inserted, "rejected": rejected}
 
+def add_article(
+        link: str,
+        title: str, 
+        content: str, 
+        author: str,
+        publication_date: datetime,
+        source: str
+    ) -> None:
+    add_articles([{
+        "link": link,
+        "title": title,
+        "content": content,
+        "author": author,
+        "publication_date": publication_date,
+        "source": source,
+    }])
     return None
 
 def read_article(article_id: int) -> Article:
-    engine = generate_engine()
-    session = generate_session(engine)
+    session = get_session()
     try:
         article = session.query(Article).filter(Article.id == article_id).first()
         return article
@@ -57,17 +160,34 @@ def read_article(article_id: int) -> Article:
         raise e
     finally:
         session.close()
-        engine.dispose()
 
-def check_article_exists(link: str, source: str) -> bool:
-    engine = generate_engine()
-    session = generate_session(engine)
+def find_existing_links(links: Iterable[str], source: str) -> Set[str]:
+    """
+    The links of `source` already stored. The seen-links filter answers the links it holds,
+    the others are looked up with one query; the first check of a source loads its latest links.
+    """
+    links = list(links)
+    seen_links = get_seen_links()
+    warm = seen_links.is_warm(source)
+    unknown = seen_links.unknown(source, links)
+    if warm and not unknown:
+        return set(links)
+    session = get_session()
     try:
-        article = session.query(Article).filter(Article.link == link, Article.source == source).first()
-        return article is not None
+        if not warm:
+            latest = [link for (link,) in session.query(Article.link).filter(Article.source == source).order_by(Article.id.desc()).limit(ARTICLES_SEEN_WARM)]
+            seen_links.add(source, reversed(latest))
+            unknown = set(unknown).difference(latest)
+        if unknown:
+            found = [link for (link,) in session.query(Article.link).filter(Article.source == source, Article.link.in_(set(unknown)))]
+            seen_links.add(source, found)
+            unknown = set(unknown).difference(found)
+        return set(links).difference(unknown)
     except SQLAlchemyError as e:
         logger.error(e)
         raise e
     finally:
         session.close()
-        engine.dispose()
\ No newline at end of file
+
+def check_article_exists(link: str, source: str) -> bool:
+    return link in find_existing_links([link], source)
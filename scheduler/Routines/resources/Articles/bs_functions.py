@@ -1,29 +1,33 @@
-from bs4 import BeautifulSoup
-import urllib3 
+from bs4 import BeautifulSoup, SoupStrainer
+from typing import Optional
 from . import check_article_exists
+from .fetch import fetch_link
+from .parsers import iter_rss_items, parse_html
 import logging
 
 logger = logging.getLogger(__name__)
 
+def parse_soup(data: bytes, parse_only: Optional[SoupStrainer] = None) -> BeautifulSoup:
+    return parse_html(data, parse_only)
+
 def get_soup_from_link(link: str) -> BeautifulSoup:
     logger.info("Fetching URL: %s", link)
-    http = urllib3.PoolManager()
-    response = http.request('GET', link)
+    data = fetch_link(link)
     logger.info("Response received for URL: %s", link)
-    response_xml = response.data.decode('utf-8', errors='replace')
-    soup = BeautifulSoup(response_xml, 'html.parser')
+    soup = parse_soup(data)
     logger.info("Soup created for URL: %s", link)
     return soup
 
 def check_if_rss_was_updated(link: str, source: str) -> bool:
     logger.info("Checking if RSS was updated for URL: %s", link)
-    soup = get_soup_from_link(link)
-    logger.info("Fetched and parsed RSS feed for URL: %s", link)
-    all_items = soup.findAll('item')
-    if not all_items:
+    data = fetch_link(link)
+    logger.info("Fetched RSS feed for URL: %s", link)
+    # only the first item is read, the rest of the feed is not parsed
+    latest_item = next(iter_rss_items(data), None)
+    if latest_item is None:
         logger.warning("No items found in RSS feed for URL: %s", link)
         return False
-    article_link = all_items[0].guid.text
+    article_link, _pubdate = latest_item
     logger.info("Latest article link found: %s", article_link)
     article_exists = check_article_exists(article_link, source)
     logger.info("Article exists: %s", article_exists)
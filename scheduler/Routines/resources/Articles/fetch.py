@@ -0,0 +1,75 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, TimeoutError, as_completed
+from typing import Dict, Iterator, List, Optional, Tuple, Union
+from urllib.parse import urlsplit
+import urllib3
+from ..HTTPClient import HTTP_CONNECT_TIMEOUT, HTTP_READ_TIMEOUT, HTTPClient, get_http_client
+
+logger = logging.getLogger(__name__)
+
+ARTICLES_FETCH_WORKERS = int(os.environ.get("ARTICLES_FETCH_WORKERS", 8)) # concurrent downloads per feed run
+ARTICLES_FETCH_PER_HOST = int(os.environ.get("ARTICLES_FETCH_PER_HOST", 4)) # concurrent downloads from one host, up to HTTP_POOL_MAXSIZE keep their connection
+ARTICLES_FETCH_DEADLINE = float(os.environ.get("ARTICLES_FETCH_DEADLINE", 60)) # seconds for all the pages of a feed run
+
+_host_semaphores: Dict[str, threading.BoundedSemaphore] = {}
+_host_semaphores_lock = threading.Lock()
+
+
+def get_host_semaphore(link: str, per_host: int = ARTICLES_FETCH_PER_HOST) -> threading.BoundedSemaphore:
+    """The semaphore capping the downloads from the host of `link`, shared by every feed run of the process."""
+    host = urlsplit(link).netloc.lower()
+    with _host_semaphores_lock:
+        semaphore = _host_semaphores.get(host, None)
+        if semaphore is None:
+            semaphore = threading.BoundedSemaphore(per_host)
+            _host_semaphores[host] = semaphore
+        return semaphore
+
+def fetch_link(link: str, http: Optional[HTTPClient] = None, timeout: Optional[float] = None) -> bytes:
+    http = http or get_http_client()
+    if timeout is None:
+        response = http.get(link)
+    else:
+        response = http.get(link, timeout=urllib3.Timeout(connect=HTTP_CONNECT_TIMEOUT, read=HTTP_READ_TIMEOUT, total=timeout))
+    return response.data
+
+def _fetch_limited(link: str, http: HTTPClient, per_host: int, deadline_at: float) -> bytes:
+    semaphore = get_host_semaphore(link, per_host)
+    if not semaphore.acquire(timeout=max(0.0, deadline_at - time.monotonic())):
+        raise TimeoutError(f"No download slot for {link} before the deadline")
+    try:
+        # the request itself never runs past the deadline either
+        return fetch_link(link, http, timeout=max(0.1, deadline_at - time.monotonic()))
+    finally:
+        semaphore.release()
+
+def fetch_all(
+        links: List[str],
+        max_workers: int = ARTICLES_FETCH_WORKERS,
+        per_host: int = ARTICLES_FETCH_PER_HOST,
+        deadline: float = ARTICLES_FETCH_DEADLINE
+    ) -> Iterator[Tuple[str, Union[bytes, Exception]]]:
+    """
+    Download `links` concurrently, yielding (link, page data or the error) as the downloads complete.
+    Downloads from one host are capped at `per_host` at a time; the links not downloaded within
+    `deadline` seconds are yielded with a TimeoutError.
+    """
+    if not links:
+        return
+    deadline_at = time.monotonic() + deadline
+    http = get_http_client()
+    executor = ThreadPoolExecutor(max_workers=min(max_workers, len(links)), thread_name_prefix="articles-fetch")
+    futures: Dict[Future, str] = {executor.submit(_fetch_limited, link, http, per_host, deadline_at): link for link in links}
+    try:
+        for future in as_completed(futures, timeout=max(0.0, deadline_at - time.monotonic())):
+            error = future.exception()
+            yield futures.pop(future), error if error is not None else future.result()
+    except TimeoutError:
+        logger.warning(f"fetch_all | {len(futures)} of {len(links)} pages not downloaded within {deadline}s")
+        for link in futures.values():
+            yield link, TimeoutError(f"{link} not downloaded within {deadline}s")
+    finally:
+        executor.shutdown(wait=False, cancel_futures=True)
@@ -0,0 +1,67 @@
+import io
+import logging
+import os
+from typing import Iterator, Optional, Tuple
+from xml.etree import ElementTree
+from bs4 import BeautifulSoup, SoupStrainer
+
+try:
+    from lxml import etree as lxml_etree
+except ImportError:  # the standard library parsers are used
+    lxml_etree = None
+
+logger = logging.getLogger(__name__)
+
+HTML_PARSER = os.environ.get("HTML_PARSER", "auto") # "auto" (lxml when installed), "lxml" or "html.parser"
+
+
+def get_html_parser(parser: Optional[str] = None) -> str:
+    """The BeautifulSoup tree builder to use, lxml (C) when installed unless HTML_PARSER says otherwise."""
+    parser = parser or HTML_PARSER
+    if parser == "auto":
+        return "lxml" if lxml_etree is not None else "html.parser"
+    if parser == "lxml" and lxml_etree is None:
+        logger.warning("HTML_PARSER is lxml but lxml is not installed, using html.parser")
+        return "html.parser"
+    return parser
+
+def parse_html(data: bytes, parse_only: Optional[SoupStrainer] = None, parser: Optional[str] = None) -> BeautifulSoup:
+    """
+    Parse a page. With `parse_only`, only the tags it matches (and their content) are built,
+    the rest of the page is skipped instead of becoming a tree nobody reads.
+    """
+    return BeautifulSoup(data.decode('utf-8', errors='replace'), get_html_parser(parser), parse_only=parse_only)
+
+def _local_name(tag: str) -> str:
+    return tag.rsplit('}', 1)[-1].lower()
+
+def _iterparse(data: bytes):
+    if lxml_etree is not None:
+        # recover: feeds with stray entities or bytes still yield their items
+        return lxml_etree.iterparse(io.BytesIO(data), events=("end",), tag="{*}item", recover=True, remove_comments=True, remove_pis=True)
+    return ElementTree.iterparse(io.BytesIO(data), events=("end",))
+
+def iter_rss_items(data: bytes) -> Iterator[Tuple[str, Optional[str]]]:
+    """
+    Stream the (link, publication date) of the items of an RSS feed in their order, without building
+    the document tree: each item is dropped once read. The guid is the link, or <link> without one.
+    Feeds that are not well-formed XML go through the HTML parser as before.
+    """
+    yielded = set()
+    try:
+        for _event, element in _iterparse(data):
+            if _local_name(element.tag) != "item":
+                continue
+            # comments and processing instructions have no tag name
+            fields = {_local_name(child.tag): (child.text or "").strip() for child in element if isinstance(child.tag, str)}
+            element.clear()
+            link = fields.get("guid", None) or fields.get("link", None)
+            if link:
+                yielded.add(link)
+                yield link, fields.get("pubdate", None)
+    except SyntaxError as e: # ElementTree.ParseError and lxml XMLSyntaxError
+        logger.warning(f"iter_rss_items | feed is not well-formed XML ({e}), parsing it as HTML")
+        for item in parse_html(data, SoupStrainer("item"), "html.parser").find_all('item'):
+            link = item.guid.text if item.guid else None
+            if link and link not in yielded:
+                yield link, item.pubdate.text if item.pubdate else None
@@ -1,73 +1,134 @@
 from RoutineManager import Routine, Task, Trigger
-from .bs_functions import check_if_rss_was_updated, get_soup_from_link
-from . import add_article, check_article_exists
+from .bs_functions import check_if_rss_was_updated, parse_soup
+from .fetch import fetch_all, fetch_link
+from .parsers import iter_rss_items
+from . import add_articles, find_existing_links
+from bs4 import SoupStrainer
 from datetime import datetime
+import functools
 import logging
-from typing import Any, Tuple, Optional
+import os
+from typing import Any, Dict, Tuple, Optional
 from collections.abc import Callable
 
 logger = logging.getLogger(__name__)
 
+ARTICLES_FETCH_ATTEMPTS = int(os.environ.get("ARTICLES_FETCH_ATTEMPTS", 3)) # feed runs an article download is tried in before it is given up
+
+# failed downloads per article link, until it is stored or given up
+_failed_attempts: Dict[str, int] = {}
+
+def scrape_feed(
+        rss_url: str,
+        source: str,
+        decorated_source: str,
+        parsing_function: Callable[[Any], Tuple[str, str, str]],
+        time_parse_string: str,
+        raise_parsing_error: bool = False,
+        parse_only: Optional[SoupStrainer] = None
+    ) -> bool:
+    # Module level (not a closure) so the task can be pickled for routines run in the process pool
+    all_items = list(iter_rss_items(fetch_link(rss_url)))
+    logger.info(f"{decorated_source} | feed parsed, {len(all_items)} items")
+    existing_links = find_existing_links([article_link for article_link, _pubdate in all_items], source)
+    # every item not stored yet, not only the ones above the newest stored: the articles skipped
+    # by a previous run are still in the feed and picked up again
+    new_items = []
+    seen = set(existing_links)
+    for article_link, pubdate in all_items:
+        if article_link not in seen:
+            seen.add(article_link)
+            new_items.append((article_link, pubdate))
+    logger.info(f"{decorated_source} | {len(new_items)} new articles, {len(all_items) - len(new_items)} already stored")
+
+    # the pages are downloaded concurrently and parsed as they arrive
+    parsed: Dict[str, Tuple[str, str, str]] = {}
+    for article_link, data in fetch_all([article_link for article_link, _pubdate in new_items]):
+        if isinstance(data, Exception):
+            logger.error(f"{decorated_source} | error fetching article with link: {article_link} with error: {data}")
+            continue
+        try:
+            parsed[article_link] = parsing_function(parse_soup(data, parse_only))
+        except Exception as e:
+            logger.error(f"{decorated_source} | error parsing article with link: {article_link} with error: {e}")
+            if raise_parsing_error:
+                return False
+            parsed[article_link] = (None, None, None)
+        logger.info(f"{decorated_source} | article content extracted | {article_link}")
+
+    # Oldest first. An article not downloaded is skipped, the task is retried for it up to
+    # ARTICLES_FETCH_ATTEMPTS times; an article with a bad date is skipped, it would fail the same way again
+    articles = []
+    complete = True
+    for article_link, pubdate in reversed(new_items):
+        if article_link not in parsed:
+            _failed_attempts[article_link] = _failed_attempts.get(article_link, 0) + 1
+            if _failed_attempts[article_link] < ARTICLES_FETCH_ATTEMPTS:
+                logger.warning(f"{decorated_source} | article not downloaded, retrying later | {article_link}")
+                complete = False
+            else:
+                logger.error(f"{decorated_source} | article not downloaded after {ARTICLES_FETCH_ATTEMPTS} attempts, giving up | {article_link}")
+                del _failed_attempts[article_link]
+            continue
+        _failed_attempts.pop(article_link, None)
+        article_title, article_content, authors = parsed[article_link]
+        try:
+            publication_date = parse_date_and_assign(pubdate, time_parse_string, decorated_source)
+        except (TypeError, ValueError) as e:
+            logger.error(f"{decorated_source} | error parsing publication date of article with link: {article_link} with error: {e}")
+            continue
+        articles.append({
+            "link": article_link,
+            "title": article_title,
+            "content": article_content,
+            "author": authors,
+            "publication_date": publication_date,
+            "source": source,
+        })
+    try:
+        counts = add_articles(articles)
+    except Exception as e:
+        logger.error(f"{decorated_source} | error pushing {len(articles)} articles to db with error: {e}")
+        return False
+    logger.info(f"{decorated_source} | {counts['inserted']} articles added, {counts['skipped']} already stored, {counts['rejected']} rejected")
+    if complete:
+        logger.info(f"{decorated_source} | task completed")
+    return complete
+
+def parse_date_and_assign(date_string: str, time_parse_string: str, decorated_source: str) -> datetime:
+    # Parse the date string into a datetime object
+    logger.info(f"{decorated_source} | parsing date")
+    publication_datetime = datetime.strptime(date_string, time_parse_string)
+    return publication_datetime
+
 def gen_routine(
         rss_url: str, 
         source: str, 
         parsing_function: Callable[[Any], Tuple[str, str, str]],
         time_parse_string: str,
         identifier: Optional[str] = None,
-        raise_parsing_error: bool = False # If True, the routine will stop if an error occurs while parsing an article
+        raise_parsing_error: bool = False, # If True, the routine will stop if an error occurs while parsing an article
+        parse_only: Optional[SoupStrainer] = None, # the tags parsing_function reads, the rest of the page is not parsed
+        executor: str = "thread" # "process" is an opt-in for routines whose parsing dominates the scrape
     ) -> Routine:
     
     decorated_source = source   
     if identifier:
         decorated_source = f"{source}_{identifier}"
 
-    def get_all_items_task() -> bool:
-        soup = get_soup_from_link(rss_url)
-        logger.info(f"{decorated_source} | soup created")
-        all_items = soup.findAll('item')
-        for item in all_items:
-            logger.info(f"{decorated_source} | processing item")
-            article_link = item.guid.text
-            if check_article_exists(article_link, source):
-                logger.info(f"{decorated_source} | article already exists")
-                break
-            
-            logger.info(f"{decorated_source} | article does not exist")
-            article_soup = get_soup_from_link(article_link)
-            logger.info(f"{decorated_source} | article soup created")
-            try:
-                article_title, article_content, authors = parsing_function(article_soup)
-            except Exception as e:
-                logger.error(f"{decorated_source} | error parsing article with link: {article_link} with error: {e}")
-                article_title, article_content, authors = None, None, None
-                if raise_parsing_error:
-                    return False
-            try:
-                logger.info(f"{decorated_source} | article content extracted")
-                add_article(
-                    link=article_link,
-                    title=article_title, 
-                    content=article_content, 
-                    author=authors,
-                    publication_date=parse_date_and_assign(item.pubdate.text),
-                    source=source
-                )
-            except Exception as e:
-                logger.error(f"{decorated_source} | error pushing article to db , article link: {article_link} with error: {e}")
-                return False
-            logger.info(f"{decorated_source} | article added | {article_link}")
-        logger.info(f"{decorated_source} | task completed")
-        return True
-
-    def parse_date_and_assign(date_string) -> datetime:
-        # Parse the date string into a datetime object
-        logger.info(f"{decorated_source} | parsing date")
-        publication_datetime = datetime.strptime(date_string, time_parse_string)
-        return publication_datetime
-
     task = Task(
         name=f"{decorated_source}_scraper",
-        function=get_all_items_task
+        function=functools.partial(
+            scrape_feed,
+            rss_url=rss_url,
+            source=source,
+            decorated_source=decorated_source,
+            parsing_function=parsing_function,
+            time_parse_string=time_parse_string,
+            raise_parsing_error=raise_parsing_error,
+            parse_only=parse_only
+        ),
+        executor=executor
     )
 
     routine = Routine(
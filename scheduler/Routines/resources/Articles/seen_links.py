@@ -0,0 +1,59 @@
+import os
+import threading
+from collections import OrderedDict
+from typing import Any, Dict, Iterable, List
+
+ARTICLES_SEEN_LINKS = int(os.environ.get("ARTICLES_SEEN_LINKS", 1000)) # links kept per source
+
+
+class SeenLinks:
+    """
+    Bounded LRU of the article links known to be stored, per source. A feed is checked against it
+    first, only the links it does not hold are looked up in the database.
+    A link missing from it is not known to be new: the caller confirms it with the database.
+    """
+    def __init__(self, capacity: int = ARTICLES_SEEN_LINKS):
+        self.capacity = capacity
+        self.sources: Dict[str, "OrderedDict[str, None]"] = {}
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def is_warm(self, source: str) -> bool:
+        return source in self.sources
+
+    def add(self, source: str, links: Iterable[str]) -> None:
+        with self._lock:
+            seen = self.sources.setdefault(source, OrderedDict())
+            for link in links:
+                seen[link] = None
+                seen.move_to_end(link)
+            while len(seen) > self.capacity:
+                seen.popitem(last=False)
+
+    def unknown(self, source: str, links: Iterable[str]) -> List[str]:
+        """The links not in the filter, in their order."""
+        unknown = []
+        with self._lock:
+            seen = self.sources.get(source, OrderedDict())
+            for link in links:
+                if link in seen:
+                    seen.move_to_end(link)
+                    self.hits += 1
+                else:
+                    unknown.append(link)
+                    self.misses += 1
+        return unknown
+
+    def clear(self) -> None:
+        with self._lock:
+            self.sources.clear()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            return {
+                "sources": len(self.sources),
+                "links": sum(len(seen) for seen in self.sources.values()),
+                "hits": self.hits,
+                "misses": self.misses,
+            }
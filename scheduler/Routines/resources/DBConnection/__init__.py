@@ -1,33 +1,52 @@
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
-from sqlalchemy import create_engine, exc, Engine
+from sqlalchemy import Engine
+from typing import Any, Dict
+from RoutineManager.ProcessPool import register_worker_initializer
+from db.engine import EnginePool, get_pool_settings
 import logging
 import os
-import time
 
 logger = logging.getLogger(__name__)
 
+POOL_SETTINGS = get_pool_settings("ARTICLES_") # ARTICLES_DB_POOL_SIZE, ARTICLES_DB_MAX_OVERFLOW...
 
-def generate_engine(retries: int = 5, delay: int = 2) -> Engine:
+_engines = EnginePool(POOL_SETTINGS)
+
+
+def get_connection_string() -> str:
+    database_url = os.environ.get("ARTICLES_DATABASE_URL")
+    if database_url:
+        return database_url
     MYSQL_USER = os.environ.get("MYSQL_ARTICLES_USER")
     MYSQL_PASSWORD = os.environ.get("MYSQL_ARTICLES_PASSWORD")
     MYSQL_HOST = os.environ.get("MYSQL_ARTICLES_HOST")
     MYSQL_DATABASE = os.environ.get("MYSQL_ARTICLES_DATABASE")
-    connection_string = f"mysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DATABASE}"
-    logger.info(f"Connecting to database with connection string: {connection_string}")
-
-    for i in range(retries):
-        try:
-            engine = create_engine(connection_string, echo=True)
-            # Try connecting
-            with engine.connect() as connection:
-                logger.info("Successfully connected to the database!")
-                return engine
-        except exc.OperationalError:
-            logger.error(f"Attempt {i+1} failed. Retrying in {delay} seconds...")
-            time.sleep(delay)
-    raise Exception("Could not connect to the database after several attempts.")
+    return f"mysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DATABASE}"
+
+def generate_engine(retries: int = 5, delay: int = 2) -> Engine:
+    return _engines.create_engine(get_connection_string(), retries, delay)
+
+def get_engine() -> Engine:
+    """The process-wide engine of the articles/stocks database, created once on first use."""
+    return _engines.get_engine(get_connection_string())
+
+def get_session() -> Session:
+    """New short-lived session on the shared engine, the caller closes it."""
+    return _engines.get_session(get_connection_string())
+
+def dispose_engine(close: bool = True) -> None:
+    """close=False drops the connections inherited by a forked worker without closing the parent's sockets."""
+    _engines.dispose(close=close)
+
+def _reset_engine_in_worker() -> None:
+    dispose_engine(close=False)
+
+register_worker_initializer(_reset_engine_in_worker)
+
+def get_pool_stats() -> Dict[str, Any]:
+    return _engines.get_pool_stats(get_connection_string())
 
 def generate_session(engine: Engine) -> Session:
     session_factory = sessionmaker(bind=engine)
     Session = scoped_session(session_factory)  # Thread-safe session
-    return Session()
\ No newline at end of file
+    return Session()
@@ -0,0 +1,19 @@
+from contextlib import AbstractAsyncContextManager
+import os
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from db.engine import AsyncEnginePool, to_async_url
+from . import get_connection_string, POOL_SETTINGS
+
+_engines = AsyncEnginePool(POOL_SETTINGS)
+
+
+def get_async_connection_string() -> str:
+    return os.environ.get("ARTICLES_ASYNC_DATABASE_URL") or to_async_url(get_connection_string())
+
+def get_async_engine() -> AsyncEngine:
+    """The process-wide asyncio engine of the articles/stocks database."""
+    return _engines.get_engine(get_async_connection_string())
+
+def async_session_scope() -> AbstractAsyncContextManager[AsyncSession]:
+    """Async unit of work: commit on success, rollback on error."""
+    return _engines.session_scope(get_async_connection_string())
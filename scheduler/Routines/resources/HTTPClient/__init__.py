@@ -0,0 +1,116 @@
+from typing import Any, Dict, Optional
+from urllib3.util.retry import Retry
+from RoutineManager.ProcessPool import register_worker_initializer
+from RoutineManager.Stats import register_stats_provider
+import logging
+import os
+import threading
+import urllib3
+
+logger = logging.getLogger(__name__)
+
+HTTP_NUM_POOLS = int(os.environ.get("HTTP_NUM_POOLS", 20)) # hosts kept with their connections
+HTTP_POOL_MAXSIZE = int(os.environ.get("HTTP_POOL_MAXSIZE", 10)) # keep-alive connections kept per host
+HTTP_CONNECT_TIMEOUT = float(os.environ.get("HTTP_CONNECT_TIMEOUT", 5))
+HTTP_READ_TIMEOUT = float(os.environ.get("HTTP_READ_TIMEOUT", 30))
+HTTP_RETRIES = int(os.environ.get("HTTP_RETRIES", 3))
+HTTP_RETRY_BACKOFF = float(os.environ.get("HTTP_RETRY_BACKOFF", 0.5)) # seconds, doubled on each retry
+HTTP_USER_AGENT = os.environ.get("HTTP_USER_AGENT", None)
+
+RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+
+class HTTPClient:
+    """
+    One urllib3 PoolManager for every scraper and trigger of the process: a pool of keep-alive
+    connections per host, so the feeds of one site reuse the same connections instead of paying
+    a DNS lookup, TCP and TLS handshake on every request.
+    Responses are decoded (gzip / deflate, brotli when installed); failed connections and the
+    RETRY_STATUSES are retried with backoff, after the last retry the response is returned as is.
+    """
+    def __init__(
+            self,
+            num_pools: int = HTTP_NUM_POOLS,
+            maxsize: int = HTTP_POOL_MAXSIZE,
+            connect_timeout: float = HTTP_CONNECT_TIMEOUT,
+            read_timeout: float = HTTP_READ_TIMEOUT,
+            retries: int = HTTP_RETRIES,
+            retry_backoff: float = HTTP_RETRY_BACKOFF,
+            user_agent: Optional[str] = HTTP_USER_AGENT
+        ) -> None:
+        self.http = urllib3.PoolManager(
+            num_pools=num_pools,
+            maxsize=maxsize,
+            block=False, # beyond maxsize a connection is opened for the request and then discarded
+            headers=urllib3.make_headers(accept_encoding=True, keep_alive=True, user_agent=user_agent),
+            timeout=urllib3.Timeout(connect=connect_timeout, read=read_timeout),
+            retries=Retry(total=retries, backoff_factor=retry_backoff, status_forcelist=RETRY_STATUSES, raise_on_status=False),
+        )
+        self._lock = threading.Lock()
+        # counters of the host pools evicted from the PoolManager (least recently used beyond num_pools)
+        self.evicted_requests = 0
+        self.evicted_connections = 0
+        self.http.pools.dispose_func = self._dispose_pool
+
+    def _dispose_pool(self, pool: urllib3.HTTPConnectionPool) -> None:
+        with self._lock:
+            self.evicted_requests += pool.num_requests
+            self.evicted_connections += pool.num_connections
+        pool.close()
+
+    def request(self, method: str, url: str, **kwargs) -> urllib3.HTTPResponse:
+        return self.http.request(method, url, **kwargs)
+
+    def get(self, url: str, **kwargs) -> urllib3.HTTPResponse:
+        return self.http.request("GET", url, **kwargs)
+
+    def get_stats(self) -> Dict[str, Any]:
+        """Requests per host, and how many of them reused a kept-alive connection (hits) or opened one (misses)."""
+        hosts = {}
+        for key in self.http.pools.keys():
+            pool = self.http.pools.get(key, None)
+            if pool is None:
+                continue
+            host = hosts.setdefault(pool.host, {"requests": 0, "connections": 0})
+            host["requests"] += pool.num_requests
+            host["connections"] += pool.num_connections
+        with self._lock:
+            requests = self.evicted_requests + sum(host["requests"] for host in hosts.values())
+            misses = self.evicted_connections + sum(host["connections"] for host in hosts.values())
+        hits = max(0, requests - misses)
+        return {
+            "requests": requests,
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / requests if requests else None,
+            "hosts": hosts,
+        }
+
+    def clear(self) -> None:
+        self.http.clear()
+
+
+_client: Optional[HTTPClient] = None
+_client_lock = threading.Lock()
+
+def get_http_client() -> HTTPClient:
+    """The process-wide HTTP client, created once on first use."""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                _client = HTTPClient()
+    return _client
+
+def _reset_client_in_worker() -> None:
+    # the connections inherited from the parent are dropped, not closed: the parent keeps using them
+    global _client
+    _client = None
+
+register_worker_initializer(_reset_client_in_worker)
+
+def get_stats() -> Dict[str, Any]:
+    # not created just to report it
+    return _client.get_stats() if _client is not None else {}
+
+register_stats_provider("http_client", get_stats)
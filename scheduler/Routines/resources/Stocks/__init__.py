@@ -2,14 +2,14 @@ from datetime import datetime
 import logging
 from typing import Iterable, Optional, Tuple
 from .Stock import Stock, StockDataSummary, StockPrice, StockEarnings
-from ..DBConnection import generate_engine, generate_session
+from ..DBConnection import get_engine, get_session
 
 logger = logging.getLogger(__name__)
 
 
 def init_db() -> bool:
-    engine = generate_engine()
     try:
+        engine = get_engine()
         Stock.metadata.create_all(engine)
         StockDataSummary.metadata.create_all(engine)
         StockPrice.metadata.create_all(engine)
@@ -17,15 +17,10 @@ def init_db() -> bool:
 
     except Exception as e:
         logger.error(f"Error: {e}")
-        engine.dispose()
         return False
-    
-    finally:
-        engine.dispose()
 
     from .db_init import set_db_with_stocks_list
-    result = set_db_with_stocks_list(generate_session(engine))
-    engine.dispose()
+    result = set_db_with_stocks_list(get_session())
     return result
      
 def add_stock_price(
@@ -33,8 +28,7 @@ def add_stock_price(
         price: float,
         date: Optional[datetime] = None,
     ) -> None:
-    engine = generate_engine()
-    session = generate_session(engine)
+    session = get_session()
     try:
         stock = session.query(Stock).filter(Stock.symbol == symbol).first()
         if not stock:
@@ -52,7 +46,6 @@ def add_stock_price(
         session.rollback()
     finally:
         session.close()
-        engine.dispose()
 
     return None
 
@@ -72,8 +65,7 @@ def add_stock_summary(
         recommendations_strong_sell: Optional[int],
         total_recommendations: Optional[int],
     ) -> None:
-    engine = generate_engine()
-    session = generate_session(engine)
+    session = get_session()
     try:
         stock = session.query(Stock).filter(Stock.symbol == symbol).first()
         if not stock:
@@ -103,7 +95,6 @@ def add_stock_summary(
         session.rollback()
     finally:
         session.close()
-        engine.dispose()
 
 def add_stock_earnings(
         symbol: str,
@@ -112,8 +103,7 @@ def add_stock_earnings(
         revenue: float,
         is_reported: bool,
     ) -> None:
-    engine = generate_engine()
-    session = generate_session(engine)
+    session = get_session()
     try:
         stock = session.query(Stock).filter(Stock.symbol == symbol).first()
         if not stock:
@@ -135,11 +125,9 @@ def add_stock_earnings(
         session.rollback()
     finally:
         session.close()
-        engine.dispose()
 
 def get_stock(symbol: str) -> Optional[Stock]:
-    engine = generate_engine()
-    session = generate_session(engine)
+    session = get_session()
     try:
         stock = session.query(Stock).filter(Stock.symbol == symbol).first()
         return stock
@@ -148,11 +136,9 @@ def get_stock(symbol: str) -> Optional[Stock]:
         session.rollback()
     finally:
         session.close()
-        engine.dispose()
         
 def get_stocks_list(active_only: bool = True) -> Iterable[Stock]:
-    engine = generate_engine()
-    session = generate_session(engine)
+    session = get_session()
     try:
         if active_only:
             stocks = session.query(Stock).filter(Stock.status == 'active').all()
@@ -164,11 +150,9 @@ def get_stocks_list(active_only: bool = True) -> Iterable[Stock]:
         session.rollback()
     finally:
         session.close()
-        engine.dispose()
 
 def is_stock_updated_today(symbol: str) -> bool:
-    engine = generate_engine()
-    session = generate_session(engine)
+    session = get_session()
     try:
         stock = session.query(Stock).filter(Stock.symbol == symbol).first()
         if not stock:
@@ -183,12 +167,10 @@ def is_stock_updated_today(symbol: str) -> bool:
         session.rollback()
     finally:
         session.close()
-        engine.dispose()
     return False
 
 def get_stock_last_earning_date(symbol: str) -> Optional[Tuple[datetime, bool]]:
-    engine = generate_engine()
-    session = generate_session(engine)
+    session = get_session()
     try:
         stock = session.query(Stock).filter(Stock.symbol == symbol).first()
         if not stock:
@@ -203,5 +185,4 @@ def get_stock_last_earning_date(symbol: str) -> Optional[Tuple[datetime, bool]]:
         session.rollback()
     finally:
         session.close()
-        engine.dispose()
     return None
\ No newline at end of file
@@ -0,0 +1,21 @@
+import logging
+from typing import List
+from sqlalchemy import select
+from .Stock import Stock
+from ..DBConnection.aio import async_session_scope
+
+logger = logging.getLogger(__name__)
+
+# Async counterparts of the Stocks helpers, for routines running on the event loop
+
+
+async def get_stocks_list(active_only: bool = True) -> List[Stock]:
+    try:
+        query = select(Stock)
+        if active_only:
+            query = query.where(Stock.status == 'active')
+        async with async_session_scope() as session:
+            return list((await session.execute(query)).scalars().all())
+    except Exception as e:
+        logger.error(f"get_stocks_list | Error getting stocks with error: {e}")
+    return []
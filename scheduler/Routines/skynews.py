@@ -1,4 +1,5 @@
 from .resources.Articles.routine_factory import gen_routine
+from bs4 import SoupStrainer
 
 def parsing_function(soup):
     article_title = soup.find('h1', class_='sdc-article-header__title').text
@@ -9,6 +10,9 @@ def parsing_function(soup):
         authors = None
     return article_title, article_content, authors
 
+# the containers parsing_function reads, the rest of the page is not parsed
+parse_only = SoupStrainer(class_=["sdc-article-header__title", "sdc-article-body", "sdc-article-author__name"])
+
 website_feeds = [
     ("home", "https://feeds.skynews.com/feeds/rss/home.xml"), 
     ("UK", "https://feeds.skynews.com/feeds/rss/uk.xml"),
@@ -27,7 +31,8 @@ for identifier, rss_url in website_feeds:
         source='skynews', 
         identifier='{identifier}', 
         time_parse_string='%a, %d %b %Y %H:%M:%S +0000', 
-        parsing_function=parsing_function
+        parsing_function=parsing_function,
+        parse_only=parse_only
     )""")
 
 
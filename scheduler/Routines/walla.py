@@ -1,4 +1,5 @@
 from .resources.Articles.routine_factory import gen_routine
+from bs4 import SoupStrainer
 
 def parsing_function(soup):
     article_title = soup.find('h1', class_='title').text
@@ -6,9 +7,13 @@ def parsing_function(soup):
     authors = soup.find('div', class_='writers-names').text
     return article_title, article_content, authors
 
+# the containers parsing_function reads, the rest of the page is not parsed
+parse_only = SoupStrainer(class_=["title", "article-content", "writers-names"])
+
 walla_routine = gen_routine(
     rss_url='https://rss.walla.co.il/feed/1?type=main',
     source='walla',
     time_parse_string='%a, %d %b %Y %H:%M:%S GMT',
     parsing_function=parsing_function,
+    parse_only=parse_only,
 )
\ No newline at end of file
@@ -1,4 +1,5 @@
 from Routines.resources.Articles.routine_factory import gen_routine
+from bs4 import SoupStrainer
 
 def parsing_function(soup):
     article_title = soup.find('h1', class_='mainTitle').text
@@ -6,10 +7,14 @@ def parsing_function(soup):
     authors = soup.find('div', class_='authors').text
     return article_title, article_content, authors
 
+# the containers parsing_function reads, the rest of the page is not parsed
+parse_only = SoupStrainer(class_=["mainTitle", "article-body", "authors"])
+
 ynet_routine = gen_routine(
     rss_url='http://www.ynet.co.il/Integration/StoryRss2.xml',
     source='ynet',
     parsing_function=parsing_function,
+    parse_only=parse_only,
     time_parse_string='%a, %d %b %Y %H:%M:%S %z',
     identifier='hebrew'
 )
\ No newline at end of file
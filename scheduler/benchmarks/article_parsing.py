@@ -0,0 +1,128 @@
+"""
+Parse time and peak memory of the article pages of each site and of an RSS feed:
+the full page with html.parser (before) vs lxml and the per-site SoupStrainer (after),
+and the feed items with BeautifulSoup (before) vs iter_rss_items (after).
+
+    cd scheduler && python benchmarks/article_parsing.py --repeat 20
+
+The pages are synthetic: the containers each site parsing_function reads, inside the scripts,
+navigation and related articles lists that make up most of a news page. Every mode is checked
+to extract the same article as html.parser on the full page.
+Runs against temporary SQLite databases unless DATABASE_URL / ARTICLES_DATABASE_URL are set.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+import tracemalloc
+import warnings
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+PARAGRAPH = "<p>" + "The quick brown fox jumps over the lazy dog. " * 12 + "</p>"
+SCRIPT = "{" + 'key: "value", ' * 150 + "}"
+ARTICLE_TEMPLATES = {
+    "bbc": '<div data-component="headline-block"><h1>Headline</h1></div>{paragraphs}',
+    "cnn": '<div class="headline__wrapper"><h1>Headline</h1></div><div class="headline__sub-container">By Author</div>'
+           '<div class="article__content-container">{paragraphs}</div>',
+    "skynews": '<h1 class="sdc-article-header__title">Headline</h1><span class="sdc-article-author__name">Author</span>'
+               '<div class="sdc-article-body">{paragraphs}</div>',
+    "walla": '<h1 class="title">Headline</h1><div class="writers-names">Author</div><section class="article-content">{paragraphs}</section>',
+    "ynet": '<h1 class="mainTitle">Headline</h1><div class="authors">Author</div><div class="article-body">{paragraphs}</div>',
+}
+
+
+def gen_page(site: str, paragraphs: int = 20) -> bytes:
+    # BBC splits the article body in one text block per paragraph
+    body = f'<div data-component="text-block">{PARAGRAPH}</div>' * paragraphs if site == "bbc" else PARAGRAPH * paragraphs
+    article = ARTICLE_TEMPLATES[site].format(paragraphs=body)
+    scripts = "".join(f"<script>window.config{index} = {SCRIPT};</script>" for index in range(30))
+    navigation = "<nav><ul>" + "".join(f'<li class="nav-item"><a class="nav-link" href="/section/{index}">Section {index}</a></li>' for index in range(300)) + "</ul></nav>"
+    related = "<aside>" + "".join(
+        f'<div class="card"><a href="/article/{index}"><img src="/image/{index}.jpg" alt="image"/><div class="card-title"><span>Related article {index}</span></div></a></div>'
+        for index in range(150)
+    ) + "</aside>"
+    footer = "<footer>" + "".join(f'<a class="footer-link" href="/page/{index}">Page {index}</a>' for index in range(200)) + "</footer>"
+    return f"<!DOCTYPE html><html><head>{scripts}</head><body>{navigation}<main><article>{article}</article></main>{related}{footer}</body></html>".encode()
+
+
+def gen_feed(items: int = 50) -> bytes:
+    entries = "".join(
+        f"<item><title>Title {index}</title><description><![CDATA[{PARAGRAPH}]]></description>"
+        f"<link>https://news.test/{index}</link><guid isPermaLink=\"true\">https://news.test/{index}</guid>"
+        f"<pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate></item>"
+        for index in range(items)
+    )
+    return f'<?xml version="1.0" encoding="UTF-8"?><rss version="2.0"><channel><title>News</title>{entries}</channel></rss>'.encode()
+
+
+def measure(function, repeat: int) -> tuple:
+    result = function()
+    started_at = time.perf_counter()
+    for _ in range(repeat):
+        function()
+    elapsed_ms = (time.perf_counter() - started_at) / repeat * 1000
+    tracemalloc.start()
+    function()
+    _current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return result, elapsed_ms, peak / 1024
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=20)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    os.environ.setdefault("DATABASE_URL", f"sqlite:///{directory}/scheduler.db")
+    os.environ.setdefault("ARTICLES_DATABASE_URL", f"sqlite:///{directory}/articles.db")
+
+    import RoutineManager # noqa: F401 - db imports RoutineManager, which has to be initialized first
+    import db
+    db.init_db()
+    from bs4 import BeautifulSoup
+    from Routines import bbc, cnn, skynews, walla, ynet
+    from Routines.resources.Articles.parsers import iter_rss_items, lxml_etree, parse_html
+
+    modes = [("html.parser", "html.parser", False), ("html.parser + strainer", "html.parser", True)]
+    if lxml_etree is not None:
+        modes += [("lxml", "lxml", False), ("lxml + strainer", "lxml", True)]
+    else:
+        print("lxml is not installed, only html.parser is measured")
+
+    print(f"{'site':<10}{'mode':<26}{'page KB':>9}{'parse ms':>10}{'peak KB':>10}")
+    for site in (bbc, cnn, skynews, walla, ynet):
+        name = site.__name__.rsplit(".", 1)[-1]
+        page = gen_page(name)
+        expected = None
+        for mode, html_parser, strained in modes:
+            parse_only = site.parse_only if strained else None
+            result, elapsed_ms, peak_kb = measure(lambda: site.parsing_function(parse_html(page, parse_only, html_parser)), args.repeat)
+            expected = expected or result
+            if result != expected:
+                raise AssertionError(f"{name} {mode} extracted {result[0]!r} instead of {expected[0]!r}")
+            print(f"{name:<10}{mode:<26}{len(page) / 1024:>9.0f}{elapsed_ms:>10.2f}{peak_kb:>10.0f}")
+
+    feed = gen_feed()
+    warnings.simplefilter("ignore") # the XML-as-HTML and findAll warnings of the code measured
+    def soup_items() -> list:
+        soup = BeautifulSoup(feed.decode("utf-8", errors="replace"), "html.parser")
+        return [(item.guid.text, item.pubdate.text) for item in soup.findAll("item")]
+    feed_modes = [
+        ("BeautifulSoup items", soup_items),
+        ("iter_rss_items", lambda: list(iter_rss_items(feed))),
+        ("iter_rss_items first", lambda: [next(iter_rss_items(feed))]),
+    ]
+    expected = None
+    for mode, function in feed_modes:
+        result, elapsed_ms, peak_kb = measure(function, args.repeat)
+        expected = expected or result
+        if result != expected[:len(result)]:
+            raise AssertionError(f"rss {mode} read {result[:1]} instead of {expected[:1]}")
+        print(f"{'rss':<10}{mode:<26}{len(feed) / 1024:>9.0f}{elapsed_ms:>10.2f}{peak_kb:>10.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,83 @@
+"""
+Article write throughput: one session and commit per article (before) vs one multi-row
+insert per feed batch with add_articles (after).
+
+    cd scheduler && python benchmarks/articles_ingest.py --batches 20 --batch-size 30
+
+Runs against a temporary SQLite database unless ARTICLES_DATABASE_URL is set. Half of each
+batch repeats links already stored, as a feed polled again does.
+"""
+import argparse
+import os
+import sys
+import tempfile
+import time
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+
+def gen_batch(batch: int, batch_size: int) -> list:
+    # the first half of a batch was already in the previous one
+    first = batch * batch_size // 2
+    return [
+        {
+            "link": f"https://benchmark.test/{index}",
+            "title": f"title {index}",
+            "content": "content " * 200,
+            "author": None,
+            "publication_date": datetime.now(),
+            "source": "benchmark",
+        }
+        for index in range(first, first + batch_size)
+    ]
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--batches", type=int, default=20)
+    parser.add_argument("--batch-size", type=int, default=30)
+    args = parser.parse_args()
+
+    directory = tempfile.mkdtemp()
+    if not os.environ.get("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = f"sqlite:///{directory}/scheduler.db"
+    if not os.environ.get("ARTICLES_DATABASE_URL"):
+        os.environ["ARTICLES_DATABASE_URL"] = f"sqlite:///{directory}/articles.db"
+
+    import RoutineManager # noqa: F401 - db imports RoutineManager, which has to be initialized first
+    import db
+    db.init_db()
+    from Routines.resources.Articles import Article, add_articles, init_db
+    from Routines.resources.DBConnection import get_session
+    init_db()
+
+    def per_article(articles: list) -> None:
+        for article in articles:
+            session = get_session()
+            try:
+                if session.query(Article.id).filter(Article.link == article["link"], Article.source == article["source"]).first() is None:
+                    session.add(Article(tags=None, **article))
+                    session.commit()
+            finally:
+                session.close()
+
+    def clear() -> None:
+        session = get_session()
+        session.query(Article).delete()
+        session.commit()
+        session.close()
+
+    print(f"{'mode':<24}{'articles':>10}{'elapsed s':>12}{'articles/s':>12}")
+    for mode, ingest in [("per article (before)", per_article), ("add_articles (after)", add_articles)]:
+        clear()
+        started_at = time.perf_counter()
+        for batch in range(args.batches):
+            ingest(gen_batch(batch, args.batch_size))
+        elapsed = time.perf_counter() - started_at
+        articles = args.batches * args.batch_size
+        print(f"{mode:<24}{articles:>10}{elapsed:>12.3f}{articles / elapsed:>12.0f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Event loop lag while routines create their task rows:
+blocking SQLAlchemy calls on the loop (before) vs the asyncio engine of db.aio (after).
+
+    cd scheduler && python benchmarks/db_loop_lag.py --routines 40 --rounds 10
+
+Runs against a temporary SQLite database (aiosqlite for the async run) unless DATABASE_URL is set.
+"""
+import argparse
+import asyncio
+import os
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+TICK = 0.005
+
+
+async def measure_lag(stop: asyncio.Event, lags: list) -> None:
+    while not stop.is_set():
+        started_at = time.perf_counter()
+        await asyncio.sleep(TICK)
+        lags.append(time.perf_counter() - started_at - TICK)
+
+
+async def run(create_handlers: list, rounds: int) -> dict:
+    stop = asyncio.Event()
+    lags = []
+    ticker = asyncio.create_task(measure_lag(stop, lags))
+    started_at = time.perf_counter()
+    for _ in range(rounds):
+        for create_new_task in create_handlers:
+            result = create_new_task()
+            if asyncio.iscoroutine(result):
+                result = await result
+            await asyncio.sleep(0) # routines are stepped one by one by the scheduler
+    elapsed = time.perf_counter() - started_at
+    stop.set()
+    await ticker
+    import db
+    await db.close_async_engine()
+    lags.sort()
+    return {
+        "rows": rounds * len(create_handlers),
+        "elapsed": elapsed,
+        "lag_avg_ms": statistics.mean(lags) * 1000,
+        "lag_p99_ms": lags[int(len(lags) * 0.99) - 1] * 1000,
+        "lag_max_ms": lags[-1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routines", type=int, default=40)
+    parser.add_argument("--rounds", type=int, default=10)
+    args = parser.parse_args()
+
+    if not os.environ.get("DATABASE_URL"):
+        os.environ["DATABASE_URL"] = f"sqlite:///{tempfile.mkdtemp()}/benchmark.db"
+
+    import RoutineManager # noqa: F401 - db imports RoutineManager, which has to be initialized first
+    import db
+    db.init_db()
+
+    results = {}
+    for mode, async_db in [("sync (before)", False), ("async (after)", True)]:
+        db.ASYNC_DB = async_db
+        create_handlers = []
+        for i in range(args.routines):
+            handlers = db.gen_routine_handlers(f"benchmark_{i}")
+            handlers[1]("benchmark routine")
+            create_handlers.append(handlers[4])
+        results[mode] = asyncio.run(run(create_handlers, args.rounds))
+
+    print(f"{'mode':<16}{'rows':>8}{'elapsed s':>12}{'lag avg ms':>12}{'lag p99 ms':>12}{'lag max ms':>12}")
+    for mode, result in results.items():
+        print(f"{mode:<16}{result['rows']:>8}{result['elapsed']:>12.3f}{result['lag_avg_ms']:>12.2f}{result['lag_p99_ms']:>12.2f}{result['lag_max_ms']:>12.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,75 @@
+"""
+Publish throughput and latency: a connection per message (previous send_message)
+vs the long-lived Publisher, with and without batched confirms.
+
+    cd scheduler && RABBITMQ_USER=... RABBITMQ_PASS=... python benchmarks/rabbitmq_publish.py --host localhost --messages 1000
+
+Needs a running RabbitMQ. Messages go to a temporary queue that is deleted at the end.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import pika
+from RoutineManager.rabbitMQ import Publisher
+
+QUEUE = "benchmark_status_updates"
+
+
+def connection_per_message(parameters: pika.ConnectionParameters, message: dict) -> None:
+    connection = pika.BlockingConnection(parameters)
+    channel = connection.channel()
+    channel.queue_declare(queue=QUEUE)
+    channel.basic_publish(exchange='', routing_key=QUEUE, body=json.dumps(message))
+    connection.close()
+
+
+def run(name: str, publish, count: int) -> dict:
+    latencies = []
+    started_at = time.perf_counter()
+    for i in range(count):
+        message = {"type": "routine_status", "routine": f"routine_{i % 40}", "status": "running", "epoch": int(time.time())}
+        publish_started_at = time.perf_counter()
+        publish(message)
+        latencies.append(time.perf_counter() - publish_started_at)
+    elapsed = time.perf_counter() - started_at
+    latencies.sort()
+    return {
+        "name": name,
+        "rate": count / elapsed,
+        "p50_ms": statistics.median(latencies) * 1000,
+        "p99_ms": latencies[int(len(latencies) * 0.99) - 1] * 1000,
+    }
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="rabbitmq")
+    parser.add_argument("--messages", type=int, default=1000)
+    args = parser.parse_args()
+
+    credentials = pika.PlainCredentials(os.environ.get("RABBITMQ_USER", "guest"), os.environ.get("RABBITMQ_PASS", "guest"))
+    parameters = pika.ConnectionParameters(args.host, 5672, '/', credentials)
+
+    results = [run("connection per message", lambda message: connection_per_message(parameters, message), args.messages)]
+    for name, confirms in [("publisher", False), ("publisher + confirms", True)]:
+        publisher = Publisher(parameters=parameters, confirms=confirms)
+        results.append(run(name, lambda message: publisher.publish(QUEUE, message), args.messages))
+        publisher.close()
+
+    connection = pika.BlockingConnection(parameters)
+    connection.channel().queue_delete(queue=QUEUE)
+    connection.close()
+
+    print(f"{'mode':<26}{'msg/s':>10}{'p50 ms':>10}{'p99 ms':>10}")
+    for result in results:
+        print(f"{result['name']:<26}{result['rate']:>10.0f}{result['p50_ms']:>10.2f}{result['p99_ms']:>10.2f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,18 +1,29 @@
-from collections.abc import Callable
+from collections.abc import Awaitable, Callable
 from datetime import datetime
+import atexit
 import os
 import logging
+import threading
 import time
 from sqlalchemy.exc import SQLAlchemyError
 from sqlalchemy.orm import sessionmaker, scoped_session, Session
-from sqlalchemy import create_engine, exc, Engine
-from typing import Optional, Tuple
+from sqlalchemy import create_engine, exc, inspect, text, Engine
+from typing import Any, ContextManager, Dict, Optional, Tuple, Union
+from RoutineManager.ProcessPool import register_worker_initializer
 from RoutineManager.Status import RoutineStatus, TaskInstanceStatus 
 from .models import Routine, Task
+from .journal import StatusJournal
+from .engine import EnginePool, dispose_async_engines, get_pool_settings, reset_async_engines
 
 
 logger = logging.getLogger(__name__)
 
+ASYNC_DB = os.environ.get("ASYNC_DB", "true").lower() == "true" # create task rows on the asyncio engine (db.aio)
+
+_engines = EnginePool(get_pool_settings(), expire_on_commit=False)
+_journal_lock = threading.Lock()
+_journal: Optional[StatusJournal] = None
+
 def connect_with_retry(db_url, retries=5, delay=2):
     for i in range(retries):
         try:
@@ -27,39 +38,101 @@ def connect_with_retry(db_url, retries=5, delay=2):
     raise Exception("Could not connect to the database after several attempts.")
 
 
-def generate_engine(retries=5, delay=2):
+def get_connection_string() -> str:
+    database_url = os.environ.get("DATABASE_URL")
+    if database_url:
+        return database_url
     MYSQL_USER = os.environ.get("MYSQL_USER")
     MYSQL_PASSWORD = os.environ.get("MYSQL_PASSWORD")
     MYSQL_HOST = os.environ.get("MYSQL_HOST")
     MYSQL_DATABASE = os.environ.get("MYSQL_DATABASE")
-    connection_string = f"mysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DATABASE}"
-    print(f"Connecting to database with connection string: {connection_string}")
-    logger.info(f"Connecting to database with connection string: {connection_string}")
+    return f"mysql://{MYSQL_USER}:{MYSQL_PASSWORD}@{MYSQL_HOST}/{MYSQL_DATABASE}"
 
-    for i in range(retries):
-        try:
-            engine = create_engine(connection_string, echo=True)
-            # Try connecting
-            with engine.connect() as connection:
-                print("Successfully connected to the database!")
-                return engine
-        except exc.OperationalError:
-            print(f"[db] Attempt {i+1} failed. Retrying in {delay} seconds...")
-            time.sleep(delay)
-    raise Exception("Could not connect to the database after several attempts.")
+def generate_engine(retries=5, delay=2):
+    return _engines.create_engine(get_connection_string(), retries, delay)
+
+def get_engine() -> Engine:
+    """The process-wide engine, created (and connect-tested) once on first use."""
+    return _engines.get_engine(get_connection_string())
+
+def dispose_engine(close: bool = True) -> None:
+    """
+    Drop the pooled connections. close=False is for a forked worker: the parent's sockets are
+    forgotten without being closed, and the worker opens its own connections on first use.
+    """
+    _engines.dispose(close=close)
+
+def _reset_engine_in_worker() -> None:
+    global _journal
+    dispose_engine(close=False)
+    reset_async_engines()
+    _journal = None # the journal thread does not survive the fork, its pending updates belong to the parent
+
+register_worker_initializer(_reset_engine_in_worker)
 
 def generate_session(engine: Engine):
     session_factory = sessionmaker(bind=engine)
     Session = scoped_session(session_factory)  # Thread-safe session
     return Session()
 
+def session_scope() -> ContextManager[Session]:
+    """
+    Short-lived unit of work on the shared engine: commit on success, rollback on error.
+    Objects stay usable after the session closes (expire_on_commit=False).
+    """
+    return _engines.session_scope(get_connection_string())
+
+def get_pool_stats() -> Dict[str, Any]:
+    return _engines.get_pool_stats(get_connection_string())
+
+async def close_async_engine() -> None:
+    """Dispose the asyncio engines (of both databases) on the loop that owns their connections."""
+    await dispose_async_engines()
+
+def get_journal() -> StatusJournal:
+    """The write-behind journal of status updates, flushed at exit."""
+    global _journal
+    if _journal is None:
+        with _journal_lock:
+            if _journal is None:
+                _journal = StatusJournal(session_scope)
+                atexit.register(_journal.close)
+    return _journal
+
+def close_journal() -> None:
+    if _journal is not None:
+        _journal.close()
+
+def get_journal_stats() -> Dict[str, Any]:
+    if _journal is None:
+        return {}
+    return _journal.get_stats()
+
+def add_missing_columns(engine: Engine) -> None:
+    """
+    Additive migration: `create_all` does not alter existing tables, so columns that were
+    added to the models after the tables were created are added here (nullable, no default).
+    """
+    inspector = inspect(engine)
+    with engine.begin() as connection:
+        for table in Routine.metadata.sorted_tables:
+            if not inspector.has_table(table.name):
+                continue
+            existing_columns = {column["name"] for column in inspector.get_columns(table.name)}
+            for column in table.columns:
+                if column.name in existing_columns:
+                    continue
+                column_type = column.type.compile(dialect=engine.dialect)
+                logger.info(f"add_missing_columns | Adding column {table.name}.{column.name} {column_type}")
+                connection.execute(text(f"ALTER TABLE {table.name} ADD COLUMN {column.name} {column_type}"))
+
 def init_db() -> None:
     for i in range(5):
         try:
-            engine = generate_engine()
+            engine = get_engine()
             Routine.metadata.create_all(engine)
             Task.metadata.create_all(engine)
-            engine.dispose()
+            add_missing_columns(engine)
             return
         except exc.OperationalError:
             logger.debug(f"Attempt {i+1} failed. Retrying in 5 seconds...")
@@ -67,24 +140,17 @@ def init_db() -> None:
     raise Exception("Could not connect to the database after several attempts.")
 
 def get_routine(name: str) -> Optional[Routine]:
-    engine = generate_engine()
-    routine_session = generate_session(engine)
     try:
         logger.info(f"Getting routine with name: {name}")
-        return routine_session.query(Routine).filter(Routine.name == name).first()
+        with session_scope() as session:
+            return session.query(Routine).filter(Routine.name == name).first()
     except SQLAlchemyError as e:
-        logger.error("get routine - SQLAlchemyError occurred:", e)
-        routine_session.rollback()
+        logger.error(f"get routine - SQLAlchemyError occurred: {e}")
     except Exception as e:
-        logger.error("get routine - Error occurred:", e)
-    finally:
-        routine_session.close()
-        engine.dispose()
+        logger.error(f"get routine - Error occurred: {e}")
     return None
 
 def add_routine(name: str, description: str, condition_function: Optional[str]=None, condition_function_args: Optional[str]=None, retry_delay: int=5*60, retry_limit: int=5) -> Routine:
-    engine = generate_engine()
-    routine_session = generate_session(engine)
     try:
         routine = Routine(
             name=name, 
@@ -94,57 +160,71 @@ def add_routine(name: str, description: str, condition_function: Optional[str]=N
             retry_delay=retry_delay, 
             retry_limit=retry_limit
         )
-        routine_session.add(routine)
-        routine_session.commit()
+        with session_scope() as session:
+            session.add(routine)
         return routine
     except SQLAlchemyError as e:
-        logger.error("add routine - SQLAlchemyError occurred:", e)
-        routine_session.rollback()
+        logger.error(f"add routine - SQLAlchemyError occurred: {e}")
     except Exception as e:
-        logger.error("add routine - Error occurred:", e)
-    finally:
-        routine_session.close()
-        engine.dispose()
+        logger.error(f"add routine - Error occurred: {e}")
     return None
 
 def reattach_routine(routine: Routine) -> Routine:
-    engine = generate_engine()
-    routine_session = generate_session(engine)
+    routine_session = _engines.get_session(get_connection_string())
     try:
         return routine_session, routine_session.merge(routine)
     except SQLAlchemyError as e:
-        logger.error("reattach routine - SQLAlchemyError occurred:", e, exc_info=True)
+        logger.error(f"reattach routine - SQLAlchemyError occurred: {e}", exc_info=True)
         routine_session.rollback()
     except Exception as e:
-        logger.error("reattach routine - Error occurred:", e, exc_info=True)        
+        logger.error(f"reattach routine - Error occurred: {e}", exc_info=True)
     return None
 
 
 def gen_routine_handlers(routine_name: str) -> Tuple[
-    Session,
+    Callable[[], ContextManager[Session]],
     Callable[[str, str, Optional[str], Optional[str], int, int], Routine],
     Callable[[str], None],
     Callable[[str], None],
-    Callable[[], Optional[Task]],
-    Callable[[Task], Tuple[Callable[[str], None], Callable[[str], None], Callable[[], None]]]   
+    Callable[[], Union[Optional[Task], Awaitable[Optional[Task]]]],
+    Callable[[Task], Tuple[Callable[[str], None], Callable[[str], None], Callable[[], None]]],
+    Callable[[int, Optional[datetime]], None]
 ]:
     """
     This function creates handlers to access and manage the database for a specific routine.
     It generates functions to get, create, update status, update error, create new tasks, 
-    and update task details for the specified routine.
+    update task details and persist the retry state for the specified routine.
+    Rows are created and read in short units of work on the shared engine,
+    status updates are queued by id in the write-behind journal.
     """
-    engine = generate_engine()
-    session = generate_session(engine)
+    routine_ids = {}
+
+    def get_routine_id(session: Session) -> Optional[int]:
+        routine_id = routine_ids.get(routine_name, None)
+        if routine_id is None:
+            routine_id = session.query(Routine.id).filter(Routine.name == routine_name).scalar()
+            if routine_id is not None:
+                routine_ids[routine_name] = routine_id
+        return routine_id
+
+    def update_routine(**values) -> None:
+        routine_id = routine_ids.get(routine_name, None)
+        if routine_id is None:
+            with session_scope() as session:
+                routine_id = get_routine_id(session)
+        if routine_id is None:
+            raise ValueError(f"Routine {routine_name} does not exist")
+        get_journal().record(Routine, routine_id, updated_at=datetime.now(), **values)
 
     def get_routine() -> Optional[Routine]:
         try:
             logger.info(f"Getting routine with name: {routine_name}")
-            return session.query(Routine).filter(Routine.name == routine_name).first()
+            with session_scope() as session:
+                return session.query(Routine).filter(Routine.name == routine_name).first()
         except SQLAlchemyError as e:
-            logger.error("get routine - SQLAlchemyError occurred:", e)
-            session.rollback()
+            logger.error(f"get routine - SQLAlchemyError occurred: {e}")
         except Exception as e:
-            logger.error("get routine - Error occurred:", e)
+            logger.error(f"get routine - Error occurred: {e}")
         return None
         
     def gen_routine(
@@ -152,109 +232,122 @@ def gen_routine_handlers(routine_name: str) -> Tuple[
             retry_delay: int=5*60, 
             retry_limit: int=5
         ) -> Routine:
-        routine = get_routine()
-        if routine is None:
-            routine = Routine(
-                name=routine_name, 
-                description=description, 
-                retry_delay=retry_delay, 
-                retry_limit=retry_limit
-            )
-            session.add(routine)
-            session.commit()
+        with session_scope() as session:
+            routine = session.query(Routine).filter(Routine.name == routine_name).first()
+            if routine is None:
+                routine = Routine(
+                    name=routine_name, 
+                    description=description, 
+                    retry_delay=retry_delay, 
+                    retry_limit=retry_limit
+                )
+                session.add(routine)
+                session.flush()
+            routine_ids[routine_name] = routine.id
         return routine
     
     def update_status(status: str) -> None:
         try:
             logger.info(f"Routine [{routine_name}] update_status: Updating status of {routine_name} to {status}")
-            routine = get_routine()
-            logger.info(f"Routine [{routine_name}] update_status: Updating status | Routine: {routine} with status {routine.status}")
-            routine.status = status
-            routine.error = ""
-            routine.updated_at = datetime.now()
-            session.commit()
-            logger.info(f"Routine [{routine_name}] update_status | Updated status of {routine_name} to {status}")
+            update_routine(status=status, error="")
+            logger.info(f"Routine [{routine_name}] update_status | Queued status of {routine_name} to {status}")
         except SQLAlchemyError as e:
-            logger.error(f"Routine [{routine_name}] update_status | SQLAlchemyError occurred:", e)
-            session.rollback()
+            logger.error(f"Routine [{routine_name}] update_status | SQLAlchemyError occurred: {e}")
         except Exception as e:
-            logger.error(f"Routine [{routine_name}] update_status | Error occurred:", e)
+            logger.error(f"Routine [{routine_name}] update_status | Error occurred: {e}")
 
     def update_error(error: str) -> None:
         try:  
             logger.info(f"Routine [{routine_name}] update_error: Updating error of {routine_name} to {error}")
-            routine = get_routine()
-            logger.info(f"Routine [{routine_name}] update_error: Updating error | Routine: {routine} with status {routine.status} and error {routine.error}")
-            routine.status = RoutineStatus.ERROR
-            routine.error = error
-            routine.updated_at = datetime.now()
-            session.commit()
-            logger.info(f"Routine [{routine_name}] update_error | Updated error of {routine_name} to {error}")
+            update_routine(status=RoutineStatus.ERROR, error=error)
+            logger.info(f"Routine [{routine_name}] update_error | Queued error of {routine_name} to {error}")
+        except SQLAlchemyError as e:
+            logger.error(f"Routine [{routine_name}] update_error | SQLAlchemyError occurred: {e}")
+        except Exception as e:
+            logger.error(f"Routine [{routine_name}] update_error | Error occurred: {e}")
+
+    def update_retry(num_retries: int, next_retry_at: Optional[datetime]) -> None:
+        try:
+            logger.info(f"Routine [{routine_name}] update_retry: retry {num_retries} at {next_retry_at}")
+            update_routine(num_retries=num_retries, next_retry_at=next_retry_at)
         except SQLAlchemyError as e:
-            logger.error(f"Routine [{routine_name}] update_error | SQLAlchemyError occurred:", e)
-            session.rollback()
+            logger.error(f"Routine [{routine_name}] update_retry | SQLAlchemyError occurred: {e}")
         except Exception as e:
-            logger.error(f"Routine [{routine_name}] update_error | Error occurred:", e)
+            logger.error(f"Routine [{routine_name}] update_retry | Error occurred: {e}")
 
     def create_new_task() -> Optional[Task]:
         try:
             logger.info(f"Routine [{routine_name}] create_new_task: Creating new task for {routine_name}")
-            routine = get_routine()
-            logger.info(f"Routine [{routine_name}] create_new_task: Creating new task | Routine: {routine} with status {routine.status}")
-            task = Task(routine=routine)
-            session.add(task)
-            session.commit()
+            with session_scope() as session:
+                routine = session.get(Routine, get_routine_id(session))
+                task = Task(routine=routine)
+                session.add(task)
+            logger.info(f"Routine [{routine_name}] create_new_task | Created new task for {routine_name}")
+            return task
+        except SQLAlchemyError as e:
+            logger.error(f"Routine [{routine_name}] create_new_task | SQLAlchemyError occurred: {e}")
+        except Exception as e: 
+            logger.error(f"Routine [{routine_name}] create_new_task | Error occurred: {e}")
+        return None
+
+    async def async_create_new_task() -> Optional[Task]:
+        from . import aio
+        try:
+            logger.info(f"Routine [{routine_name}] create_new_task: Creating new task for {routine_name}")
+            routine_id = routine_ids.get(routine_name, None)
+            if routine_id is None:
+                async with aio.async_session_scope() as session:
+                    routine_id = await aio.get_routine_id(session, routine_name)
+                routine_ids[routine_name] = routine_id
+            task = await aio.create_task(routine_id)
             logger.info(f"Routine [{routine_name}] create_new_task | Created new task for {routine_name}")
             return task
         except SQLAlchemyError as e:
-            logger.error(f"Routine [{routine_name}] create_new_task | SQLAlchemyError occurred:", e)
-            session.rollback()
+            logger.error(f"Routine [{routine_name}] create_new_task | SQLAlchemyError occurred: {e}")
         except Exception as e: 
-            logger.error(f"Routine [{routine_name}] create_new_task | Error occurred:", e)
+            logger.error(f"Routine [{routine_name}] create_new_task | Error occurred: {e}")
         return None
     
     def gen_task_handlers(task: Task):
+        def update_task(**values) -> None:
+            values["updated_at"] = datetime.now()
+            get_journal().record(Task, task.id, **values)
+            # keep the detached instance in line with the row
+            for key, value in values.items():
+                setattr(task, key, value)
+
         def update_task_status(status: str) -> None:
             try:
                 logger.info(f"[Task {task.id}] update_task_status | Updating status of task {task.id} to {status}")
-                task.updated_at = datetime.now()
-                task.status = status
-                session.commit()
-                logger.info(f"[Task {task.id}] update_task_status | Updated status of task {task.id} to {status}")
+                update_task(status=status)
+                logger.info(f"[Task {task.id}] update_task_status | Queued status of task {task.id} to {status}")
             except SQLAlchemyError as e:
-                logger.error(f"[Task {task.id}] update_task_status | SQLAlchemyError occurred:", e)
-                session.rollback()
+                logger.error(f"[Task {task.id}] update_task_status | SQLAlchemyError occurred: {e}")
             except Exception as e:
-                logger.error(f"[Task {task.id}] update_task_status | Error occurred:", e)
+                logger.error(f"[Task {task.id}] update_task_status | Error occurred: {e}")
 
         def update_task_error(error: str) -> None:
             try:
                 logger.info(f"[Task {task.id}] update_task_error: Updating error of task {task.id} to {error}")
-                task.updated_at = datetime.now()
-                task.error = error
-                task.status = TaskInstanceStatus.ERROR
-                session.commit()
-                logger.info(f"[Task {task.id}] update_task_error | Updated error of task {task.id} to {error}")
+                update_task(error=error, status=TaskInstanceStatus.ERROR)
+                logger.info(f"[Task {task.id}] update_task_error | Queued error of task {task.id} to {error}")
             except SQLAlchemyError as e:
-                logger.error(f"[Task {task.id}] update_task_error | SQLAlchemyError occurred:", e)
-                session.rollback()
+                logger.error(f"[Task {task.id}] update_task_error | SQLAlchemyError occurred: {e}")
             except Exception as e:
-                logger.error(f"[Task {task.id}] update_task_error | Error occurred:", e)
+                logger.error(f"[Task {task.id}] update_task_error | Error occurred: {e}")
 
         def update_task_completed() -> None:
             try:
                 logger.info(f"[Task {task.id}] update_task_completed: Updating task {task.id} to completed")
-                task.updated_at = datetime.now()
-                task.completed_at = datetime.now()
-                task.status = TaskInstanceStatus.DONE
-                session.commit()
-                logger.info(f"[Task {task.id}] update_task_completed | Updated task {task.id} to completed")
+                update_task(completed_at=datetime.now(), status=TaskInstanceStatus.DONE)
+                logger.info(f"[Task {task.id}] update_task_completed | Queued task {task.id} as completed")
             except SQLAlchemyError as e:
-                logger.error(f"[Task {task.id}] update_task_completed | SQLAlchemyError occurred:", e)
-                session.rollback()
+                logger.error(f"[Task {task.id}] update_task_completed | SQLAlchemyError occurred: {e}")
             except Exception as e:
-                logger.error(f"[Task {task.id}] update_task_completed | Error occurred:", e)
+                logger.error(f"[Task {task.id}] update_task_completed | Error occurred: {e}")
 
         return update_task_status, update_task_error, update_task_completed
 
-    return session, gen_routine, update_status, update_error, create_new_task, gen_task_handlers
+    if ASYNC_DB:
+        create_new_task = async_create_new_task
+    return session_scope, gen_routine, update_status, update_error, create_new_task, gen_task_handlers, update_retry
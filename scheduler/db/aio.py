@@ -0,0 +1,39 @@
+from collections.abc import AsyncIterator
+from contextlib import AbstractAsyncContextManager
+import os
+from typing import Optional
+from sqlalchemy import select
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession
+from . import get_connection_string
+from .engine import AsyncEnginePool, get_pool_settings, to_async_url
+from .models import Routine, Task
+
+# Only the queries made on the event loop have an async path: the task rows here and the stocks list
+# (Routines.resources.Stocks.aio). Status writes go through the journal thread, and the articles helpers
+# run inside the scrapers and triggers, in the worker threads, so they stay on the sync engines.
+_engines = AsyncEnginePool(get_pool_settings())
+
+
+def get_async_connection_string() -> str:
+    return os.environ.get("ASYNC_DATABASE_URL") or to_async_url(get_connection_string())
+
+def get_async_engine() -> AsyncEngine:
+    """The process-wide asyncio engine."""
+    return _engines.get_engine(get_async_connection_string())
+
+def async_session_scope() -> AbstractAsyncContextManager[AsyncSession]:
+    """Async unit of work: commit on success, rollback on error."""
+    return _engines.session_scope(get_async_connection_string())
+
+async def get_routine_id(session: AsyncSession, routine_name: str) -> Optional[int]:
+    return (await session.execute(select(Routine.id).where(Routine.name == routine_name))).scalar()
+
+async def create_task(routine_id: int) -> Task:
+    async with async_session_scope() as session:
+        routine = await session.get(Routine, routine_id)
+        if routine is None:
+            raise ValueError(f"Routine {routine_id} does not exist")
+        task = Task(routine=routine)
+        session.add(task)
+        await session.flush()
+    return task
@@ -0,0 +1,186 @@
+from collections.abc import AsyncIterator, Iterator
+from contextlib import asynccontextmanager, contextmanager
+import logging
+import os
+import threading
+import time
+from sqlalchemy import create_engine, exc, Engine
+from sqlalchemy.ext.asyncio import AsyncEngine, AsyncSession, async_sessionmaker, create_async_engine
+from sqlalchemy.orm import sessionmaker, Session
+from sqlalchemy.pool import AsyncAdaptedQueuePool, QueuePool
+from typing import Any, Dict, List
+
+logger = logging.getLogger(__name__)
+
+DB_ECHO = os.environ.get("DB_ECHO", "false").lower() == "true"
+
+# sync driver -> asyncio driver of the same database
+ASYNC_DRIVERS = {
+    "mysql": "mysql+aiomysql",
+    "mysql+mysqldb": "mysql+aiomysql",
+    "sqlite": "sqlite+aiosqlite",
+}
+
+
+def to_async_url(url: str) -> str:
+    scheme, separator, rest = url.partition("://")
+    return f"{ASYNC_DRIVERS.get(scheme, scheme)}{separator}{rest}"
+
+def get_pool_settings(prefix: str = "") -> Dict[str, int]:
+    """The connection pool settings of a database, read from DB_POOL_SIZE, DB_MAX_OVERFLOW... under `prefix`."""
+    return {
+        "pool_size": int(os.environ.get(f"{prefix}DB_POOL_SIZE", 5)),
+        "max_overflow": int(os.environ.get(f"{prefix}DB_MAX_OVERFLOW", 10)),
+        "pool_timeout": int(os.environ.get(f"{prefix}DB_POOL_TIMEOUT", 30)), # seconds to wait for a free connection
+        "pool_recycle": int(os.environ.get(f"{prefix}DB_POOL_RECYCLE", 3600)), # below MySQL wait_timeout
+    }
+
+
+class EnginePool:
+    """
+    The process-wide engines of a database, one per URL: created (and connect-tested) on first use,
+    with the session factory bound to each and the time sessions waited for a pooled connection.
+    """
+    def __init__(self, pool_settings: Dict[str, int], **session_options) -> None:
+        self.pool_settings = pool_settings
+        self.session_options = session_options
+        self._engines: Dict[str, Engine] = {}
+        self._session_factories: Dict[str, sessionmaker] = {}
+        self._lock = threading.Lock()
+        self._wait = {"count": 0, "total": 0.0, "max": 0.0}
+        self._wait_lock = threading.Lock()
+
+    def create_engine(self, url: str, retries: int = 5, delay: int = 2) -> Engine:
+        logger.info(f"Connecting to database with connection string: {url}")
+        for i in range(retries):
+            try:
+                engine = create_engine(url, echo=DB_ECHO, poolclass=QueuePool, pool_pre_ping=True, **self.pool_settings)
+                # Try connecting
+                with engine.connect():
+                    logger.info("Successfully connected to the database!")
+                    return engine
+            except exc.OperationalError:
+                logger.error(f"[db] Attempt {i+1} failed. Retrying in {delay} seconds...")
+                time.sleep(delay)
+        raise Exception("Could not connect to the database after several attempts.")
+
+    def get_engine(self, url: str) -> Engine:
+        engine = self._engines.get(url, None)
+        if engine is None:
+            with self._lock:
+                engine = self._engines.get(url, None)
+                if engine is None:
+                    engine = self.create_engine(url)
+                    self._session_factories[url] = sessionmaker(bind=engine, **self.session_options)
+                    self._engines[url] = engine
+        return engine
+
+    def get_session(self, url: str) -> Session:
+        """New short-lived session on the engine of `url`, the caller closes it."""
+        self.get_engine(url)
+        return self._session_factories[url]()
+
+    @contextmanager
+    def session_scope(self, url: str) -> Iterator[Session]:
+        """Short-lived unit of work on the engine of `url`: commit on success, rollback on error."""
+        session = self.get_session(url)
+        try:
+            started_at = time.monotonic()
+            session.connection() # check out now, so the pool wait is measured
+            wait = time.monotonic() - started_at
+            with self._wait_lock:
+                self._wait["count"] += 1
+                self._wait["total"] += wait
+                self._wait["max"] = max(self._wait["max"], wait)
+            yield session
+            session.commit()
+        except Exception:
+            session.rollback()
+            raise
+        finally:
+            session.close()
+
+    def dispose(self, close: bool = True) -> None:
+        """
+        Drop the pooled connections. close=False is for a forked worker: the parent's sockets are
+        forgotten without being closed, and the worker opens its own connections on first use.
+        """
+        with self._lock:
+            for engine in self._engines.values():
+                engine.dispose(close=close)
+            self._engines.clear()
+            self._session_factories.clear()
+
+    def get_pool_stats(self, url: str) -> Dict[str, Any]:
+        engine = self._engines.get(url, None)
+        if engine is None:
+            return {}
+        pool = engine.pool
+        with self._wait_lock:
+            wait_count, wait_total, wait_max = self._wait["count"], self._wait["total"], self._wait["max"]
+        return {
+            "size": pool.size(),
+            "checked_out": pool.checkedout(),
+            "checked_in": pool.checkedin(),
+            "overflow": pool.overflow(),
+            "wait_avg": wait_total / wait_count if wait_count else 0.0,
+            "wait_max": wait_max,
+            "checkouts": wait_count,
+        }
+
+
+class AsyncEnginePool:
+    """
+    The process-wide asyncio engines of a database, one per URL, created on first use.
+    Their connections belong to the event loop that first uses them, the scheduler runs a single loop.
+    Every pool is disposed by `dispose_async_engines` on shutdown and forgotten by `reset_async_engines` in a forked worker.
+    """
+    def __init__(self, pool_settings: Dict[str, int]) -> None:
+        self.pool_settings = pool_settings
+        self._engines: Dict[str, AsyncEngine] = {}
+        self._session_factories: Dict[str, async_sessionmaker] = {}
+        _async_pools.append(self)
+
+    def get_engine(self, url: str) -> AsyncEngine:
+        engine = self._engines.get(url, None)
+        if engine is None:
+            logger.info(f"Creating async engine with connection string: {url}")
+            engine = create_async_engine(url, echo=DB_ECHO, poolclass=AsyncAdaptedQueuePool, pool_pre_ping=True, **self.pool_settings)
+            self._session_factories[url] = async_sessionmaker(engine, expire_on_commit=False)
+            self._engines[url] = engine
+        return engine
+
+    @asynccontextmanager
+    async def session_scope(self, url: str) -> AsyncIterator[AsyncSession]:
+        """Async unit of work on the engine of `url`: commit on success, rollback on error."""
+        self.get_engine(url)
+        async with self._session_factories[url]() as session:
+            try:
+                yield session
+                await session.commit()
+            except Exception:
+                await session.rollback()
+                raise
+
+    async def dispose(self) -> None:
+        engines = list(self._engines.values())
+        self.reset()
+        for engine in engines:
+            await engine.dispose()
+
+    def reset(self) -> None:
+        """Forget the engines without closing their connections (forked worker, the sockets belong to the parent)."""
+        self._engines.clear()
+        self._session_factories.clear()
+
+
+_async_pools: List[AsyncEnginePool] = []
+
+async def dispose_async_engines() -> None:
+    """Dispose the asyncio engines of every database, on the loop that owns their connections."""
+    for pool in _async_pools:
+        await pool.dispose()
+
+def reset_async_engines() -> None:
+    for pool in _async_pools:
+        pool.reset()
@@ -0,0 +1,155 @@
+import logging
+import os
+import threading
+import time
+from collections.abc import Callable
+from typing import Any, ContextManager, Dict, List, Optional, Tuple, Type
+from sqlalchemy import update
+from sqlalchemy.orm import Session
+
+logger = logging.getLogger(__name__)
+
+STATUS_JOURNAL_INTERVAL_MS = int(os.environ.get("STATUS_JOURNAL_INTERVAL_MS", 500)) # flush at least every N ms
+STATUS_JOURNAL_MAX_EVENTS = int(os.environ.get("STATUS_JOURNAL_MAX_EVENTS", 100)) # or as soon as M events are queued
+STATUS_JOURNAL_MAX_RETRIES = int(os.environ.get("STATUS_JOURNAL_MAX_RETRIES", 5)) # failed flushes before writing row by row
+
+
+class StatusJournal:
+    """
+    Write-behind journal of routine and task status updates.
+
+    Updates are recorded in memory, coalesced per row (the last value of each column wins),
+    and written by a background thread as one bulk UPDATE by primary key per model,
+    every `interval_ms` or as soon as `max_events` updates are queued.
+    A failed flush is retried with the next one; after `max_retries` failures in a row the rows are
+    written one by one, and the rows that still fail are dropped (and logged) instead of blocking the others.
+    `close` flushes whatever is still pending, it is registered at exit and called on shutdown.
+    """
+    def __init__(
+            self,
+            session_scope: Callable[[], ContextManager[Session]],
+            interval_ms: int = STATUS_JOURNAL_INTERVAL_MS,
+            max_events: int = STATUS_JOURNAL_MAX_EVENTS,
+            max_retries: int = STATUS_JOURNAL_MAX_RETRIES
+        ) -> None:
+        self.session_scope = session_scope
+        self.interval = interval_ms / 1000
+        self.max_events = max_events
+        self.max_retries = max_retries
+        self.retries = 0 # failed flushes in a row
+        self.pending: Dict[Tuple[Type, int], Dict[str, Any]] = {}
+        self.pending_events = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._closed = False
+        self._thread: Optional[threading.Thread] = None
+
+        # Metrics
+        self.events = 0
+        self.flushes = 0
+        self.rows_written = 0
+        self.failures = 0
+        self.dropped = 0
+        self.last_flush_duration = 0.0
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="status-journal", daemon=True)
+            self._thread.start()
+
+    def record(self, model: Type, row_id: int, **values) -> None:
+        """Queue an update of the row `row_id` of `model`, merged with the updates already pending."""
+        if self._closed:
+            # late updates after shutdown are written through
+            self._write({(model, row_id): values})
+            return
+        with self._lock:
+            self.pending.setdefault((model, row_id), {}).update(values)
+            self.pending_events += 1
+            self.events += 1
+            full = self.pending_events >= self.max_events
+        self.start()
+        if full:
+            self._wakeup.set()
+
+    def _run(self) -> None:
+        while not self._closed:
+            self._wakeup.wait(self.interval)
+            self._wakeup.clear()
+            self.flush()
+
+    def flush(self) -> int:
+        """Write all pending updates, returns the number of rows written."""
+        with self._flush_lock:
+            with self._lock:
+                batch, self.pending = self.pending, {}
+                self.pending_events = 0
+            if not batch:
+                return 0
+            try:
+                written = self._write(batch)
+            except Exception as e:
+                self.failures += 1
+                self.retries += 1
+                if self.retries >= self.max_retries:
+                    logger.error(f"StatusJournal: flush of {len(batch)} rows failed {self.retries} times, writing them one by one: {e}")
+                    self.retries = 0
+                    return self._write_rows(batch)
+                logger.error(f"StatusJournal: flush of {len(batch)} rows failed, will retry: {e}")
+                with self._lock:
+                    # newer updates recorded meanwhile win over the failed batch
+                    for key, values in self.pending.items():
+                        batch.setdefault(key, {}).update(values)
+                    self.pending = batch
+                return 0
+            self.retries = 0
+            return written
+
+    def _write_rows(self, batch: Dict[Tuple[Type, int], Dict[str, Any]]) -> int:
+        written = 0
+        for (model, row_id), values in batch.items():
+            try:
+                written += self._write({(model, row_id): values})
+            except Exception as e:
+                self.dropped += 1
+                logger.error(f"StatusJournal: dropped the update of {model.__name__} {row_id} {values}: {e}")
+        return written
+
+    def _write(self, batch: Dict[Tuple[Type, int], Dict[str, Any]]) -> int:
+        started_at = time.monotonic()
+        # one executemany per model and set of columns
+        groups: Dict[Tuple[Type, Tuple[str, ...]], List[Dict[str, Any]]] = {}
+        for (model, row_id), values in batch.items():
+            columns = tuple(sorted(values))
+            groups.setdefault((model, columns), []).append(dict(values, id=row_id))
+        with self.session_scope() as session:
+            for (model, _columns), rows in groups.items():
+                session.execute(update(model), rows)
+        self.flushes += 1
+        self.rows_written += len(batch)
+        self.last_flush_duration = time.monotonic() - started_at
+        logger.debug(f"StatusJournal: flushed {len(batch)} rows in {self.last_flush_duration:.3f}s")
+        return len(batch)
+
+    def close(self) -> None:
+        """Stop the background thread and flush the pending updates."""
+        self._closed = True
+        self._wakeup.set()
+        if self._thread is not None and self._thread is not threading.current_thread():
+            self._thread.join(timeout=self.interval + 5)
+        self.flush()
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            pending = len(self.pending)
+        return {
+            "events": self.events,
+            "pending_rows": pending,
+            "flushes": self.flushes,
+            "rows_written": self.rows_written,
+            "failures": self.failures,
+            "dropped": self.dropped,
+            "events_per_flush": self.events / self.flushes if self.flushes else 0.0,
+            "last_flush_duration": self.last_flush_duration,
+        }
@@ -28,6 +28,8 @@ class Routine(Base):
     retry_delay = Column("retry_delay", Integer, default=5*60)
     retry_limit = Column("retry_limit", Integer, default=5)
     error = Column("error", Text, default="")
+    num_retries = Column("num_retries", Integer, default=0)
+    next_retry_at = Column("next_retry_at", DateTime, nullable=True)
     tasks = relationship("Task", back_populates="routine")
 
     def __init__(
@@ -1,9 +1,11 @@
 import asyncio
 import logging
+import signal
 import sys
 from RoutineManager.RoutineManager import RoutineManager
 from RoutineManager.Routine import Routine
 from RoutineManager.Task import Task
+from db import close_journal
 
 # Set logger configuration
 logging.basicConfig(
@@ -75,4 +77,10 @@ if __name__ == "__main__":
     routine_manager.add_routine(stocks_earnings_routine)
 
     logger.info("Starting RoutineManager")
-    asyncio.run(routine_manager.main_coroutine())
\ No newline at end of file
+    # docker stop sends SIGTERM: leave through the finally block so pending status updates are flushed
+    signal.signal(signal.SIGTERM, lambda signum, frame: sys.exit(0))
+    try:
+        asyncio.run(routine_manager.main_coroutine())
+    finally:
+        logger.info("Flushing status journal")
+        close_journal()
\ No newline at end of file
@@ -18,6 +18,8 @@ class MockRoutine:
         self.retry_delay = retry_delay
         self.retry_limit = retry_limit
         self.error = ""
+        self.num_retries = 0
+        self.next_retry_at = None
         self.tasks = MagicMock()
 
     def __repr__(self) -> str:
@@ -38,8 +40,8 @@ def gen_mock_handlers(name):
     def session(self):
         return MagicMock()
     
-    def gen_routine(description):
-        return MockRoutine(name, description)
+    def gen_routine(description, retry_delay=5*60, retry_limit=5):
+        return MockRoutine(name, description, retry_delay, retry_limit)
     
     def update_status(status):
         return MagicMock()
@@ -47,10 +49,13 @@ def gen_mock_handlers(name):
     def update_error(error):
         return MagicMock()
     
-    def create_new_task(task):
+    def create_new_task():
         return MagicMock(return_value="New Task")
     
     def gen_task_handlers(task):
         return MagicMock(), MagicMock(), MagicMock()
+
+    def update_retry(num_retries, next_retry_at):
+        return MagicMock()
     
-    return session, gen_routine, update_status, update_error, create_new_task, gen_task_handlers
\ No newline at end of file
+    return session, gen_routine, update_status, update_error, create_new_task, gen_task_handlers, update_retry
\ No newline at end of file
@@ -0,0 +1,34 @@
+from contextlib import contextmanager
+from typing import Iterator, Tuple
+from types import ModuleType
+import importlib
+import os
+import sys
+
+SCHEDULER_PATH = os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
+
+
+@contextmanager
+def real_modules(*names: str) -> Iterator[Tuple[ModuleType, ...]]:
+    """
+    Import the real `names` (e.g. "db") in place of the mocks, for the tests of those modules.
+    On exit the mocks are put back, and the scheduler modules imported meanwhile are dropped
+    so the other tests keep importing them against the mocks.
+    """
+    importlib.import_module("RoutineManager") # db imports RoutineManager, which has to be initialized first
+    before = dict(sys.modules)
+    replaced = [name for name in sys.modules if any(name == mocked or name.startswith(f"{mocked}.") for mocked in names)]
+    for name in replaced:
+        del sys.modules[name]
+    try:
+        yield tuple(importlib.import_module(name) for name in names)
+    finally:
+        for name, module in list(sys.modules.items()):
+            if name not in before and (getattr(module, "__file__", None) or "").startswith(SCHEDULER_PATH + os.sep):
+                del sys.modules[name]
+        sys.modules.update(before)
+        for name in replaced:
+            # the import of the real module bound it on its parent package
+            parent, _, child = name.rpartition(".")
+            if parent in sys.modules:
+                setattr(sys.modules[parent], child, before[name])
@@ -1,4 +1,5 @@
 from datetime import datetime
+import os
 import sys  
 """
 This module sets up mock objects for unit testing.
@@ -25,7 +26,7 @@ Mocks:
 The mock objects are inserted into `sys.modules` to replace the actual modules during testing.
 """
 
-from unittest.mock import MagicMock
+from unittest.mock import AsyncMock, MagicMock
 from .MockGetHandler import gen_mock_handlers
 from .Stocks import Stock
 
@@ -52,6 +53,8 @@ mock_resources.Stocks.is_stock_updated_today = MagicMock(return_value=False)
 mock_resources.Stocks.get_stock_last_earning_date = MagicMock(return_value=None)
 mock_resources.Stocks.get_stocks_list = MagicMock(return_value=stocks_list)
 mock_resources.Stocks.add_stock_price = MagicMock(return_value=None)
+mock_resources.Stocks.aio = MagicMock()
+mock_resources.Stocks.aio.get_stocks_list = AsyncMock(return_value=stocks_list)
 mock_resources.Stocks.yfinance_functions = MagicMock()
 mock_resources.Stocks.yfinance_functions.is_market_open = MagicMock(return_value=True)
 mock_resources.Stocks.yfinance_functions.get_price = MagicMock(return_value={"price": 1.0})
@@ -70,6 +73,11 @@ mock_resources.Stocks.yfinance_functions.get_stock_daily = MagicMock(return_valu
             "close": 4,
             "date": datetime(2024, 1, 1),
         })
+# the submodules not mocked here (HTTP client, article fetching...) are still imported from their files
+resources_path = os.path.join(os.path.dirname(os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))), "Routines", "resources")
+for package, path in ((mock_resources, resources_path), (mock_resources.Articles, os.path.join(resources_path, "Articles"))):
+    package.__path__ = [path]
+    package.__spec__ = None
 sys.modules["Routines.resources"] = mock_resources
 sys.modules["Routines.resources.Articles"] = mock_resources.Articles
 sys.modules["Routines.resources.Articles.init_db"] = mock_resources.Articles.init_db
@@ -77,3 +85,4 @@ sys.modules["Routines.resources.Articles.routine_factory"] = mock_resources.Arti
 sys.modules["Routines.resources.Articles.routine_factory.gen_routine"] = mock_resources.Articles.routine_factory.gen_routine
 sys.modules["Routines.resources.Stocks"] = mock_resources.Stocks
 sys.modules["Routines.resources.Stocks.yfinance_functions"] = mock_resources.Stocks.yfinance_functions
+sys.modules["Routines.resources.Stocks.aio"] = mock_resources.Stocks.aio
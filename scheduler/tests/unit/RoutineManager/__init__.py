@@ -3,6 +3,16 @@ import unittest
 from .test_Task import TestTask
 from .test_Routine import TestRoutine
 from .test_RoutineManager import TestRoutineManager
+from .test_Scheduler import TestScheduler
+from .test_RetryPolicy import TestRetryPolicy
+from .test_Watchdog import TestWatchdog
+from .test_Stats import TestStats
+from .test_WorkerPool import TestWorkerPool
+from .test_ProcessPool import TestProcessPool
+from .test_rabbitMQ import TestPublisher
+from .test_CommandService import TestCommandService
+from .test_StatusUpdater import TestStatusUpdater
+from .test_wire import TestWire
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
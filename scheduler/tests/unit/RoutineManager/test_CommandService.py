@@ -0,0 +1,110 @@
+import asyncio
+import json
+import pika
+import unittest
+from unittest.mock import MagicMock
+from RoutineManager.CommandService import CommandService
+
+
+class TestCommandService(unittest.IsolatedAsyncioTestCase):
+    async def asyncSetUp(self):
+        self.command_service = CommandService(parameters=MagicMock())
+        self.command_service.commands = asyncio.Queue()
+        self.channel = MagicMock()
+        self.channel.is_open = True
+        self.command_service.channel = self.channel
+
+    def deliver(self, body: bytes, delivery_tag: int):
+        self.command_service._on_message(self.channel, MagicMock(delivery_tag=delivery_tag), pika.BasicProperties(), body)
+
+    async def test_get_commands_drains_burst(self):
+        for delivery_tag in range(1, 4):
+            self.deliver(b'{"command": "start", "routine": "r%d"}' % delivery_tag, delivery_tag)
+        commands = await self.command_service.get_commands()
+        self.assertEqual([command["routine"] for command, _ack in commands], ["r1", "r2", "r3"])
+        self.assertTrue(self.command_service.commands.empty())
+
+    async def test_get_commands_waits_for_delivery(self):
+        get_commands = asyncio.ensure_future(self.command_service.get_commands())
+        await asyncio.sleep(0)
+        self.assertFalse(get_commands.done())
+        self.deliver(b'{"command": "stop", "routine": "r"}', 1)
+        commands = await asyncio.wait_for(get_commands, timeout=1)
+        self.assertEqual(len(commands), 1)
+
+    async def test_ack_on_current_channel_only(self):
+        self.deliver(b'{"command": "start", "routine": "r"}', 7)
+        [(_command, ack_message)] = await self.command_service.get_commands()
+        ack_message()
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=7)
+
+        self.deliver(b'{"command": "start", "routine": "r"}', 8)
+        [(_command, ack_message)] = await self.command_service.get_commands()
+        self.command_service.channel = MagicMock()
+        ack_message()
+        self.channel.basic_ack.assert_called_once()
+
+    async def test_reply_with_result(self):
+        properties = pika.BasicProperties(reply_to="reply_queue", correlation_id="abc")
+        self.command_service._on_message(self.channel, MagicMock(delivery_tag=4), properties, b'{"command": "start", "routine": "r", "sent_at": 1.5}')
+        [(_command, ack_message)] = await self.command_service.get_commands()
+        ack_message({"status": "ok"})
+        publish = self.channel.basic_publish.call_args.kwargs
+        self.assertEqual(publish["routing_key"], "reply_queue")
+        self.assertEqual(publish["properties"].correlation_id, "abc")
+        reply = json.loads(publish["body"])
+        self.assertEqual((reply["correlation_id"], reply["result"], reply["sent_at"]), ("abc", {"status": "ok"}, 1.5))
+        self.channel.basic_ack.assert_called_once_with(delivery_tag=4)
+
+    async def test_burst_collapsed_per_routine(self):
+        for delivery_tag, (routine, command) in enumerate([("r1", "execute"), ("r2", "start"), ("r1", "execute"), ("r1", "cancel"), ("r1", "start")], 1):
+            self.deliver(b'{"command": "%s", "routine": "%s"}' % (command.encode(), routine.encode()), delivery_tag)
+        commands = await self.command_service.get_commands()
+        self.assertEqual([(command["routine"], command["command"]) for command, _ack in commands], [("r1", "start"), ("r2", "start")])
+        self.assertEqual(commands[0][0]["coalesced"], 4)
+        commands[0][1]({"status": "ok"})
+        self.assertEqual(sorted(call.kwargs["delivery_tag"] for call in self.channel.basic_ack.call_args_list), [1, 3, 4, 5])
+
+    async def test_unknown_command_not_collapsed(self):
+        for delivery_tag, command in enumerate(["start", "restart"], 1):
+            self.deliver(b'{"command": "%s", "routine": "r1"}' % command.encode(), delivery_tag)
+        commands = await self.command_service.get_commands()
+        self.assertEqual([(command["routine"], command["command"]) for command, _ack in commands], [("r1", "start"), ("r1", "restart")])
+        self.assertNotIn("coalesced", commands[0][0])
+
+    async def test_duplicate_key_gets_remembered_result(self):
+        self.deliver(b'{"command": "execute", "routine": "r", "idempotency_key": "k1"}', 1)
+        [(_command, ack_message)] = await self.command_service.get_commands()
+        ack_message({"status": "ok", "routine_status": "pending"})
+        # redelivered: answered without being applied again
+        properties = pika.BasicProperties(reply_to="reply_queue", correlation_id="abc")
+        self.command_service._on_message(self.channel, MagicMock(delivery_tag=2), properties, b'{"command": "execute", "routine": "r", "idempotency_key": "k1"}')
+        self.deliver(b'{"command": "start", "routine": "r", "idempotency_key": "k2"}', 3)
+        [(command, _ack)] = await self.command_service.get_commands()
+        self.assertEqual(command["idempotency_key"], "k2")
+        reply = json.loads(self.channel.basic_publish.call_args.kwargs["body"])
+        self.assertEqual(reply["result"], {"status": "ok", "routine_status": "pending", "duplicate": True})
+        self.assertEqual(self.command_service.get_stats()["duplicates"], 1)
+
+    async def test_idempotency_keys_bounded(self):
+        self.command_service.idempotency_keys = 2
+        for key in ["k1", "k2", "k3"]:
+            self.command_service._remember(key, {"status": "ok"})
+        self.assertEqual(list(self.command_service.results), ["k2", "k3"])
+
+    async def test_malformed_command_is_rejected(self):
+        self.deliver(b'not json', 3)
+        self.channel.basic_nack.assert_called_once_with(delivery_tag=3, requeue=False)
+        self.assertTrue(self.command_service.commands.empty())
+
+    async def test_reconnect_drops_undelivered_commands(self):
+        self.command_service._loop = MagicMock()
+        self.deliver(b'{"command": "start", "routine": "r"}', 1)
+        self.command_service._reconnect()
+        self.assertTrue(self.command_service.commands.empty())
+        self.assertIsNone(self.command_service.channel)
+        self.command_service._loop.call_later.assert_called_once()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,61 @@
+import asyncio
+import functools
+import os
+import unittest
+from RoutineManager.ProcessPool import ProcessPool, TaskDescriptor
+from RoutineManager.Task import Task
+
+
+def get_pid(offset=0):
+    return os.getpid() + offset
+
+def fail():
+    raise RuntimeError("worker error")
+
+
+class TestProcessPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = ProcessPool(max_workers=1)
+
+    def tearDown(self):
+        self.pool.shutdown(wait=True)
+
+    def test_descriptor_unwraps_partial(self):
+        descriptor = TaskDescriptor(functools.partial(get_pid, offset=1))
+        self.assertEqual(descriptor.resolve(), get_pid)
+        self.assertEqual(descriptor.kwargs, {"offset": 1})
+        self.assertEqual(descriptor(), os.getpid() + 1)
+
+    def test_descriptor_rejects_lambda_and_closure(self):
+        def closure():
+            return True
+        with self.assertRaises(ValueError):
+            TaskDescriptor(lambda: True)
+        with self.assertRaises(ValueError):
+            TaskDescriptor(closure)
+
+    def test_task_validates_process_executor(self):
+        with self.assertRaises(ValueError):
+            Task(name="task", function=lambda: True, executor="process")
+        with self.assertRaises(ValueError):
+            Task(name="task", function=get_pid, executor="gpu")
+        task = Task(name="task", function=get_pid, executor="process")
+        self.assertEqual(task.descriptor.qualname, "get_pid")
+
+    def test_run_in_worker_process(self):
+        async def flow():
+            await self.pool.warm_up()
+            return await self.pool.run(TaskDescriptor(get_pid))
+        self.assertNotEqual(asyncio.run(flow()), os.getpid())
+        self.assertEqual(self.pool.get_stats()["completed"], 1)
+
+    def test_error_is_marshalled_back(self):
+        async def flow():
+            return await self.pool.run(TaskDescriptor(fail))
+        with self.assertRaises(RuntimeError):
+            asyncio.run(flow())
+        self.assertEqual(self.pool.get_stats()["failed"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
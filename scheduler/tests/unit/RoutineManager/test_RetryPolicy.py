@@ -0,0 +1,48 @@
+import sys
+import unittest
+from unittest.mock import MagicMock, patch
+from ..Mocks.MockGetHandler import gen_mock_handlers
+from RoutineManager.RetryPolicy import RetryPolicy, FixedDelay, ExponentialBackoff, DecorrelatedJitter
+
+
+class TestRetryPolicy(unittest.TestCase):
+    def test_fixed_delay(self):
+        policy = FixedDelay(10)
+        self.assertEqual(policy.get_delay(1), 10)
+        self.assertEqual(policy.get_delay(5, 10), 10)
+        self.assertEqual(RetryPolicy(10, max_delay=5).get_delay(1), 5)
+
+    def test_exponential_backoff(self):
+        policy = ExponentialBackoff(10, max_delay=100, jitter=False)
+        self.assertEqual([policy.get_delay(attempt) for attempt in range(1, 6)], [10, 20, 40, 80, 100])
+
+    def test_exponential_backoff_jitter(self):
+        policy = ExponentialBackoff(10, max_delay=100)
+        for attempt in range(1, 10):
+            delay = policy.get_delay(attempt)
+            self.assertGreaterEqual(delay, 0)
+            self.assertLessEqual(delay, min(100, 10 * 2 ** (attempt - 1)))
+
+    def test_decorrelated_jitter(self):
+        policy = DecorrelatedJitter(10, max_delay=50)
+        previous_delay = None
+        for attempt in range(1, 20):
+            delay = policy.get_delay(attempt, previous_delay)
+            self.assertGreaterEqual(delay, 10)
+            self.assertLessEqual(delay, 50)
+            previous_delay = delay
+
+    def test_routine_default_policy_waits_retry_delay(self):
+        with patch.dict(sys.modules, {"db": MagicMock()}):
+            from RoutineManager.Routine import Routine
+            routine = Routine("test", "test", task=None, trigger=None, retry_delay=60, gen_handler=gen_mock_handlers)
+        routine.update_retry = MagicMock()
+        for _ in range(50):
+            routine.reset_retry_state()
+            routine.num_retries = 1
+            routine.schedule_retry(now=0)
+            self.assertGreaterEqual(routine.next_retry_at, 60)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import asyncio
+import time
+import unittest
+from RoutineManager.Scheduler import Scheduler
+
+
+class TestScheduler(unittest.TestCase):
+    def test_pop_due_order(self):
+        scheduler = Scheduler()
+        now = time.time()
+        scheduler.schedule("late", now - 1)
+        scheduler.schedule("early", now - 10)
+        scheduler.schedule("future", now + 60)
+        self.assertEqual(scheduler.pop_due(now), ["early", "late"])
+        self.assertEqual(scheduler.pop_due(now), [])
+        self.assertEqual(scheduler.next_due(), now + 60)
+
+    def test_reschedule_replaces_entry(self):
+        scheduler = Scheduler()
+        now = time.time()
+        scheduler.schedule("routine", now + 60)
+        scheduler.schedule("routine", now - 1)
+        self.assertEqual(scheduler.pop_due(now), ["routine"])
+        self.assertIsNone(scheduler.next_due())
+
+    def test_cancel(self):
+        scheduler = Scheduler()
+        now = time.time()
+        scheduler.schedule("routine", now - 1)
+        scheduler.cancel("routine")
+        self.assertEqual(scheduler.pop_due(now), [])
+        self.assertIsNone(scheduler.next_due())
+
+    def test_run_wakes_on_event(self):
+        scheduler = Scheduler()
+        calls = []
+
+        async def handler(key):
+            calls.append(key)
+
+        async def flow():
+            runner = asyncio.create_task(scheduler.run(handler))
+            scheduler.schedule("timer", time.time() + 0.05)
+            await asyncio.sleep(0.01)
+            scheduler.wake("event")
+            await asyncio.sleep(0.1)
+            runner.cancel()
+
+        asyncio.run(flow())
+        self.assertEqual(calls, ["event", "timer"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,25 @@
+import unittest
+from unittest.mock import patch
+from RoutineManager import Stats
+
+
+class TestStats(unittest.TestCase):
+    def setUp(self):
+        patcher = patch.dict(Stats._stats_providers, clear=True)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_provided_stats(self):
+        Stats.register_stats_provider("cache", lambda: {"hits": 1})
+        Stats.register_stats_provider("cache", lambda: {"hits": 2}) # registered again, replaced
+        self.assertEqual(Stats.get_provided_stats(), {"cache": {"hits": 2}})
+
+    def test_failing_provider_skipped(self):
+        Stats.register_stats_provider("broken", lambda: 1 / 0)
+        Stats.register_stats_provider("cache", lambda: {"hits": 1})
+        with self.assertLogs("RoutineManager.Stats", level="ERROR"):
+            self.assertEqual(Stats.get_provided_stats(), {"cache": {"hits": 1}})
+
+
+if __name__ == '__main__':
+    unittest.main()
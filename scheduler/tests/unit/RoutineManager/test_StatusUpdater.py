@@ -0,0 +1,62 @@
+import unittest
+from unittest.mock import patch
+from RoutineManager.Status import TaskInstanceStatus
+from RoutineManager.StatusUpdater import StatusUpdater
+
+
+class TestStatusUpdater(unittest.TestCase):
+    def setUp(self):
+        self.status_updater = StatusUpdater(sync_interval=3600)
+
+    @patch("RoutineManager.StatusUpdater.broadcast_message")
+    def test_flush_sends_one_batch(self, mock_broadcast_message):
+        self.status_updater.routine_status_updater("r1", "running")
+        self.status_updater.routine_status_updater("r2", "waiting")
+        self.status_updater.task_status_updater("r1", "running", 1)
+        self.assertEqual(self.status_updater.flush(), 3)
+        mock_broadcast_message.assert_called_once()
+        exchange, message = mock_broadcast_message.call_args.args
+        self.assertEqual(exchange, "status_updates")
+        self.assertEqual(message["type"], "status_batch")
+        self.assertEqual([update["type"] for update in message["updates"]], ["routine_status", "routine_status", "task_status"])
+
+    @patch("RoutineManager.StatusUpdater.broadcast_message")
+    def test_coalesces_to_latest_status(self, mock_broadcast_message):
+        for status in ["pending", "running", "done"]:
+            self.status_updater.routine_status_updater("r1", status)
+        self.status_updater.task_status_updater("r1", "running", 1)
+        self.status_updater.task_status_updater("r1", "done", 1)
+        self.status_updater.flush()
+        updates = mock_broadcast_message.call_args.args[1]["updates"]
+        self.assertEqual([(update["type"], update["status"]) for update in updates], [("routine_status", "done"), ("task_status", "done")])
+        self.assertEqual(self.status_updater.get_stats()["changes"], 5)
+
+    @patch("RoutineManager.StatusUpdater.broadcast_message")
+    def test_nothing_to_flush(self, mock_broadcast_message):
+        self.status_updater.routine_status_updater("r1", "running")
+        self.status_updater.flush()
+        # unchanged status and pending tasks are not published
+        self.status_updater.routine_status_updater("r1", "running")
+        self.status_updater.task_status_updater("r1", TaskInstanceStatus.PENDING, 2)
+        self.assertEqual(self.status_updater.flush(), 0)
+        mock_broadcast_message.assert_called_once()
+
+    @patch("RoutineManager.StatusUpdater.broadcast_message")
+    def test_sync_resends_latest_state(self, mock_broadcast_message):
+        self.status_updater.routine_status_updater("r1", "running")
+        self.status_updater.task_status_updater("r1", "done", 1)
+        self.status_updater.task_status_updater("r1", "running", 2)
+        self.status_updater.routine_status_updater("r2", "waiting")
+        self.status_updater.flush()
+        self.status_updater.routine_status_updater("r2", "running")
+        self.status_updater.sync_interval = 0
+        self.assertEqual(self.status_updater.flush(), 3)
+        updates = mock_broadcast_message.call_args.args[1]["updates"]
+        # the pending change first, then the latest state of the other routines and their last task
+        self.assertEqual(
+            [(update["routine"], update.get("task_id", None), update["status"]) for update in updates],
+            [("r2", None, "running"), ("r1", None, "running"), ("r1", 2, "running")]
+        )
+
+if __name__ == '__main__':
+    unittest.main()
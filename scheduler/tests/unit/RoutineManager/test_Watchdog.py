@@ -0,0 +1,37 @@
+import time
+import unittest
+from RoutineManager.Watchdog import Watchdog
+
+
+class TestWatchdog(unittest.TestCase):
+    def test_watch_release(self):
+        watchdog = Watchdog()
+        deadline = watchdog.watch("routine", 1, 60)
+        self.assertAlmostEqual(deadline, time.time() + 60, delta=1)
+        self.assertFalse(watchdog.is_expired("routine"))
+        self.assertTrue(watchdog.is_expired("routine", deadline))
+
+        report = watchdog.release("routine")
+        self.assertEqual(report["task_id"], 1)
+        self.assertEqual(report["timeout_limit"], 60)
+        self.assertFalse(report["timed_out"])
+        self.assertLess(report["limit_usage"], 1)
+        self.assertIsNone(watchdog.get_deadline("routine"))
+        self.assertIsNone(watchdog.release("routine"))
+
+    def test_report(self):
+        watchdog = Watchdog(history_size=2)
+        for task_id in range(3):
+            watchdog.watch("routine", task_id, 60)
+            watchdog.release("routine", timed_out=True)
+        watchdog.watch("other", 4, 60)
+        report = watchdog.get_report()
+        self.assertEqual([entry["task_id"] for entry in report], [4, 1, 2])
+        self.assertTrue(report[0]["running"])
+        stats = watchdog.get_stats()
+        self.assertEqual((stats["finished"], stats["timed_out"]), (3, 3))
+        self.assertEqual([entry["task_id"] for entry in stats["running"]], [4])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import asyncio
+import threading
+import time
+import unittest
+from RoutineManager.WorkerPool import WorkerPool
+
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.pool = WorkerPool(max_workers=2, max_per_key=1)
+
+    def tearDown(self):
+        self.pool.shutdown(wait=True)
+
+    def test_run_off_loop_thread(self):
+        async def flow():
+            return await self.pool.run("routine", threading.get_ident)
+        self.assertNotEqual(asyncio.run(flow()), threading.get_ident())
+        stats = self.pool.get_stats()
+        self.assertEqual(stats["submitted"], 1)
+        self.assertEqual(stats["completed"], 1)
+        self.assertEqual(stats["queued"], 0)
+
+    def test_per_key_limit(self):
+        running = {"current": 0, "max": 0}
+        lock = threading.Lock()
+
+        def job():
+            with lock:
+                running["current"] += 1
+                running["max"] = max(running["max"], running["current"])
+            time.sleep(0.02)
+            with lock:
+                running["current"] -= 1
+            return True
+
+        async def flow():
+            return await asyncio.gather(*[self.pool.run("routine", job) for _ in range(4)])
+
+        self.assertEqual(asyncio.run(flow()), [True] * 4)
+        self.assertEqual(running["max"], 1)
+        self.assertGreater(self.pool.get_stats()["queue_wait_max"], 0)
+
+    def test_failure(self):
+        def job():
+            raise ValueError("failed")
+
+        async def flow():
+            return await self.pool.run("routine", job)
+
+        with self.assertRaises(ValueError):
+            asyncio.run(flow())
+        self.assertEqual(self.pool.get_stats()["failed"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
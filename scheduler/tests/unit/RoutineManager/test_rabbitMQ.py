@@ -0,0 +1,96 @@
+import unittest
+from unittest.mock import MagicMock, patch
+import pika
+from RoutineManager.rabbitMQ import Publisher
+
+
+class TestPublisher(unittest.TestCase):
+    def setUp(self):
+        self.connection = MagicMock()
+        self.channel = self.connection.channel.return_value
+
+    def test_reuses_connection_and_declarations(self):
+        publisher = Publisher(parameters=MagicMock())
+        with patch("pika.BlockingConnection", return_value=self.connection) as mock_connection:
+            self.assertTrue(publisher.publish("status_updates", {"status": "running"}))
+            self.assertTrue(publisher.publish("status_updates", {"status": "done"}))
+        mock_connection.assert_called_once()
+        self.channel.queue_declare.assert_called_once_with(queue="status_updates")
+        self.assertEqual(self.channel.basic_publish.call_count, 2)
+        self.assertEqual(publisher.get_stats()["published"], 2)
+
+    def test_buffers_while_disconnected(self):
+        publisher = Publisher(parameters=MagicMock(), reconnect_delay=0, wire_format="json")
+        with patch("pika.BlockingConnection", side_effect=pika.exceptions.AMQPConnectionError("down")):
+            self.assertFalse(publisher.publish("status_updates", {"status": "running"}))
+            self.assertFalse(publisher.publish("status_updates", {"status": "done"}))
+        self.assertEqual(publisher.get_stats()["buffered"], 2)
+        with patch("pika.BlockingConnection", return_value=self.connection):
+            self.assertEqual(publisher.flush(), 2)
+        bodies = [call.kwargs["body"] for call in self.channel.basic_publish.call_args_list]
+        self.assertEqual(bodies, [b'{"status": "running"}', b'{"status": "done"}'])
+
+    def test_buffer_drops_oldest(self):
+        publisher = Publisher(parameters=MagicMock(), buffer_size=2, wire_format="json")
+        with patch("pika.BlockingConnection", side_effect=pika.exceptions.AMQPConnectionError("down")):
+            for status in ["a", "b", "c"]:
+                publisher.publish("status_updates", {"status": status})
+        self.assertEqual([body for _queue, body, _content_type in publisher.buffer], [b'{"status": "b"}', b'{"status": "c"}'])
+        self.assertEqual(publisher.get_stats()["dropped"], 1)
+
+    def test_publish_to_exchange(self):
+        publisher = Publisher(parameters=MagicMock(), wire_format="json")
+        with patch("pika.BlockingConnection", return_value=self.connection):
+            self.assertTrue(publisher.publish_many("", [{"status": "running"}, {"status": "done"}], exchange="status_updates"))
+        self.channel.exchange_declare.assert_called_once_with(exchange="status_updates", exchange_type="fanout")
+        self.channel.queue_declare.assert_not_called()
+        publish = self.channel.basic_publish.call_args.kwargs
+        self.assertEqual((publish["exchange"], publish["routing_key"], publish["body"]), ("status_updates", "", b'{"status": "done"}'))
+        self.assertEqual(publish["properties"].content_type, "application/json")
+
+    def test_confirms(self):
+        publisher = Publisher(parameters=MagicMock(), confirms=True)
+        publisher.buffer.extend([(("", "status_updates"), body, "application/json") for body in [b"1", b"2", b"3"]])
+        with patch("pika.BlockingConnection", return_value=self.connection):
+            self.assertEqual(publisher.flush(), 3)
+        self.channel.confirm_delivery.assert_called_once()
+        self.assertTrue(self.channel.basic_publish.call_args.kwargs["mandatory"])
+        self.assertFalse(publisher.buffer)
+
+    def test_nacked_message_stays_buffered(self):
+        publisher = Publisher(parameters=MagicMock(), confirms=True, wire_format="json")
+        self.channel.basic_publish.side_effect = [None, pika.exceptions.NackError([]), None]
+        with patch("pika.BlockingConnection", return_value=self.connection) as mock_connection:
+            self.assertFalse(publisher.publish_many("status_updates", [{"status": "running"}, {"status": "done"}]))
+            self.assertEqual([body for _queue, body, _content_type in publisher.buffer], [b'{"status": "done"}'])
+            self.assertEqual(publisher.flush(), 1)
+        mock_connection.assert_called_once()
+        self.assertEqual(publisher.get_stats()["published"], 2)
+
+    def test_unroutable_message_dropped(self):
+        publisher = Publisher(parameters=MagicMock(), confirms=True)
+        self.channel.basic_publish.side_effect = [pika.exceptions.UnroutableError([]), None]
+        with patch("pika.BlockingConnection", return_value=self.connection):
+            self.assertTrue(publisher.publish_many("status_updates", [{"status": "running"}, {"status": "done"}]))
+        stats = publisher.get_stats()
+        self.assertEqual((stats["published"], stats["dropped"]), (1, 1))
+
+    def test_failed_publish_keeps_message(self):
+        publisher = Publisher(parameters=MagicMock(), confirms=True, reconnect_delay=60)
+        self.channel.basic_publish.side_effect = pika.exceptions.StreamLostError("lost")
+        with patch("pika.BlockingConnection", return_value=self.connection):
+            self.assertFalse(publisher.publish("status_updates", {"status": "running"}))
+        self.assertEqual(len(publisher.buffer), 1)
+
+    def test_idle_flush_services_connection(self):
+        publisher = Publisher(parameters=MagicMock())
+        with patch("pika.BlockingConnection", return_value=self.connection) as mock_connection:
+            self.assertEqual(publisher.flush(), 0)
+            mock_connection.assert_not_called()
+            publisher.publish("status_updates", {"status": "running"})
+            self.connection.process_data_events.reset_mock()
+            self.assertEqual(publisher.flush(), 0)
+        self.connection.process_data_events.assert_called_once_with(time_limit=0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,57 @@
+import json
+import unittest
+from RoutineManager import wire
+from RoutineManager.Status import RoutineStatus, TaskInstanceStatus
+
+
+class TestWire(unittest.TestCase):
+    def setUp(self):
+        self.batch = {"type": "status_batch", "updates": [
+            {"type": "routine_status", "routine": "r1", "status": "running", "epoch": 1700000000},
+            {"type": "task_status", "routine": "r1", "task_id": 3, "status": "done", "epoch": 1700000001},
+            {"type": "task_status", "routine": "r2", "task_id": 1, "status": "custom", "epoch": 1700000002},
+        ]}
+
+    @unittest.skipIf(wire.msgpack is None, "msgpack is not installed")
+    def test_status_batch_roundtrip(self):
+        body, content_type = wire.encode(self.batch, "msgpack")
+        self.assertEqual(content_type, wire.CONTENT_TYPE_MSGPACK)
+        self.assertEqual(wire.decode(body, content_type), self.batch)
+        self.assertLess(len(body), len(json.dumps(self.batch)) / 2)
+
+    @unittest.skipIf(wire.msgpack is None, "msgpack is not installed")
+    def test_command_roundtrip(self):
+        command = {"command": "execute", "routine": "r1", "sent_at": 1.5}
+        self.assertEqual(wire.decode(*wire.encode(command, "msgpack")), command)
+
+    def test_json_format(self):
+        body, content_type = wire.encode(self.batch, "json")
+        self.assertEqual(content_type, wire.CONTENT_TYPE_JSON)
+        self.assertEqual(json.loads(body), self.batch)
+
+    def test_decode_defaults_to_json(self):
+        self.assertEqual(wire.decode(b'{"command": "start"}', None), {"command": "start"})
+
+    def test_status_table_pinned(self):
+        self.assertEqual(wire.STATUS_BATCH_VERSION, 1)
+        self.assertEqual(wire.UPDATE_TYPES, ["routine_status", "task_status"])
+        self.assertEqual(wire.STATUSES, ["waiting", "pending", "done", "retry", "running", "canceled", "fail", "error", "complete", "unknown", "ready", "cancelled", "timeout"])
+
+    def test_statuses_have_codes(self):
+        statuses = [value for status_class in (RoutineStatus, TaskInstanceStatus) for name, value in vars(status_class).items() if name.isupper()]
+        self.assertEqual([status for status in statuses if status not in wire.STATUS_CODES], [])
+
+    @unittest.skipIf(wire.msgpack is None, "msgpack is not installed")
+    def test_pinned_body(self):
+        # the same bytes are pinned in server/tests/unit/test_wire.py, the other side of the wire
+        batch = {"type": "status_batch", "updates": [
+            {"type": "routine_status", "routine": "r1", "status": "timeout", "epoch": 1700000000},
+            {"type": "task_status", "routine": "r1", "task_id": 3, "status": "done", "epoch": 1700000001},
+        ]}
+        body = b'\x94\xa2sb\x01\x91\xa2r1\x92\x95\x00\x00\xc0\x0c\xceeS\xf1\x00\x95\x01\x00\x03\x02\xceeS\xf1\x01'
+        self.assertEqual(wire.encode(batch, "msgpack")[0], body)
+        self.assertEqual(wire.decode(body, wire.CONTENT_TYPE_MSGPACK), batch)
+
+
+if __name__ == '__main__':
+    unittest.main()
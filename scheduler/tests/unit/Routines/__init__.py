@@ -3,6 +3,12 @@ import unittest
 from .test_StocksPrice import TestStocksPrice
 from .test_StocksDaily import TestStocksDaily
 from .test_StocksEarnings import TestStocksEarnings
+from .test_StocksAio import TestStocksAio
+from .test_ArticlesFetch import TestArticlesFetch
+from .test_HTTPClient import TestHTTPClient
+from .test_SeenLinks import TestSeenLinks
+from .test_ArticlesIngest import TestArticlesIngest
+from .test_ArticlesParsers import TestArticlesParsers
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
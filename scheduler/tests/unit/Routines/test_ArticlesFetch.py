@@ -0,0 +1,54 @@
+import threading
+import time
+import unittest
+from concurrent.futures import TimeoutError
+from unittest.mock import patch
+from Routines.resources.Articles.fetch import fetch_all
+
+
+class TestArticlesFetch(unittest.TestCase):
+    def setUp(self):
+        self.lock = threading.Lock()
+        self.running = {}
+        self.max_running = {}
+
+    def slow_fetch(self, link, _http=None, timeout=None):
+        host = link.split("/")[2]
+        with self.lock:
+            self.running[host] = self.running.get(host, 0) + 1
+            self.max_running[host] = max(self.max_running.get(host, 0), self.running[host])
+        time.sleep(2 if "slow" in link else 0.05)
+        with self.lock:
+            self.running[host] -= 1
+        return link.encode()
+
+    def test_fetches_concurrently(self):
+        links = [f"https://a.test/{index}" for index in range(8)]
+        with patch("Routines.resources.Articles.fetch.fetch_link", side_effect=self.slow_fetch):
+            started_at = time.monotonic()
+            results = dict(fetch_all(links, max_workers=8, per_host=8))
+        self.assertLess(time.monotonic() - started_at, 0.3)
+        self.assertEqual(results, {link: link.encode() for link in links})
+
+    def test_per_host_limit(self):
+        links = [f"https://b.test/{index}" for index in range(6)] + [f"https://c.test/{index}" for index in range(6)]
+        with patch("Routines.resources.Articles.fetch.fetch_link", side_effect=self.slow_fetch):
+            results = dict(fetch_all(links, max_workers=12, per_host=2))
+        self.assertEqual(len(results), 12)
+        self.assertEqual(self.max_running, {"b.test": 2, "c.test": 2})
+
+    def test_deadline(self):
+        links = ["https://d.test/fast", "https://d.test/slow"]
+        with patch("Routines.resources.Articles.fetch.fetch_link", side_effect=self.slow_fetch):
+            results = dict(fetch_all(links, deadline=0.5))
+        self.assertEqual(results["https://d.test/fast"], b"https://d.test/fast")
+        self.assertIsInstance(results["https://d.test/slow"], TimeoutError)
+
+    def test_error_is_yielded(self):
+        with patch("Routines.resources.Articles.fetch.fetch_link", side_effect=OSError("unreachable")):
+            [(link, error)] = list(fetch_all(["https://e.test/1"]))
+        self.assertIsInstance(error, OSError)
+
+
+if __name__ == '__main__':
+    unittest.main()
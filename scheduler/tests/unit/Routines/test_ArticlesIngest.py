@@ -0,0 +1,119 @@
+import os
+import tempfile
+import unittest
+from contextlib import ExitStack
+from datetime import datetime
+from unittest.mock import patch
+from sqlalchemy import create_engine, inspect, text
+from ..Mocks.RealModules import real_modules
+
+
+def gen_article(link, source="bbc", author="Author"):
+    return {
+        "link": link,
+        "title": "Title",
+        "content": "Content",
+        "author": author,
+        "publication_date": datetime(2024, 1, 1),
+        "source": source,
+    }
+
+
+class TestArticlesIngest(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.stack = ExitStack()
+        cls.directory = cls.stack.enter_context(tempfile.TemporaryDirectory())
+        cls.stack.enter_context(patch.dict(os.environ, {"ARTICLES_DATABASE_URL": f"sqlite:///{cls.directory}/articles.db"}))
+        cls.db, _resources = cls.stack.enter_context(real_modules("db", "Routines.resources"))
+        import Routines.resources.Articles as articles
+        from Routines.resources.DBConnection import dispose_engine
+        cls.articles, cls.dispose_engine = articles, dispose_engine
+        articles.init_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dispose_engine()
+        cls.stack.close()
+
+    def setUp(self):
+        self.articles.get_seen_links().clear()
+
+    def get_stored(self, source):
+        from Routines.resources.DBConnection import get_session
+        session = get_session()
+        try:
+            return session.query(self.articles.Article).filter(self.articles.Article.source == source).all()
+        finally:
+            session.close()
+
+    def test_inserted_and_skipped(self):
+        add_articles = self.articles.add_articles
+        self.assertEqual(add_articles([gen_article("https://bbc.test/1"), gen_article("https://bbc.test/2")]), {"inserted": 2, "skipped": 0, "rejected": 0})
+        batch = [gen_article("https://bbc.test/2"), gen_article("https://bbc.test/3"), gen_article("https://bbc.test/1")]
+        self.assertEqual(add_articles(batch), {"inserted": 1, "skipped": 2, "rejected": 0})
+        self.assertEqual(len(self.get_stored("bbc")), 3)
+        self.assertEqual(self.articles.find_existing_links(["https://bbc.test/3", "https://bbc.test/4"], "bbc"), {"https://bbc.test/3"})
+
+    def test_seen_links_stats(self):
+        self.articles.add_articles([gen_article("https://skynews.test/1", "skynews")])
+        hits = self.articles.get_seen_links_stats()["hits"]
+        self.assertEqual(self.articles.find_existing_links(["https://skynews.test/1"], "skynews"), {"https://skynews.test/1"})
+        stats = self.articles.get_seen_links_stats()
+        self.assertEqual((stats["links"], stats["hits"]), (1, hits + 1))
+
+    def test_duplicates_in_one_batch(self):
+        batch = [gen_article("https://cnn.test/1", "cnn"), gen_article("https://cnn.test/1", "cnn"), gen_article("https://bbc.test/1", "cnn")]
+        self.assertEqual(self.articles.add_articles(batch), {"inserted": 2, "skipped": 1, "rejected": 0})
+        self.assertEqual(sorted(article.link for article in self.get_stored("cnn")), ["https://bbc.test/1", "https://cnn.test/1"])
+
+    def test_values_longer_than_their_column(self):
+        long_link = "https://ynet.test/" + "a" * 300
+        with self.assertLogs("Routines.resources.Articles", level="WARNING") as logs:
+            counts = self.articles.add_articles([
+                gen_article(long_link, "ynet"),
+                gen_article("https://ynet.test/1", "ynet", author="b" * 400),
+            ])
+        self.assertEqual(counts, {"inserted": 1, "skipped": 0, "rejected": 1})
+        self.assertTrue(any("rejected" in line for line in logs.output))
+        stored = self.get_stored("ynet")
+        self.assertEqual([(article.link, article.author) for article in stored], [("https://ynet.test/1", "b" * 300)])
+        self.assertEqual(self.articles.find_existing_links([long_link], "ynet"), set())
+
+    def test_scrape_feed_skips_failed_articles(self):
+        from Routines.resources.Articles import routine_factory
+        items = [("https://walla.test/3", "2024"), ("https://walla.test/2", "2024"), ("https://walla.test/1", "bad date"), ("https://walla.test/2", "2024")]
+        def fetch_all(links):
+            for link in links:
+                yield link, OSError("unreachable") if link == "https://walla.test/2" else b"<html></html>"
+        scrape = lambda: routine_factory.scrape_feed("https://walla.test/rss", "walla", "walla", lambda _soup: ("Title", "Content", "Author"), "%Y")
+        with patch.object(routine_factory, "fetch_link", return_value=b""), \
+                patch.object(routine_factory, "iter_rss_items", return_value=iter(items)), \
+                patch.object(routine_factory, "fetch_all", side_effect=fetch_all) as mock_fetch_all:
+            self.assertFalse(scrape())
+            self.assertEqual(mock_fetch_all.call_args.args[0], ["https://walla.test/3", "https://walla.test/2", "https://walla.test/1"])
+            self.assertEqual([article.link for article in self.get_stored("walla")], ["https://walla.test/3"])
+            for attempt in range(2, routine_factory.ARTICLES_FETCH_ATTEMPTS + 1):
+                routine_factory.iter_rss_items.return_value = iter(items)
+                # retried for the failed download, given up on the last attempt
+                self.assertEqual(scrape(), attempt == routine_factory.ARTICLES_FETCH_ATTEMPTS)
+            self.assertEqual(mock_fetch_all.call_args.args[0], ["https://walla.test/2", "https://walla.test/1"])
+        self.assertNotIn("https://walla.test/2", routine_factory._failed_attempts)
+
+    def test_init_db_adds_unique_index_to_existing_table(self):
+        url = f"sqlite:///{self.directory}/existing.db"
+        engine = create_engine(url)
+        self.articles.Article.__table__.create(engine)
+        with engine.begin() as connection:
+            connection.execute(text("DROP INDEX uq_articles_source_link"))
+        self.assertEqual(inspect(engine).get_indexes("articles"), [])
+        with patch.dict(os.environ, {"ARTICLES_DATABASE_URL": url}):
+            self.assertTrue(self.articles.init_db())
+            self.assertTrue(self.articles.init_db()) # already there
+        indexes = inspect(engine).get_indexes("articles")
+        self.assertEqual([(index["name"], index["unique"], index["column_names"]) for index in indexes], [("uq_articles_source_link", True, ["source", "link"])])
+        engine.dispose()
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,54 @@
+import unittest
+from unittest.mock import patch
+from bs4 import SoupStrainer
+import Routines.resources.Articles.parsers as parsers
+from Routines.resources.Articles.parsers import get_html_parser, iter_rss_items, parse_html
+
+FEED = b"""<?xml version="1.0" encoding="UTF-8"?>
+<rss version="2.0" xmlns:media="http://search.yahoo.com/mrss/"><channel><title>News</title>
+<item><title>First</title><guid isPermaLink="false"> https://news.test/1 </guid><pubDate>Mon, 01 Jan 2024 10:00:00 GMT</pubDate></item>
+<item><title>Second</title><link>https://news.test/2</link><media:thumbnail url="x"/><pubDate>Mon, 01 Jan 2024 09:00:00 GMT</pubDate></item>
+</channel></rss>"""
+
+
+class TestArticlesParsers(unittest.TestCase):
+    def test_iter_rss_items(self):
+        self.assertEqual(list(iter_rss_items(FEED)), [
+            ("https://news.test/1", "Mon, 01 Jan 2024 10:00:00 GMT"),
+            ("https://news.test/2", "Mon, 01 Jan 2024 09:00:00 GMT"),
+        ])
+
+    def test_iter_rss_items_standard_library(self):
+        with patch.object(parsers, "lxml_etree", None):
+            self.assertEqual([link for link, _pubdate in iter_rss_items(FEED)], ["https://news.test/1", "https://news.test/2"])
+
+    def test_comments_in_items(self):
+        feed = b"""<?xml version="1.0"?><rss><channel><!-- ad -->
+<item><!-- promo --><guid>https://news.test/1</guid><?tracking id="1"?><pubDate>date</pubDate></item>
+</channel></rss>"""
+        self.assertEqual(list(iter_rss_items(feed)), [("https://news.test/1", "date")])
+        with patch.object(parsers, "lxml_etree", None):
+            self.assertEqual(list(iter_rss_items(feed)), [("https://news.test/1", "date")])
+
+    def test_malformed_feed_falls_back_to_html(self):
+        feed = b"<rss><channel><item><guid>https://news.test/1</guid><pubDate>date</pubDate></item><item>&nbsp;<guid>https://news.test/2</guid></channel></rss>"
+        with patch.object(parsers, "lxml_etree", None):
+            self.assertEqual([link for link, _pubdate in iter_rss_items(feed)], ["https://news.test/1", "https://news.test/2"])
+
+    def test_parse_only(self):
+        page = b'<html><head><script>var a = 1;</script></head><body><nav><a href="/">Home</a></nav><h1 class="title">Headline</h1><div class="body"><p>Text</p></div></body></html>'
+        soup = parse_html(page, SoupStrainer(class_=["title", "body"]), "html.parser")
+        self.assertEqual(soup.find('h1', class_='title').text, "Headline")
+        self.assertEqual(soup.find('div', class_='body').text, "Text")
+        self.assertIsNone(soup.find('nav'))
+        self.assertIsNone(soup.find('script'))
+
+    def test_html_parser_without_lxml(self):
+        with patch.object(parsers, "lxml_etree", None):
+            self.assertEqual(get_html_parser("auto"), "html.parser")
+            self.assertEqual(get_html_parser("lxml"), "html.parser")
+        self.assertEqual(get_html_parser("html.parser"), "html.parser")
+
+
+if __name__ == '__main__':
+    unittest.main()
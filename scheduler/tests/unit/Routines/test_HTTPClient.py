@@ -0,0 +1,60 @@
+import gzip
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from Routines.resources.HTTPClient import HTTPClient, get_http_client, get_stats
+
+
+class Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1" # keep-alive
+
+    def do_GET(self):
+        body = b"<rss>" + b"item" * 100 + b"</rss>"
+        gzipped = "gzip" in self.headers.get("Accept-Encoding", "")
+        if gzipped:
+            body = gzip.compress(body)
+        self.send_response(200)
+        if gzipped:
+            self.send_header("Content-Encoding", "gzip")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestHTTPClient(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ThreadingHTTPServer(("127.0.0.1", 0), Handler)
+        threading.Thread(target=cls.server.serve_forever, daemon=True).start()
+        cls.url = f"http://127.0.0.1:{cls.server.server_address[1]}/feed"
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def test_keep_alive_reuses_connection(self):
+        client = HTTPClient()
+        for _ in range(3):
+            self.assertEqual(client.get(self.url).status, 200)
+        stats = client.get_stats()
+        self.assertEqual((stats["requests"], stats["hits"], stats["misses"]), (3, 2, 1))
+        self.assertEqual(stats["hosts"]["127.0.0.1"], {"requests": 3, "connections": 1})
+        client.clear()
+        self.assertEqual(client.get_stats()["requests"], 3)
+
+    def test_gzip_decoded(self):
+        response = HTTPClient().get(self.url)
+        self.assertEqual(response.headers["Content-Encoding"], "gzip")
+        self.assertEqual(response.data, b"<rss>" + b"item" * 100 + b"</rss>")
+
+    def test_stats_reported(self):
+        get_http_client().get(self.url)
+        self.assertGreaterEqual(get_stats()["hosts"]["127.0.0.1"]["requests"], 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
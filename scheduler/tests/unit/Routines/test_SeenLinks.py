@@ -0,0 +1,25 @@
+import unittest
+from Routines.resources.Articles.seen_links import SeenLinks
+
+
+class TestSeenLinks(unittest.TestCase):
+    def test_unknown_links(self):
+        seen_links = SeenLinks()
+        self.assertFalse(seen_links.is_warm("bbc"))
+        seen_links.add("bbc", ["a", "b"])
+        self.assertTrue(seen_links.is_warm("bbc"))
+        self.assertEqual(seen_links.unknown("bbc", ["c", "a", "d", "b"]), ["c", "d"])
+        self.assertEqual(seen_links.unknown("cnn", ["a"]), ["a"])
+        stats = seen_links.get_stats()
+        self.assertEqual((stats["hits"], stats["misses"]), (2, 3))
+
+    def test_evicts_least_recently_used(self):
+        seen_links = SeenLinks(capacity=2)
+        seen_links.add("bbc", ["a", "b"])
+        seen_links.unknown("bbc", ["a"]) # "b" is now the least recently used
+        seen_links.add("bbc", ["c"])
+        self.assertEqual(seen_links.unknown("bbc", ["a", "b", "c"]), ["b"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,48 @@
+import asyncio
+import os
+import tempfile
+import unittest
+from contextlib import ExitStack
+from unittest.mock import patch
+from ..Mocks.RealModules import real_modules
+
+
+class TestStocksAio(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.stack = ExitStack()
+        directory = cls.stack.enter_context(tempfile.TemporaryDirectory())
+        cls.stack.enter_context(patch.dict(os.environ, {"ARTICLES_DATABASE_URL": f"sqlite:///{directory}/articles.db"}))
+        cls.db, _resources = cls.stack.enter_context(real_modules("db", "Routines.resources"))
+        from Routines.resources.DBConnection import dispose_engine, get_session
+        from Routines.resources.Stocks import Stock
+        import Routines.resources.Stocks.aio as stocks_aio
+        cls.dispose_engine, cls.stocks_aio = dispose_engine, stocks_aio
+        session = get_session()
+        Stock.metadata.create_all(session.get_bind())
+        inactive = Stock("OLD", "Delisted")
+        inactive.status = "inactive"
+        session.add_all([Stock("AAPL", "Apple"), Stock("GOOGL", "Alphabet"), inactive])
+        session.commit()
+        session.close()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.dispose_engine()
+        cls.stack.close()
+
+    def get_symbols(self, **kwargs):
+        async def run():
+            try:
+                return sorted(stock.symbol for stock in await self.stocks_aio.get_stocks_list(**kwargs))
+            finally:
+                await self.db.close_async_engine()
+        return asyncio.run(run())
+
+    def test_get_stocks_list(self):
+        self.assertEqual(self.get_symbols(), ["AAPL", "GOOGL"])
+        self.assertEqual(self.get_symbols(active_only=False), ["AAPL", "GOOGL", "OLD"])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -3,6 +3,7 @@ import unittest
 from .Mocks import *
 from .Routines import *
 from .RoutineManager import *
+from .db import *
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,8 @@
+import unittest
+
+from .test_engine import TestEngine
+from .test_journal import TestStatusJournal
+from .test_aio import TestAio
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,68 @@
+import os
+import tempfile
+import unittest
+from contextlib import ExitStack
+from unittest.mock import patch
+from ..Mocks.RealModules import real_modules
+
+
+class TestEngine(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.stack = ExitStack()
+        cls.directory = cls.stack.enter_context(tempfile.TemporaryDirectory())
+        cls.stack.enter_context(patch.dict(os.environ, {"DATABASE_URL": f"sqlite:///{cls.directory}/scheduler.db"}))
+        cls.db, = cls.stack.enter_context(real_modules("db"))
+        cls.db.init_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.dispose_engine()
+        cls.stack.close()
+
+    def test_one_engine_per_url(self):
+        from db.engine import EnginePool, get_pool_settings
+        engines = EnginePool(get_pool_settings())
+        first_url, second_url = f"sqlite:///{self.directory}/first.db", f"sqlite:///{self.directory}/second.db"
+        engine = engines.get_engine(first_url)
+        self.assertIs(engines.get_engine(first_url), engine)
+        self.assertIsNot(engines.get_engine(second_url), engine)
+        self.assertIs(self.db.get_engine(), self.db.get_engine())
+        engines.dispose()
+        self.assertIsNot(engines.get_engine(first_url), engine)
+        engines.dispose()
+
+    def test_pool_settings_prefix(self):
+        from db.engine import get_pool_settings
+        with patch.dict(os.environ, {"ARTICLES_DB_POOL_SIZE": "3"}):
+            self.assertEqual(get_pool_settings("ARTICLES_")["pool_size"], 3)
+            self.assertEqual(get_pool_settings()["pool_size"], 5)
+
+    def test_session_scope_commits(self):
+        Routine = self.db.Routine
+        with self.db.session_scope() as session:
+            session.add(Routine(name="committed", description=""))
+        with self.db.session_scope() as session:
+            self.assertEqual(session.query(Routine).filter(Routine.name == "committed").count(), 1)
+
+    def test_session_scope_rolls_back(self):
+        Routine = self.db.Routine
+        with self.assertRaises(ValueError):
+            with self.db.session_scope() as session:
+                session.add(Routine(name="rolled back", description=""))
+                session.flush()
+                raise ValueError("failed unit of work")
+        with self.db.session_scope() as session:
+            self.assertEqual(session.query(Routine).filter(Routine.name == "rolled back").count(), 0)
+
+    def test_pool_stats(self):
+        with self.db.session_scope():
+            pass
+        stats = self.db.get_pool_stats()
+        self.assertEqual(set(stats), {"size", "checked_out", "checked_in", "overflow", "wait_avg", "wait_max", "checkouts"})
+        self.assertEqual(stats["checked_out"], 0)
+        self.assertGreater(stats["checkouts"], 0)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,114 @@
+import os
+import tempfile
+import time
+import unittest
+from contextlib import ExitStack, contextmanager
+from unittest.mock import patch
+from ..Mocks.RealModules import real_modules
+
+
+class TestStatusJournal(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.stack = ExitStack()
+        directory = cls.stack.enter_context(tempfile.TemporaryDirectory())
+        cls.stack.enter_context(patch.dict(os.environ, {"DATABASE_URL": f"sqlite:///{directory}/scheduler.db"}))
+        cls.db, = cls.stack.enter_context(real_modules("db"))
+        cls.db.init_db()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.db.dispose_engine()
+        cls.stack.close()
+
+    def setUp(self):
+        with self.db.session_scope() as session:
+            self.routines = [self.db.Routine(name=f"routine {index}", description="") for index in range(2)]
+            session.add_all(self.routines)
+        self.journal = None
+
+    def tearDown(self):
+        if self.journal is not None:
+            self.journal.close()
+
+    def gen_journal(self, session_scope=None, **kwargs):
+        from db.journal import StatusJournal
+        self.journal = StatusJournal(session_scope or self.db.session_scope, **kwargs)
+        return self.journal
+
+    def get_routine(self, routine):
+        with self.db.session_scope() as session:
+            return session.get(self.db.Routine, routine.id)
+
+    def wait_written(self, journal, rows, timeout=2.0):
+        deadline = time.monotonic() + timeout
+        while journal.rows_written < rows and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return journal.rows_written
+
+    def test_coalesces_updates_per_row(self):
+        journal = self.gen_journal(interval_ms=60000)
+        routine = self.routines[0]
+        journal.record(self.db.Routine, routine.id, status="running")
+        journal.record(self.db.Routine, routine.id, status="done", error="")
+        journal.record(self.db.Routine, routine.id, num_retries=2)
+        self.assertEqual(journal.flush(), 1)
+        stored = self.get_routine(routine)
+        self.assertEqual((stored.status, stored.num_retries), ("done", 2))
+        self.assertEqual(journal.get_stats()["events"], 3)
+
+    def test_flushes_on_max_events(self):
+        journal = self.gen_journal(interval_ms=60000, max_events=3)
+        for status in ("pending", "running", "done"):
+            journal.record(self.db.Routine, self.routines[0].id, status=status)
+        self.assertEqual(self.wait_written(journal, 1), 1)
+        self.assertEqual(self.get_routine(self.routines[0]).status, "done")
+
+    def test_flushes_on_interval(self):
+        journal = self.gen_journal(interval_ms=20, max_events=1000)
+        journal.record(self.db.Routine, self.routines[0].id, status="running")
+        self.assertEqual(self.wait_written(journal, 1), 1)
+
+    def test_retries_failed_flush(self):
+        failures = {"left": 2}
+        @contextmanager
+        def flaky_session_scope():
+            if failures["left"]:
+                failures["left"] -= 1
+                raise ConnectionError("database unavailable")
+            with self.db.session_scope() as session:
+                yield session
+        journal = self.gen_journal(flaky_session_scope, interval_ms=60000, max_retries=3)
+        journal.record(self.db.Routine, self.routines[0].id, status="running")
+        with self.assertLogs("db.journal", level="ERROR"):
+            self.assertEqual(journal.flush(), 0)
+            journal.record(self.db.Routine, self.routines[0].id, status="done") # newer than the failed batch
+            self.assertEqual(journal.flush(), 0)
+        self.assertEqual(journal.flush(), 1)
+        self.assertEqual(self.get_routine(self.routines[0]).status, "done")
+        self.assertEqual(journal.get_stats()["failures"], 2)
+
+    def test_drops_failing_row_after_max_retries(self):
+        journal = self.gen_journal(interval_ms=60000, max_retries=2)
+        journal.record(self.db.Routine, self.routines[0].id, status="running")
+        journal.record(self.db.Routine, self.routines[1].id, status=object()) # cannot be bound
+        with self.assertLogs("db.journal", level="ERROR") as logs:
+            self.assertEqual(journal.flush(), 0)
+            self.assertEqual(journal.flush(), 1)
+        self.assertIn(f"dropped the update of Routine {self.routines[1].id}", logs.output[-1])
+        stats = journal.get_stats()
+        self.assertEqual((stats["pending_rows"], stats["dropped"]), (0, 1))
+        self.assertEqual(self.get_routine(self.routines[0]).status, "running")
+        self.assertEqual(journal.flush(), 0)
+
+    def test_close_flushes_pending(self):
+        journal = self.gen_journal(interval_ms=60000)
+        journal.record(self.db.Routine, self.routines[0].id, status="running")
+        journal.close()
+        self.assertEqual(self.get_routine(self.routines[0]).status, "running")
+        journal.record(self.db.Routine, self.routines[1].id, status="done") # written through after close
+        self.assertEqual(self.get_routine(self.routines[1]).status, "done")
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+"""
+Read throughput of Logic while status updates stream in, and consistency of what readers see.
+
+    cd server && python benchmarks/logic_reads.py --routines 50 --readers 8 --seconds 3
+
+A writer thread applies one status batch per routine every `--interval` ms (every task and the
+routine take the same status). Reader threads read /routine/status and /routine/status_all
+payloads: a read is torn when a routine shows tasks from different batches.
+"""
+import argparse
+import json
+import os
+import sys
+import threading
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from logic import Logic
+
+
+def writer(logic: Logic, routines: list, interval: float, stop: threading.Event, counters: dict) -> None:
+    batch = 0
+    while not stop.is_set():
+        batch += 1
+        updates = []
+        for routine in routines:
+            updates.append({"type": "routine_status", "routine": routine, "status": f"s{batch}", "epoch": batch})
+            for task_id in range(batch, batch + logic.MAX_TASKS):
+                updates.append({"type": "task_status", "routine": routine, "task_id": task_id, "status": f"s{batch}", "epoch": batch})
+        logic.apply_updates(updates)
+        counters["batches"] = batch
+        counters["updates"] += len(updates)
+        time.sleep(interval)
+
+
+def reader(logic: Logic, routines: list, stop: threading.Event, results: list) -> None:
+    reads = torn = 0
+    while not stop.is_set():
+        for routine in routines:
+            state = logic.format_state(routine)
+            if any(task["status"] != state["status"] for task in state["tasks"]):
+                torn += 1
+            reads += 1
+        _etag, payload = logic.get_status_all()
+        if reads % 50 == 0:
+            # decoding is the client's cost, sample it only to check the payload
+            for state in json.loads(payload)["routines"].values():
+                if any(task["status"] != state["status"] for task in state["tasks"]):
+                    torn += 1
+        reads += 1
+    results.append((reads, torn))
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routines", type=int, default=50)
+    parser.add_argument("--readers", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=3)
+    parser.add_argument("--interval", type=float, default=1, help="ms between update batches")
+    args = parser.parse_args()
+
+    logic = Logic()
+    logic.reset_routines()
+    routines = [f"routine_{i}" for i in range(args.routines)]
+    stop = threading.Event()
+    counters = {"batches": 0, "updates": 0}
+    results = []
+    threads = [threading.Thread(target=writer, args=(logic, routines, args.interval / 1000, stop, counters))]
+    threads += [threading.Thread(target=reader, args=(logic, routines, stop, results)) for _ in range(args.readers)]
+    for thread in threads:
+        thread.start()
+    time.sleep(args.seconds)
+    stop.set()
+    for thread in threads:
+        thread.join()
+
+    reads = sum(reads for reads, _torn in results)
+    torn = sum(torn for _reads, torn in results)
+    print(f"routines={args.routines} readers={args.readers} seconds={args.seconds}")
+    print(f"writes: {counters['batches']} batches, {counters['updates'] / args.seconds:,.0f} updates/s")
+    print(f"reads:  {reads / args.seconds:,.0f} reads/s, torn reads: {torn}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,73 @@
+"""
+Size and encode / decode throughput of the status batches on the wire: JSON, plain msgpack
+and the compact msgpack batch of `wire` (routine names interned, statuses as codes).
+
+    cd server && python benchmarks/wire_codec.py --routines 50 --tasks 5 --seconds 2
+
+One batch holds the status of every routine and of its last `--tasks` tasks, as the scheduler
+full state sync sends it.
+"""
+import argparse
+import json
+import os
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import wire
+
+
+def build_batch(routines: int, tasks: int) -> dict:
+    updates = []
+    epoch = int(time.time())
+    for routine in range(routines):
+        routine_name = f"routine_{routine}"
+        updates.append({"type": "routine_status", "routine": routine_name, "status": "waiting", "epoch": epoch})
+        for task_id in range(tasks):
+            updates.append({"type": "task_status", "routine": routine_name, "task_id": 1000 + task_id, "status": "done", "epoch": epoch})
+    return {"type": "status_batch", "updates": updates}
+
+
+def measure(encode, decode, seconds: float) -> tuple:
+    body = encode()
+    encoded = 0
+    started_at = time.perf_counter()
+    while time.perf_counter() - started_at < seconds / 2:
+        encode()
+        encoded += 1
+    encode_rate = encoded / (time.perf_counter() - started_at)
+    decoded = 0
+    started_at = time.perf_counter()
+    while time.perf_counter() - started_at < seconds / 2:
+        decode(body)
+        decoded += 1
+    decode_rate = decoded / (time.perf_counter() - started_at)
+    return len(body), encode_rate, decode_rate
+
+
+def main() -> None:
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--routines", type=int, default=50)
+    parser.add_argument("--tasks", type=int, default=5)
+    parser.add_argument("--seconds", type=float, default=2)
+    args = parser.parse_args()
+
+    batch = build_batch(args.routines, args.tasks)
+    codecs = {"json": (lambda: json.dumps(batch).encode(), json.loads)}
+    if wire.msgpack is not None:
+        codecs["msgpack"] = (lambda: wire.msgpack.packb(batch, use_bin_type=True), lambda body: wire.msgpack.unpackb(body, raw=False))
+        codecs["compact"] = (lambda: wire.encode(batch, "msgpack")[0], lambda body: wire.decode(body, wire.CONTENT_TYPE_MSGPACK))
+    else:
+        print("msgpack is not installed, only JSON is measured")
+
+    print(f"{len(batch['updates'])} updates per batch")
+    json_size = None
+    for name, (encode, decode) in codecs.items():
+        size, encode_rate, decode_rate = measure(encode, decode, args.seconds)
+        json_size = json_size or size
+        print(f"{name:>8}: {size:>7} bytes ({size / json_size:.0%}), encode {encode_rate:>8.0f}/s, decode {decode_rate:>8.0f}/s")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,178 @@
+import bisect
+import logging
+import os
+import threading
+import time
+import uuid
+from typing import Any, Dict, List, Optional
+import pika
+from pika.adapters.blocking_connection import BlockingChannel
+from rabbitMQ import send_message
+import wire
+
+logger = logging.getLogger(__name__)
+
+COMMANDS_QUEUE = "commands"
+COMMAND_REPLY_TIMEOUT = float(os.environ.get("COMMAND_REPLY_TIMEOUT", 5)) # seconds an API call waits for the scheduler
+COMMAND_LATENCY_BUCKETS_MS = [5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000, 10000]
+
+
+class LatencyHistogram:
+    """Latencies counted in fixed millisecond buckets (per bucket, not cumulative), the last bucket is unbounded."""
+    def __init__(self, buckets_ms: List[float] = COMMAND_LATENCY_BUCKETS_MS):
+        self.buckets_ms = list(buckets_ms)
+        self.counts = [0] * (len(self.buckets_ms) + 1)
+        self.count = 0
+        self.total_ms = 0.0
+        self.max_ms = 0.0
+        self._lock = threading.Lock()
+
+    def record(self, latency_ms: float) -> None:
+        with self._lock:
+            self.counts[bisect.bisect_left(self.buckets_ms, latency_ms)] += 1
+            self.count += 1
+            self.total_ms += latency_ms
+            self.max_ms = max(self.max_ms, latency_ms)
+
+    def percentile(self, percent: float) -> Optional[float]:
+        """Upper bound of the bucket holding the given percentile (None when empty or in the unbounded bucket)."""
+        with self._lock:
+            if not self.count:
+                return None
+            rank = percent / 100 * self.count
+            seen = 0
+            for index, count in enumerate(self.counts):
+                seen += count
+                if seen >= rank and count:
+                    return self.buckets_ms[index] if index < len(self.buckets_ms) else None
+        return None
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            buckets = {f"le_{bound}": count for bound, count in zip(self.buckets_ms, self.counts)}
+            buckets["inf"] = self.counts[-1]
+            count, total_ms, max_ms = self.count, self.total_ms, self.max_ms
+        return {
+            "count": count,
+            "average_ms": total_ms / count if count else None,
+            "max_ms": max_ms,
+            "p50_ms": self.percentile(50),
+            "p99_ms": self.percentile(99),
+            "buckets": buckets,
+        }
+
+
+class PendingCommand:
+    __slots__ = ("event", "reply")
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.reply: Optional[Dict[str, Any]] = None
+
+
+class CommandClient:
+    """
+    Request/reply commands to the scheduler.
+
+    Each command carries a correlation id and the name of this process reply queue (exclusive,
+    consumed on the status consumer connection). The scheduler replies once the command is applied,
+    with its result. `send` waits for that reply up to a timeout, the end-to-end latency of every
+    reply (late ones included) is recorded in a histogram.
+    """
+    def __init__(self, timeout: float = COMMAND_REPLY_TIMEOUT):
+        self.timeout = timeout
+        self.reply_queue: Optional[str] = None
+        self.pending: Dict[str, PendingCommand] = {}
+        self.latency = LatencyHistogram()
+        self._lock = threading.Lock()
+
+        # Metrics
+        self.sent = 0
+        self.replies = 0
+        self.timeouts = 0
+        self.late_replies = 0
+
+    def bind(self, channel: BlockingChannel) -> None:
+        """Declare the reply queue and consume it on `channel` (before it starts consuming)."""
+        self.reply_queue = channel.queue_declare(queue="", exclusive=True).method.queue
+        channel.basic_consume(queue=self.reply_queue, on_message_callback=self.on_reply, auto_ack=True)
+        logger.info(f"CommandClient: replies on queue {self.reply_queue}")
+
+    def on_reply(self, _ch, _method, properties: pika.BasicProperties, body: bytes) -> None:
+        try:
+            reply = wire.decode(body, properties.content_type)
+        except ValueError as e:
+            logger.error(f"CommandClient: malformed reply {body}: {e}")
+            return
+        sent_at = reply.get("sent_at", None)
+        if sent_at is not None:
+            self.latency.record((time.time() - sent_at) * 1000)
+        with self._lock:
+            pending = self.pending.pop(properties.correlation_id, None)
+            self.replies += 1
+            if pending is None:
+                self.late_replies += 1
+        if pending is None:
+            logger.warning(f"CommandClient: reply {properties.correlation_id} arrived after its timeout")
+            return
+        pending.reply = reply
+        pending.event.set()
+
+    def send(
+            self,
+            command: str,
+            routine_name: str,
+            wait: bool = True,
+            timeout: Optional[float] = None,
+            idempotency_key: Optional[str] = None
+        ) -> Dict[str, Any]:
+        """
+        Send a command. Without `wait` (or without a reply queue) it returns once published,
+        otherwise it returns the scheduler result, or a `pending` status when the timeout elapses.
+        The scheduler applies a command once per `idempotency_key` (a new key per call by default,
+        a client retrying the same request passes the same key).
+        """
+        correlation_id = uuid.uuid4().hex
+        message = {"command": command, "routine": routine_name, "idempotency_key": idempotency_key or correlation_id}
+        if not wait or self.reply_queue is None:
+            send_message(COMMANDS_QUEUE, message)
+            return {"status": "sent", "idempotency_key": message["idempotency_key"]}
+
+        pending = PendingCommand()
+        with self._lock:
+            self.pending[correlation_id] = pending
+            self.sent += 1
+        message["sent_at"] = time.time()
+        send_message(
+            COMMANDS_QUEUE,
+            message,
+            pika.BasicProperties(reply_to=self.reply_queue, correlation_id=correlation_id)
+        )
+        if not pending.event.wait(self.timeout if timeout is None else timeout):
+            with self._lock:
+                self.pending.pop(correlation_id, None)
+                self.timeouts += 1
+            logger.warning(f"CommandClient: no reply to {command} {routine_name} ({correlation_id}) in time")
+            return {"status": "pending", "correlation_id": correlation_id}
+        return dict(pending.reply["result"], correlation_id=correlation_id)
+
+    def get_stats(self) -> Dict[str, Any]:
+        with self._lock:
+            stats = {
+                "sent": self.sent,
+                "replies": self.replies,
+                "timeouts": self.timeouts,
+                "late_replies": self.late_replies,
+                "pending": len(self.pending),
+            }
+        stats["latency"] = self.latency.get_stats()
+        return stats
+
+
+_command_client: Optional[CommandClient] = None
+
+def get_command_client() -> CommandClient:
+    global _command_client
+    if _command_client is None:
+        _command_client = CommandClient()
+    return _command_client
@@ -0,0 +1,103 @@
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+TASK_HISTORY_DEPTH = int(os.environ.get("TASK_HISTORY_DEPTH", 5)) # tasks kept per routine
+TASK_DURATIONS_DEPTH = int(os.environ.get("TASK_DURATIONS_DEPTH", 20)) # durations kept for the routine stats
+
+FINAL_TASK_STATUSES = ("done", "error", "cancelled", "timeout", "unknown")
+
+
+class TaskHistory:
+    """
+    The last `depth` tasks of a routine in a fixed-size ring of slots, with an index from task id to slot.
+    A new task takes the slot of the oldest one, updates and evictions are O(1).
+
+    Totals of the tasks final statuses and the durations of the last finished tasks are kept
+    beyond the ring, so the history summary does not grow with the number of tasks.
+    Instances published in a Logic snapshot are not mutated: the writer updates a `copy`.
+    """
+    __slots__ = ("depth", "durations_depth", "slots", "index", "head", "totals", "durations")
+
+    def __init__(self, depth: int = TASK_HISTORY_DEPTH, durations_depth: int = TASK_DURATIONS_DEPTH):
+        self.depth = depth
+        self.durations_depth = durations_depth
+        # task: {"id", "status", "epoch", "started"}, slot entries are replaced, never mutated
+        self.slots: List[Optional[Dict[str, Any]]] = [None] * depth
+        self.index: Dict[int, int] = {}
+        self.head = 0 # next slot to take, holds the oldest task once the ring is full
+        self.totals: Dict[str, int] = {}
+        self.durations: Tuple[int, ...] = ()
+
+    def copy(self) -> "TaskHistory":
+        history = TaskHistory.__new__(TaskHistory)
+        history.depth = self.depth
+        history.durations_depth = self.durations_depth
+        history.slots = list(self.slots)
+        history.index = dict(self.index)
+        history.head = self.head
+        history.totals = dict(self.totals)
+        history.durations = self.durations
+        return history
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Serializable form, the tasks in the order they were added."""
+        order = [(self.head + offset) % self.depth for offset in range(self.depth)]
+        return {
+            "tasks": [self.slots[slot] for slot in order if self.slots[slot] is not None],
+            "totals": dict(self.totals),
+            "durations": list(self.durations),
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any], depth: int = TASK_HISTORY_DEPTH, durations_depth: int = TASK_DURATIONS_DEPTH) -> "TaskHistory":
+        history = cls(depth, durations_depth)
+        # a smaller depth than the one saved keeps the latest tasks
+        for task in data.get("tasks", [])[-depth:]:
+            history.index[task["id"]] = history.head
+            history.slots[history.head] = dict(task)
+            history.head = (history.head + 1) % depth
+        history.totals = dict(data.get("totals", {}))
+        history.durations = tuple(data.get("durations", []))[-durations_depth:]
+        return history
+
+    def update(self, task_id: int, status: str, epoch: int) -> bool:
+        """Record the status of a task, returns False when the update is outdated or already known."""
+        slot = self.index.get(task_id, None)
+        if slot is None:
+            oldest = self.slots[self.head]
+            if oldest is not None:
+                if task_id < oldest["id"]:
+                    # older than every task kept
+                    return False
+                del self.index[oldest["id"]]
+            slot = self.head
+            self.head = (self.head + 1) % self.depth
+            self.index[task_id] = slot
+            task = {"id": task_id, "status": None, "epoch": 0, "started": None}
+        else:
+            task = self.slots[slot]
+            if epoch < task["epoch"] or (epoch, status) == (task["epoch"], task["status"]):
+                return False
+
+        started = task["started"]
+        if status == "running" and started is None:
+            started = epoch
+        if status in FINAL_TASK_STATUSES and task["status"] not in FINAL_TASK_STATUSES:
+            self.totals[status] = self.totals.get(status, 0) + 1
+            if started is not None:
+                self.durations = (self.durations + (epoch - started,))[-self.durations_depth:]
+        self.slots[slot] = {"id": task_id, "status": status, "epoch": epoch, "started": started}
+        return True
+
+    def tasks(self) -> List[Dict[str, Any]]:
+        """The tasks kept, latest first."""
+        tasks = [task for task in self.slots if task is not None]
+        tasks.sort(key=lambda task: task["id"], reverse=True)
+        return tasks
+
+    def get_stats(self) -> Dict[str, Any]:
+        return {
+            "totals": dict(self.totals),
+            "durations": list(self.durations),
+            "average_duration": sum(self.durations) / len(self.durations) if self.durations else None,
+        }
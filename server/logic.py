@@ -1,11 +1,18 @@
 import json
 import logging
+import os
+import queue
+import threading
+import uuid
 
-from typing import Any, Dict, List
-from rabbitMQ import send_message
+from typing import Any, Dict, List, Optional, Set, Tuple
+from history import TASK_HISTORY_DEPTH, TaskHistory
+import wire
 
 logger = logging.getLogger(__name__)
 
+STREAM_QUEUE_SIZE = int(os.environ.get("STREAM_QUEUE_SIZE", 1000)) # events buffered per stream client
+
 
 def singleton(cls):
     instances = {}
@@ -16,109 +23,242 @@ def singleton(cls):
     return get_instance
 
 
+class StateSnapshot:
+    """
+    Immutable view of every routine state. Never mutated once published: the writer builds a new
+    snapshot and swaps the reference, readers keep using the one they took without any lock.
+    """
+    __slots__ = ("version", "routines", "views", "_payload")
+
+    def __init__(self, version: int, routines: Dict[str, Dict[str, Any]], views: Dict[str, Dict[str, Any]]):
+        self.version = version
+        self.routines = routines # routine -> {"status", "epoch", "history": TaskHistory}
+        self.views = views # routine -> the state as the UI shows it, see format_routine
+        self._payload: Optional[bytes] = None
+
+    def get_payload(self) -> bytes:
+        """The JSON of every routine state, serialized once per snapshot."""
+        if self._payload is None:
+            # concurrent readers may both serialize, they produce the same bytes
+            self._payload = json.dumps({"version": self.version, "routines": self.views}).encode()
+        return self._payload
+
+
+def format_routine(routine_state: Dict[str, Any]) -> Dict[str, Any]:
+    """The routine state as the UI shows it: its status, its tasks latest first and the tasks stats."""
+    history = routine_state["history"]
+    return {
+        "status": routine_state["status"],
+        "tasks": [{"name": task["id"], "status": task["status"]} for task in history.tasks()],
+        "stats": history.get_stats(),
+    }
+
+
 @singleton
 class Logic:
+    """
+    Routine states fed by the RabbitMQ consumer thread and read by the request threads.
+
+    The state is a copy-on-write `StateSnapshot`: `apply_updates` copies only the routines a batch
+    touches, then swaps the snapshot reference in one assignment. Reads take the current reference
+    and never lock, they always see a whole batch or none of it. The lock only orders writers
+    and stream subscriptions.
+    """
     def __init__(self):
-        self.MAX_TASKS = 5
-        self.routines = {}
+        self.MAX_TASKS = TASK_HISTORY_DEPTH
+        self.lock = threading.RLock()
+        self.subscribers: Set[queue.Queue] = set()
+        # the instance id keeps the versions of a previous process apart
+        self.instance = uuid.uuid4().hex[:8]
+        self.snapshot = StateSnapshot(0, {}, {})
+
+    @property
+    def routines(self) -> Dict[str, Dict[str, Any]]:
+        return self.snapshot.routines
+
+    @property
+    def version(self) -> int:
+        return self.snapshot.version
 
     def reset_routines(self):
-        self.routines.clear()
+        with self.lock:
+            self.snapshot = StateSnapshot(self.snapshot.version + 1, {}, {})
+
+    def get_etag(self) -> str:
+        return f"{self.instance}-{self.version}"
+
+    def get_status_all(self) -> Tuple[str, bytes]:
+        """The state of every routine as a JSON payload and its ETag."""
+        snapshot = self.snapshot
+        return f"{self.instance}-{snapshot.version}", snapshot.get_payload()
 
     def get_routines_list(self) -> List[str]:
-        routines_list = [routine for routine in self.routines.keys()]
+        routines_list = [routine for routine in self.snapshot.routines.keys()]
         return routines_list
 
     def get_state(self, routine_name: str) -> Dict[str, Any]:
-        routine_state = self.routines.get(routine_name, {
-                    "status": None,
-                    "tasks": {}
-                })
-        return routine_state
-
-    def get_routine_state(self, routine_name: str) -> Dict[str, Any]:
-        logger.debug(f"get_routine_state | Getting state for routine {routine_name}")
-        routine_status = self.routines.get(routine_name, None)
-        logger.debug(f"get_routine_state | Routine status: {routine_status}")
-        if routine_status is None:
-            logger.debug(f"get_routine_state | Routine {routine_name} not found. Creating new entry")
-            routine_status = {
-                "epoch": 0,
-                "status": None,
-                "tasks": {}
-            }
-            logger.debug(f"get_routine_state | Routine {routine_name} created: {routine_status}")
-            self.routines[routine_name] = routine_status
-        logger.debug(f"get_routine_state | Returning routine {routine_status}")
-        return routine_status
-    
-    def get_task_state(self, routine_name: str, task_id: int) -> Dict[str, Any]:
-        routine_state = self.get_routine_state(routine_name)
-        tasks = routine_state.get("tasks", None)
-        if tasks is None:
-            tasks = {}
-            routine_state["tasks"] = tasks
-
-        task_status = tasks.get(task_id, None)
-        if task_status is None:
-            task_status = {"epoch": 0, "status": None}
-            routine_state["tasks"][task_id] = task_status
-
-        return routine_state["tasks"][task_id]
-    
+        routine_state = self.snapshot.routines.get(routine_name, None)
+        if routine_state is None:
+            return {"status": None, "tasks": {}}
+        return {
+            "status": routine_state["status"],
+            "epoch": routine_state["epoch"],
+            "tasks": {task["id"]: {"status": task["status"], "epoch": task["epoch"]} for task in routine_state["history"].tasks()},
+        }
+
+    def format_state(self, routine_name: str) -> Dict[str, Any]:
+        view = self.snapshot.views.get(routine_name, None)
+        if view is None:
+            return {"status": None, "tasks": [], "stats": TaskHistory(self.MAX_TASKS).get_stats()}
+        return view
+
+    def subscribe(self, queue_size: int = STREAM_QUEUE_SIZE) -> queue.Queue:
+        """
+        Register a stream client. Its queue starts with a snapshot of every routine,
+        followed by the state of each routine as updates are applied.
+        """
+        events = queue.Queue(maxsize=queue_size)
+        with self.lock:
+            events.put_nowait(("snapshot", self.snapshot.views))
+            self.subscribers.add(events)
+        logger.debug(f"subscribe | {len(self.subscribers)} stream clients")
+        return events
+
+    def unsubscribe(self, events: queue.Queue) -> None:
+        with self.lock:
+            self.subscribers.discard(events)
+        logger.debug(f"unsubscribe | {len(self.subscribers)} stream clients")
+
+    def publish_routine(self, routine_name: str) -> None:
+        with self.lock:
+            if not self.subscribers:
+                return
+            event = ("routine", {"name": routine_name, **self.format_state(routine_name)})
+            for events in list(self.subscribers):
+                try:
+                    events.put_nowait(event)
+                except queue.Full:
+                    # a client that does not keep up is dropped, it gets a fresh snapshot when it reconnects
+                    logger.warning("publish_routine | Stream client is too slow, disconnecting it")
+                    self.subscribers.discard(events)
+                    self._close_stream(events)
+
+    @staticmethod
+    def _close_stream(events: queue.Queue) -> None:
+        while True:
+            try:
+                events.get_nowait()
+            except queue.Empty:
+                break
+        events.put_nowait(None)
+
+    def export_state(self) -> Dict[str, Any]:
+        snapshot = self.snapshot
+        return {
+            "version": snapshot.version,
+            "routines": {
+                routine: {"status": state["status"], "epoch": state["epoch"], "history": state["history"].to_dict()}
+                for routine, state in snapshot.routines.items()
+            },
+        }
+
+    def import_state(self, data: Dict[str, Any]) -> int:
+        """Replace the state with an exported one, returns the number of routines loaded."""
+        routines = {
+            routine: {"status": state["status"], "epoch": state["epoch"], "history": TaskHistory.from_dict(state["history"], self.MAX_TASKS)}
+            for routine, state in data["routines"].items()
+        }
+        views = {routine: format_routine(state) for routine, state in routines.items()}
+        with self.lock:
+            self.snapshot = StateSnapshot(max(self.snapshot.version, data.get("version", 0)) + 1, routines, views)
+        return len(routines)
+
+    def apply_updates(self, updates: List[Dict[str, Any]]) -> int:
+        """
+        Apply a batch of status updates (`routine_status` / `task_status` messages) as one new snapshot.
+        Returns the number of routines changed.
+        """
+        with self.lock:
+            current = self.snapshot
+            routines = dict(current.routines)
+            copied: Set[str] = set()
+            changed: Set[str] = set()
+            for update in updates:
+                routine_name = update["routine"]
+                routine_state = routines.get(routine_name, None)
+                if routine_state is None:
+                    logger.debug(f"apply_updates | Routine {routine_name} not found. Creating new entry")
+                    routine_state = {"epoch": 0, "status": None, "history": TaskHistory(self.MAX_TASKS)}
+                    changed.add(routine_name)
+                elif routine_name not in copied:
+                    # first update of this routine in the batch: copy it, the current snapshot stays untouched
+                    routine_state = dict(routine_state, history=routine_state["history"].copy())
+                copied.add(routine_name)
+                routines[routine_name] = routine_state
+
+                status = update["status"]
+                epoch = update["epoch"]
+                if update["type"] == "routine_status":
+                    if epoch < routine_state["epoch"] or (epoch, status) == (routine_state["epoch"], routine_state["status"]):
+                        logger.debug(f"apply_updates | Ignoring outdated or repeated message for routine {routine_name}")
+                        continue
+                    routine_state["status"] = status
+                    routine_state["epoch"] = epoch
+                    changed.add(routine_name)
+
+                elif update["type"] == "task_status":
+                    task_id = update["task_id"]
+                    if not routine_state["history"].update(task_id, status, epoch):
+                        logger.debug(f"apply_updates | Ignoring outdated or repeated message for task {task_id}")
+                        continue
+                    changed.add(routine_name)
+
+            if not changed:
+                return 0
+            views = dict(current.views)
+            for routine_name in changed:
+                views[routine_name] = format_routine(routines[routine_name])
+            self.snapshot = StateSnapshot(current.version + 1, routines, views)
+            for routine_name in changed:
+                self.publish_routine(routine_name)
+            return len(changed)
+
     def update_routine_status(self, routine_name: str, status: str, epoch: int) -> None:
-        routine_state = self.get_routine_state(routine_name)
-        logger.debug(f"update_routine_status | Updating routine {routine_state} status to {status} at {epoch}")
-        if epoch < routine_state["epoch"]:
-            logger.debug(f"handle_message | Ignoring outdated message for routine {routine_name}")
-            return
-        routine_state["status"] = status
-        routine_state["epoch"] = epoch
+        self.apply_updates([{"type": "routine_status", "routine": routine_name, "status": status, "epoch": epoch}])
 
     def update_task_status(self, routine_name: str, task_id: int, status: str, epoch: int) -> None:
-        routine_state = self.get_routine_state(routine_name)
-        task_state = self.get_task_state(routine_name, task_id)
-        logger.debug(f"update_task_status | Updating task {task_state} task {task_id} status to {status} at {epoch}")
-        if epoch < task_state["epoch"]:
-            logger.debug(f"handle_message | Ignoring outdated message for task {task_id}")
-            return
-        task_state["epoch"] = epoch
-        task_state["status"] = status
-        
-        if len(routine_state["tasks"]) > self.MAX_TASKS:
-            del routine_state["tasks"][min(routine_state["tasks"])]
-
-
-def send_message_to_scheduler(command: str, routine_name: str):
-    send_message(
-        "commands", 
-        {
-            "command": command,
-            "routine": routine_name
-        }
-    )
+        self.apply_updates([{"type": "task_status", "routine": routine_name, "task_id": task_id, "status": status, "epoch": epoch}])
+
+
+def validate_status_update(message: Dict[str, Any]) -> Dict[str, Any]:
+    if message["type"] not in ("routine_status", "task_status"):
+        raise ValueError(f"Unknown message type {message['type']}")
+    if type(message["routine"]) is not str:
+        raise AssertionError("Routine must be a string")
+    if message["type"] == "task_status" and type(message.get("task_id", None)) is not int:
+        raise AssertionError("Task id must be an integer")
+    for field in ("status", "epoch"):
+        if field not in message:
+            raise KeyError(field)
+    return message
 
-def handle_message(ch, method, _properties, body: bytes):
+def handle_message(ch, method, properties, body: bytes):
     logic = Logic()
     try:
         logger.debug(f"handle_message | Received message: {body}")
-        message = json.loads(body)
-        message_type = message["type"]
-        routine = message["routine"]
-        if type(routine) is not str:
-            raise AssertionError("Routine must be a string")
-        status = message["status"]
-        epoch = message["epoch"]
-        task_id = message.get("task_id", None)
-        if message_type == "routine_status":
-            logger.debug(f"handle_message | Updating routine {routine} status to {status}")
-            logic.update_routine_status(routine, status, epoch)
-            logger.debug(f"handle_message | Routine {routine} status updated to {status}")
-
-        elif message_type == "task_status":
-            logger.debug(f"handle_message | Updating routine {routine} task {task_id} status to {status}")
-            logic.update_task_status(routine, task_id, status, epoch)
-            logger.debug(f"handle_message | Routine {routine} task {task_id} status updated to {status}")
+        message = wire.decode(body, getattr(properties, "content_type", None))
+        if message["type"] == "status_batch":
+            # one envelope per scheduler window, holding the latest status of each routine / task
+            updates = []
+            for update in message["updates"]:
+                try:
+                    updates.append(validate_status_update(update))
+                except Exception as e:
+                    logger.error(f"handle_message | Error handling update {update}: {e}")
+        else:
+            updates = [validate_status_update(message)]
+        changed = logic.apply_updates(updates)
+        logger.debug(f"handle_message | {len(updates)} updates applied, {changed} routines changed")
 
         ch.basic_ack(delivery_tag=method.delivery_tag)  # Acknowledge the message
 
@@ -0,0 +1,93 @@
+import atexit
+import json
+import logging
+import os
+import threading
+import time
+from typing import Optional
+from logic import Logic
+
+logger = logging.getLogger(__name__)
+
+STATE_SNAPSHOT_PATH = os.environ.get("STATE_SNAPSHOT_PATH", os.path.join(os.path.dirname(os.path.abspath(__file__)), "shared", "state_snapshot.json"))
+STATE_SNAPSHOT_INTERVAL = float(os.environ.get("STATE_SNAPSHOT_INTERVAL", 10)) # seconds between snapshots, when the state changed
+STATE_SNAPSHOT_FORMAT = 1
+
+
+class StateStore:
+    """
+    Periodic snapshot of the Logic state to a local JSON file, loaded back at startup.
+
+    The file is replaced atomically (write to a temporary file, then rename), a crash during a save
+    keeps the previous snapshot. After a load, the status updates received are applied on top of it
+    (the scheduler full state batches included): Logic drops the ones older than the epochs of the snapshot.
+    """
+    def __init__(self, logic: Logic, path: str = STATE_SNAPSHOT_PATH, interval: float = STATE_SNAPSHOT_INTERVAL):
+        self.logic = logic
+        self.path = path
+        self.interval = interval
+        self.saved_version: Optional[int] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def load(self) -> bool:
+        started_at = time.perf_counter()
+        try:
+            with open(self.path, "rb") as snapshot_file:
+                data = json.load(snapshot_file)
+        except FileNotFoundError:
+            logger.info(f"StateStore: no snapshot at {self.path}, starting empty")
+            return False
+        except (OSError, ValueError) as e:
+            logger.error(f"StateStore: could not read snapshot {self.path}: {e}")
+            return False
+        if data.get("format", None) != STATE_SNAPSHOT_FORMAT:
+            logger.warning(f"StateStore: ignoring snapshot {self.path} with format {data.get('format', None)}")
+            return False
+        try:
+            routines = self.logic.import_state(data)
+        except (KeyError, TypeError, ValueError) as e:
+            logger.error(f"StateStore: invalid snapshot {self.path}: {e}")
+            return False
+        self.saved_version = self.logic.version
+        logger.info(f"StateStore: loaded {routines} routines saved at {data.get('saved_at', None)} in {(time.perf_counter() - started_at) * 1000:.1f}ms")
+        return True
+
+    def save(self) -> bool:
+        """Write the snapshot if the state changed since the last save."""
+        state = self.logic.export_state()
+        if state["version"] == self.saved_version:
+            return False
+        state["format"] = STATE_SNAPSHOT_FORMAT
+        state["saved_at"] = int(time.time())
+        directory = os.path.dirname(self.path) or "."
+        os.makedirs(directory, exist_ok=True)
+        temporary_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(temporary_path, "w") as snapshot_file:
+            json.dump(state, snapshot_file, separators=(",", ":"))
+            snapshot_file.flush()
+            os.fsync(snapshot_file.fileno())
+        os.replace(temporary_path, self.path)
+        self.saved_version = state["version"]
+        logger.debug(f"StateStore: saved version {state['version']} to {self.path}")
+        return True
+
+    def _run(self) -> None:
+        while not self._stop.wait(self.interval):
+            try:
+                self.save()
+            except Exception as e:
+                logger.error(f"StateStore: snapshot failed: {e}")
+
+    def start(self) -> None:
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="state-store", daemon=True)
+            self._thread.start()
+            atexit.register(self.close)
+
+    def close(self) -> None:
+        self._stop.set()
+        try:
+            self.save()
+        except Exception as e:
+            logger.error(f"StateStore: final snapshot failed: {e}")
@@ -1,6 +1,9 @@
 import unittest
 
 from .test_logic import TestLogic
+from .test_history import TestTaskHistory
+from .test_state_store import TestStateStore
+from .test_command_client import TestCommandClient, TestLatencyHistogram
 
 if __name__ == '__main__':
     unittest.main()
\ No newline at end of file
@@ -0,0 +1,61 @@
+import json
+import threading
+import unittest
+from unittest.mock import patch, MagicMock
+from command_client import CommandClient, LatencyHistogram
+
+
+class TestCommandClient(unittest.TestCase):
+    def setUp(self):
+        self.client = CommandClient(timeout=1)
+        channel = MagicMock()
+        channel.queue_declare.return_value.method.queue = "reply_queue"
+        self.client.bind(channel)
+
+    def reply(self, correlation_id: str, sent_at: float, result: dict):
+        body = json.dumps({"correlation_id": correlation_id, "result": result, "sent_at": sent_at}).encode()
+        self.client.on_reply(None, None, MagicMock(correlation_id=correlation_id), body)
+
+    @patch("command_client.send_message")
+    def test_send_waits_for_reply(self, mock_send_message):
+        def scheduler(queue_name, message, properties):
+            self.assertEqual((queue_name, properties.reply_to), ("commands", "reply_queue"))
+            threading.Timer(0.01, self.reply, args=(properties.correlation_id, message["sent_at"], {"status": "ok", "routine_status": "pending"})).start()
+        mock_send_message.side_effect = scheduler
+        result = self.client.send("start", "test")
+        self.assertEqual(result["status"], "ok")
+        self.assertEqual(result["routine_status"], "pending")
+        stats = self.client.get_stats()
+        self.assertEqual((stats["sent"], stats["replies"], stats["pending"]), (1, 1, 0))
+        self.assertEqual(stats["latency"]["count"], 1)
+
+    @patch("command_client.send_message")
+    def test_timeout_then_late_reply(self, mock_send_message):
+        result = self.client.send("cancel", "test", timeout=0.01)
+        self.assertEqual(result["status"], "pending")
+        message, properties = mock_send_message.call_args.args[1:]
+        self.reply(properties.correlation_id, message["sent_at"], {"status": "ok"})
+        stats = self.client.get_stats()
+        self.assertEqual((stats["timeouts"], stats["late_replies"], stats["pending"]), (1, 1, 0))
+        self.assertEqual(stats["latency"]["count"], 1)
+
+    @patch("command_client.send_message")
+    def test_send_without_wait(self, mock_send_message):
+        self.assertEqual(self.client.send("execute", "test", wait=False, idempotency_key="k1"), {"status": "sent", "idempotency_key": "k1"})
+        mock_send_message.assert_called_once_with("commands", {"command": "execute", "routine": "test", "idempotency_key": "k1"})
+
+
+class TestLatencyHistogram(unittest.TestCase):
+    def test_buckets_and_percentiles(self):
+        histogram = LatencyHistogram([10, 100])
+        for latency_ms in [1, 2, 3, 50, 500]:
+            histogram.record(latency_ms)
+        stats = histogram.get_stats()
+        self.assertEqual(stats["buckets"], {"le_10": 3, "le_100": 1, "inf": 1})
+        self.assertEqual(stats["p50_ms"], 10)
+        self.assertIsNone(stats["p99_ms"])
+        self.assertEqual(stats["max_ms"], 500)
+
+
+if __name__ == '__main__':
+    unittest.main()
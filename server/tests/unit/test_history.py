@@ -0,0 +1,42 @@
+import unittest
+from history import TaskHistory
+
+
+class TestTaskHistory(unittest.TestCase):
+    def test_ring_evicts_oldest(self):
+        history = TaskHistory(depth=3)
+        for task_id in [10, 13, 16, 19]:
+            self.assertTrue(history.update(task_id, "running", 1))
+        self.assertEqual([task["id"] for task in history.tasks()], [19, 16, 13])
+        self.assertEqual(sorted(history.index), [13, 16, 19])
+        # older than every task kept
+        self.assertFalse(history.update(10, "done", 2))
+
+    def test_outdated_update_is_ignored(self):
+        history = TaskHistory(depth=3)
+        history.update(1, "done", 5)
+        self.assertFalse(history.update(1, "running", 4))
+        self.assertEqual(history.tasks()[0]["status"], "done")
+
+    def test_stats(self):
+        history = TaskHistory(depth=2, durations_depth=2)
+        for task_id, final_status, started, finished in [(1, "done", 0, 3), (2, "error", 3, 4), (3, "done", 4, 9)]:
+            history.update(task_id, "running", started)
+            history.update(task_id, final_status, finished)
+            # a repeated final status is counted once
+            history.update(task_id, final_status, finished)
+        self.assertEqual(history.get_stats(), {"totals": {"done": 2, "error": 1}, "durations": [1, 5], "average_duration": 3.0})
+
+    def test_copy_leaves_original_untouched(self):
+        history = TaskHistory(depth=2)
+        history.update(1, "running", 1)
+        copy = history.copy()
+        copy.update(1, "done", 2)
+        copy.update(2, "running", 2)
+        self.assertEqual([(task["id"], task["status"]) for task in history.tasks()], [(1, "running")])
+        self.assertEqual(history.totals, {})
+        self.assertEqual([(task["id"], task["status"]) for task in copy.tasks()], [(2, "running"), (1, "done")])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -1,6 +1,9 @@
+import json
 import unittest
 from unittest.mock import patch, MagicMock
-from logic import Logic, send_message_to_scheduler, handle_message
+from logic import Logic, handle_message
+
+NO_STATS = {"totals": {}, "durations": [], "average_duration": None}
 
 
 class TestLogic(unittest.TestCase):
@@ -15,11 +18,6 @@ class TestLogic(unittest.TestCase):
         self.logic.reset_routines()
         self.assertEqual(self.logic.get_state("test"), {"status": None, "tasks": {}})
 
-    @patch("logic.send_message")
-    def test_send_message_to_scheduler(self, mock_send_message):
-        send_message_to_scheduler("test_command", "test_routine")
-        mock_send_message.assert_called_once_with("commands", {"command": "test_command", "routine": "test_routine"})
-
     def test_handle_message_routine_status(self):
         self.logic.reset_routines()
         handle_message(MagicMock(), MagicMock(), None, b'{"type": "routine_status", "routine": "test", "status": "test_status", "epoch": 0}')
@@ -37,6 +35,77 @@ class TestLogic(unittest.TestCase):
         handle_message(MagicMock(), MagicMock(), None, b'{"type": "task_status", "routine": "test", "task_id": 12, "status": "test_status","epoch": 1}')
         self.assertEqual(self.logic.get_state("test"), {"status": "test_status", "tasks": {12: {"status": "test_status", "epoch": 1}}, "epoch": 0})
 
+    def test_handle_message_status_batch(self):
+        self.logic.reset_routines()
+        ch, method = MagicMock(), MagicMock()
+        handle_message(ch, method, None, b'{"type": "status_batch", "updates": ['
+            b'{"type": "routine_status", "routine": "test", "status": "running", "epoch": 2},'
+            b'{"type": "task_status", "routine": "test", "task_id": 12, "status": "done", "epoch": 2},'
+            b'{"type": "routine_status", "routine": null, "status": "running", "epoch": 2},'
+            b'{"type": "routine_status", "routine": "other", "status": "waiting", "epoch": 2}]}')
+        self.assertEqual(self.logic.get_routines_list(), ["test", "other"])
+        self.assertEqual(self.logic.get_state("test"), {"status": "running", "tasks": {12: {"status": "done", "epoch": 2}}, "epoch": 2})
+        self.assertEqual(self.logic.get_state("other"), {"status": "waiting", "tasks": {}, "epoch": 2})
+        ch.basic_ack.assert_called_once_with(delivery_tag=method.delivery_tag)
+
+    def test_subscribe_snapshot_then_updates(self):
+        self.logic.reset_routines()
+        self.logic.update_routine_status("test", "waiting", 1)
+        events = self.logic.subscribe()
+        self.assertEqual(events.get_nowait(), ("snapshot", {"test": {"status": "waiting", "tasks": [], "stats": NO_STATS}}))
+        self.logic.update_task_status("test", 3, "running", 2)
+        self.logic.update_routine_status("test", "running", 0)  # outdated, not applied nor streamed
+        self.assertEqual(events.get_nowait(), ("routine", {"name": "test", "status": "waiting", "tasks": [{"name": 3, "status": "running"}], "stats": NO_STATS}))
+        self.assertTrue(events.empty())
+        self.logic.unsubscribe(events)
+        self.logic.update_routine_status("test", "running", 3)
+        self.assertTrue(events.empty())
+
+    def test_slow_subscriber_is_dropped(self):
+        self.logic.reset_routines()
+        events = self.logic.subscribe(queue_size=2)
+        self.logic.update_routine_status("test", "waiting", 1)
+        self.logic.update_routine_status("test", "running", 2)
+        self.assertNotIn(events, self.logic.subscribers)
+        self.assertIsNone(events.get_nowait())
+
+    def test_status_all_cached_per_version(self):
+        self.logic.reset_routines()
+        self.logic.update_routine_status("test", "waiting", 1)
+        etag, payload = self.logic.get_status_all()
+        self.assertEqual(json.loads(payload), {"version": self.logic.version, "routines": {"test": {"status": "waiting", "tasks": [], "stats": NO_STATS}}})
+        self.assertIs(self.logic.get_status_all()[1], payload)
+        self.logic.update_routine_status("test", "running", 0)  # outdated, same version
+        self.assertEqual(self.logic.get_status_all()[0], etag)
+        self.logic.update_task_status("test", 1, "done", 2)
+        new_etag, new_payload = self.logic.get_status_all()
+        self.assertNotEqual(new_etag, etag)
+        self.assertEqual(json.loads(new_payload)["routines"]["test"]["tasks"], [{"name": 1, "status": "done"}])
+
+    def test_repeated_update_is_not_a_change(self):
+        self.logic.reset_routines()
+        self.logic.update_routine_status("test", "running", 1)
+        self.logic.update_task_status("test", 1, "running", 1)
+        version = self.logic.version
+        # a full state batch repeats what a replica already has
+        handle_message(MagicMock(), MagicMock(), None, b'{"type": "status_batch", "updates": ['
+            b'{"type": "routine_status", "routine": "test", "status": "running", "epoch": 1},'
+            b'{"type": "task_status", "routine": "test", "task_id": 1, "status": "running", "epoch": 1}]}')
+        self.assertEqual(self.logic.version, version)
+
+    def test_batch_swaps_one_snapshot(self):
+        self.logic.reset_routines()
+        self.logic.update_task_status("test", 1, "running", 1)
+        snapshot = self.logic.snapshot
+        handle_message(MagicMock(), MagicMock(), None, b'{"type": "status_batch", "updates": ['
+            b'{"type": "task_status", "routine": "test", "task_id": 1, "status": "done", "epoch": 2},'
+            b'{"type": "routine_status", "routine": "test", "status": "waiting", "epoch": 2}]}')
+        self.assertEqual(self.logic.version, snapshot.version + 1)
+        # a reader holding the previous snapshot keeps a consistent view
+        self.assertEqual([task["status"] for task in snapshot.routines["test"]["history"].tasks()], ["running"])
+        self.assertEqual(self.logic.get_state("test"), {"status": "waiting", "epoch": 2, "tasks": {1: {"status": "done", "epoch": 2}}})
+        self.assertEqual(self.logic.format_state("test")["stats"], {"totals": {"done": 1}, "durations": [1], "average_duration": 1.0})
+
     @patch('logging.error')
     def test_handle_message_assert_exception(self, mock_log_error):
         self.logic.reset_routines()
@@ -0,0 +1,56 @@
+import os
+import tempfile
+import unittest
+from logic import Logic
+from state_store import StateStore
+
+
+class TestStateStore(unittest.TestCase):
+    def setUp(self):
+        self.logic = Logic()
+        self.logic.reset_routines()
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, "state", "state_snapshot.json")
+
+    def tearDown(self):
+        self.directory.cleanup()
+
+    def test_save_and_load(self):
+        self.logic.update_routine_status("test", "running", 5)
+        for task_id in range(1, 8):
+            self.logic.update_task_status("test", task_id, "running", task_id)
+            self.logic.update_task_status("test", task_id, "done", task_id + 1)
+        state = self.logic.get_state("test")
+        view = self.logic.format_state("test")
+        store = StateStore(self.logic, self.path)
+        self.assertTrue(store.save())
+        self.assertFalse(store.save()) # unchanged
+
+        self.logic.reset_routines()
+        self.assertTrue(StateStore(self.logic, self.path).load())
+        self.assertEqual(self.logic.get_routines_list(), ["test"])
+        self.assertEqual(self.logic.get_state("test"), state)
+        self.assertEqual(self.logic.format_state("test"), view)
+
+    def test_outdated_updates_after_load_are_dropped(self):
+        self.logic.update_routine_status("test", "waiting", 10)
+        StateStore(self.logic, self.path).save()
+        self.logic.reset_routines()
+        StateStore(self.logic, self.path).load()
+        self.logic.update_routine_status("test", "running", 9)
+        self.assertEqual(self.logic.get_state("test")["status"], "waiting")
+        self.logic.update_routine_status("test", "running", 11)
+        self.assertEqual(self.logic.get_state("test")["status"], "running")
+
+    def test_missing_or_invalid_snapshot(self):
+        store = StateStore(self.logic, self.path)
+        self.assertFalse(store.load())
+        os.makedirs(os.path.dirname(self.path))
+        with open(self.path, "w") as snapshot_file:
+            snapshot_file.write("{not json")
+        self.assertFalse(store.load())
+        self.assertEqual(self.logic.get_routines_list(), [])
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,52 @@
+import json
+import unittest
+from unittest.mock import MagicMock
+import wire
+from logic import Logic, handle_message
+
+
+class TestWire(unittest.TestCase):
+    def setUp(self):
+        self.batch = {"type": "status_batch", "updates": [
+            {"type": "routine_status", "routine": "wire", "status": "running", "epoch": 1700000000},
+            {"type": "task_status", "routine": "wire", "task_id": 3, "status": "done", "epoch": 1700000001},
+        ]}
+
+    @unittest.skipIf(wire.msgpack is None, "msgpack is not installed")
+    def test_status_batch_roundtrip(self):
+        body, content_type = wire.encode(self.batch, "msgpack")
+        self.assertEqual(content_type, wire.CONTENT_TYPE_MSGPACK)
+        self.assertEqual(wire.decode(body, content_type), self.batch)
+        self.assertLess(len(body), len(json.dumps(self.batch)))
+
+    @unittest.skipIf(wire.msgpack is None, "msgpack is not installed")
+    def test_handle_message_msgpack(self):
+        logic = Logic()
+        logic.reset_routines()
+        body, content_type = wire.encode(self.batch, "msgpack")
+        ch = MagicMock()
+        handle_message(ch, MagicMock(), MagicMock(content_type=content_type), body)
+        self.assertEqual(logic.get_state("wire")["status"], "running")
+        self.assertEqual(logic.get_state("wire")["tasks"], {3: {"status": "done", "epoch": 1700000001}})
+        ch.basic_ack.assert_called_once()
+
+    def test_json_fallback(self):
+        body, content_type = wire.encode(self.batch, "json")
+        self.assertEqual(content_type, wire.CONTENT_TYPE_JSON)
+        self.assertEqual(wire.decode(body, None), self.batch)
+
+    def test_status_table_pinned(self):
+        self.assertEqual(wire.STATUS_BATCH_VERSION, 1)
+        self.assertEqual(wire.UPDATE_TYPES, ["routine_status", "task_status"])
+        self.assertEqual(wire.STATUSES, ["waiting", "pending", "done", "retry", "running", "canceled", "fail", "error", "complete", "unknown", "ready", "cancelled", "timeout"])
+
+    @unittest.skipIf(wire.msgpack is None, "msgpack is not installed")
+    def test_pinned_body(self):
+        # the same bytes are pinned in scheduler/tests/unit/RoutineManager/test_wire.py, the other side of the wire
+        batch = {"type": "status_batch", "updates": [
+            {"type": "routine_status", "routine": "r1", "status": "timeout", "epoch": 1700000000},
+            {"type": "task_status", "routine": "r1", "task_id": 3, "status": "done", "epoch": 1700000001},
+        ]}
+        body = b'\x94\xa2sb\x01\x91\xa2r1\x92\x95\x00\x00\xc0\x0c\xceeS\xf1\x00\x95\x01\x00\x03\x02\xceeS\xf1\x01'
+        self.assertEqual(wire.encode(batch, "msgpack")[0], body)
+        self.assertEqual(wire.decode(body, wire.CONTENT_TYPE_MSGPACK), batch)
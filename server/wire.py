@@ -0,0 +1,85 @@
+import json
+import logging
+import os
+from typing import Any, Dict, List, Optional, Tuple
+
+try:
+    import msgpack
+except ImportError:  # JSON only
+    msgpack = None
+
+logger = logging.getLogger(__name__)
+
+CONTENT_TYPE_JSON = "application/json"
+CONTENT_TYPE_MSGPACK = "application/msgpack"
+WIRE_FORMAT = os.environ.get("WIRE_FORMAT", "msgpack") # "msgpack" (when installed) or "json"
+
+# Compact status batch, schema version 1:
+#   ["sb", 1, [routine names], [[kind, routine index, task id, status, epoch], ...]]
+# kind 0 is a routine_status, 1 a task_status (task id None). Known statuses are sent as their code.
+STATUS_BATCH_TAG = "sb"
+STATUS_BATCH_VERSION = 1
+UPDATE_TYPES = ["routine_status", "task_status"]
+# RoutineStatus and TaskInstanceStatus values, append only: codes are part of the wire format.
+# scheduler/RoutineManager/wire.py is a copy of this module (the services are built from separate directories), keep the two
+# identical: test_wire pins the table and an encoded batch on both sides.
+STATUSES = ["waiting", "pending", "done", "retry", "running", "canceled", "fail", "error", "complete", "unknown", "ready", "cancelled", "timeout"]
+STATUS_CODES = {status: code for code, status in enumerate(STATUSES)}
+
+
+def get_wire_format(wire_format: Optional[str] = None) -> str:
+    wire_format = wire_format or WIRE_FORMAT
+    if wire_format == "msgpack" and msgpack is None:
+        return "json"
+    return wire_format
+
+def _pack_status_batch(updates: List[Dict[str, Any]]) -> list:
+    routines: Dict[str, int] = {}
+    packed = []
+    for update in updates:
+        routine_index = routines.setdefault(update["routine"], len(routines))
+        status = update["status"]
+        packed.append([
+            UPDATE_TYPES.index(update["type"]),
+            routine_index,
+            update.get("task_id", None),
+            STATUS_CODES.get(status, status),
+            update["epoch"],
+        ])
+    return [STATUS_BATCH_TAG, STATUS_BATCH_VERSION, list(routines), packed]
+
+def _unpack_status_batch(batch: list) -> Dict[str, Any]:
+    _tag, version, routines, packed = batch
+    if version != STATUS_BATCH_VERSION:
+        raise ValueError(f"Unsupported status batch version {version}")
+    updates = []
+    for kind, routine_index, task_id, status, epoch in packed:
+        update = {
+            "type": UPDATE_TYPES[kind],
+            "routine": routines[routine_index],
+            "status": STATUSES[status] if isinstance(status, int) else status,
+            "epoch": epoch,
+        }
+        if task_id is not None:
+            update["task_id"] = task_id
+        updates.append(update)
+    return {"type": "status_batch", "updates": updates}
+
+def encode(message: Any, wire_format: Optional[str] = None) -> Tuple[bytes, str]:
+    """Serialize a message, returns the body and its content type."""
+    if get_wire_format(wire_format) != "msgpack":
+        return json.dumps(message).encode(), CONTENT_TYPE_JSON
+    if isinstance(message, dict) and message.get("type", None) == "status_batch":
+        message = _pack_status_batch(message["updates"])
+    return msgpack.packb(message, use_bin_type=True), CONTENT_TYPE_MSGPACK
+
+def decode(body: bytes, content_type: Optional[str] = None) -> Any:
+    """Deserialize a message by its content type, JSON when it is not set (older producers)."""
+    if content_type != CONTENT_TYPE_MSGPACK:
+        return json.loads(body)
+    if msgpack is None:
+        raise ValueError("msgpack message received but msgpack is not installed")
+    message = msgpack.unpackb(body, raw=False, strict_map_key=False)
+    if isinstance(message, list) and message and message[0] == STATUS_BATCH_TAG:
+        return _unpack_status_batch(message)
+    return message
@@ -1,9 +1,14 @@
-from flask import Flask, request, jsonify
+from flask import Flask, Response, request, jsonify, stream_with_context
 from flask_cors import CORS, cross_origin
+import json
 import logging
+import os
+import queue
 import threading
-from logic import send_message_to_scheduler, handle_message, Logic 
-from rabbitMQ import receive_message_callback
+from command_client import COMMAND_REPLY_TIMEOUT, get_command_client
+from logic import handle_message, Logic 
+from rabbitMQ import receive_exchange_callback
+from state_store import StateStore
 import sys
 
 # Set logger configuration
@@ -16,8 +21,20 @@ logging.basicConfig(
 
 logger = logging.getLogger(__name__)
 
-# Set rabbitMQ callback
-channel = receive_message_callback("status_updates", handle_message)
+STREAM_KEEPALIVE = float(os.environ.get("STREAM_KEEPALIVE", 15)) # seconds between keep-alive comments on idle streams
+STATUS_EXCHANGE = os.environ.get("STATUS_EXCHANGE", "status_updates") # fanout exchange of the scheduler status batches
+
+logic = Logic()
+
+# Warm start from the last snapshot, the scheduler periodic full state batch fills in what was missed
+state_store = StateStore(logic)
+state_store.load()
+state_store.start()
+
+# Set rabbitMQ callback: each replica binds its own queue to the exchange and sees every status update
+channel = receive_exchange_callback(STATUS_EXCHANGE, handle_message)
+# command replies are consumed by the same thread
+get_command_client().bind(channel)
 receive_messages_thread = threading.Thread(target=channel.start_consuming)
 receive_messages_thread.start()
 
@@ -25,8 +42,6 @@ receive_messages_thread.start()
 app = Flask(__name__)
 cors = CORS(app)
 
-logic = Logic()
-
 @app.route("/ping", methods=["GET", "POST"])
 @cross_origin(origins="http://localhost")
 def ping():
@@ -53,11 +68,24 @@ def routine_command():
             "error": "Invalid routine"
         })
     
-    # send command to the queue
+    # send command to the queue, and wait for the scheduler to apply it unless "wait" is false
     try:
-        res = send_message_to_scheduler(data.get("command", "None"), data.get("routine_name", "None"))
+        timeout = min(float(data.get("timeout", COMMAND_REPLY_TIMEOUT)), COMMAND_REPLY_TIMEOUT)
+        result = get_command_client().send(
+            data.get("command", "None"),
+            data.get("routine_name", "None"),
+            wait=bool(data.get("wait", True)),
+            timeout=timeout,
+            idempotency_key=data.get("idempotency_key", None)
+        )
+        if result["status"] == "error":
+            return jsonify({
+                "status": "error",
+                "error": result.get("error", None)
+            })
         return jsonify({
-            "status": "ok"
+            "status": "ok" if result["status"] in ["ok", "sent"] else result["status"],
+            "result": result
         })
     except Exception as e:
         logger.error(e)
@@ -66,6 +94,12 @@ def routine_command():
             "error": str(e)
         })
 
+@app.route("/metrics/commands", methods=["GET"])
+@cross_origin(origins="http://localhost")
+def commands_metrics():
+    """Commands sent, replies, timeouts and the server to scheduler reply latency histogram."""
+    return jsonify(get_command_client().get_stats())
+
 # @app.route("/routine/get_command", methods=["POST"])
 # @cross_origin(origins="http://localhost")
 # def get_command():
@@ -110,21 +144,59 @@ def routine_list():
 def routine_status():
     num_tasks = request.json.get("num_tasks", 5)
     routine_name = request.json.get("routine_name","")
-    routine_state = logic.get_state(routine_name)
-
-    tasks = routine_state.get("tasks", {})
-    logger.info(f"Getting status for routine {routine_name} with {num_tasks} tasks: {tasks}")
-    sorted_tasks_list = [{
-            "name": task,
-            "status": tasks.get(task, {}).get("status", None),
-        } for task in tasks]
-    sorted_tasks_list.sort(key=lambda x: x["name"], reverse=True)
-    return jsonify({
-        "status": routine_state.get("status", None),
-        "tasks": sorted_tasks_list,
-    })
+    routine_state = logic.format_state(routine_name)
+    logger.info(f"Getting status for routine {routine_name} with {num_tasks} tasks: {routine_state['tasks']}")
+    return jsonify(routine_state)
+
+
+@app.route("/routine/status_all", methods=["GET", "POST"])
+@cross_origin(origins="http://localhost", expose_headers=["ETag"])
+def routine_status_all():
+    """Every routine state in one response, 304 when the client already has the current version."""
+    etag, payload = logic.get_status_all()
+    if request.if_none_match.contains(etag):
+        response = Response(status=304)
+    else:
+        response = Response(payload, mimetype="application/json")
+    response.set_etag(etag)
+    response.headers["Cache-Control"] = "no-cache"
+    return response
+
+
+def format_event(event: str, data) -> str:
+    return f"event: {event}\ndata: {json.dumps(data)}\n\n"
+
+@app.route("/routine/stream", methods=["GET"])
+@cross_origin(origins="http://localhost")
+def routine_stream():
+    """
+    Server-Sent Events stream of the routines state: a `snapshot` event with every routine,
+    then a `routine` event with the new state of a routine each time one of its updates is applied.
+    """
+    events = logic.subscribe()
+
+    def generate():
+        try:
+            while True:
+                try:
+                    event = events.get(timeout=STREAM_KEEPALIVE)
+                except queue.Empty:
+                    yield ": keepalive\n\n"
+                    continue
+                if event is None:
+                    return
+                yield format_event(*event)
+        finally:
+            logic.unsubscribe(events)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
 
 # Run server if the script is run directly
 if __name__ == "__main__":
     # Run the Flask development server
-    app.run(host="0.0.0.0", port=5050, debug=True)
\ No newline at end of file
+    # threaded: each stream client holds a request thread
+    app.run(host="0.0.0.0", port=5050, debug=True, threaded=True)
\ No newline at end of file